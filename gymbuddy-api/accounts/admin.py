@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
-from .models import User, UserIdentity
+from .models import RefreshToken, User, UserIdentity
 
 
 @admin.register(User)
@@ -14,3 +14,11 @@ class UserAdmin(BaseUserAdmin):
 @admin.register(UserIdentity)
 class UserIdentityAdmin(admin.ModelAdmin):
     list_display = ["user", "provider", "provider_uid"]
+
+
+@admin.register(RefreshToken)
+class RefreshTokenAdmin(admin.ModelAdmin):
+    list_display = ["user", "family", "created_at", "expires_at", "used_at", "revoked"]
+    list_filter = ["revoked"]
+    search_fields = ["user__email", "family"]
+    readonly_fields = ["secret_hash", "family", "generation", "used_at"]
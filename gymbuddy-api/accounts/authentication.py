@@ -0,0 +1,36 @@
+from rest_framework import exceptions
+from rest_framework.authentication import BaseAuthentication, get_authorization_header
+
+from .tokens import ACCESS_PREFIX, InvalidToken, token_user, verify_access
+
+
+class SignedTokenAuthentication(BaseAuthentication):
+    """
+    "Authorization: Bearer gba1...." access tokens from accounts/tokens.py.
+
+    Verified by signature alone; request.user is a User with only its id loaded, so a
+    request that never touches other user fields runs no authentication query.
+    """
+
+    keyword = "Bearer"
+
+    def authenticate(self, request):
+        auth = get_authorization_header(request).split()
+        if not auth or auth[0].lower() != self.keyword.lower().encode():
+            return None
+        if len(auth) != 2:
+            raise exceptions.AuthenticationFailed("Invalid bearer header.")
+        try:
+            token = auth[1].decode()
+        except UnicodeError:
+            raise exceptions.AuthenticationFailed("Invalid bearer header.")
+        if not token.startswith(ACCESS_PREFIX + "."):
+            return None  # some other bearer scheme
+        try:
+            user_id, _ = verify_access(token)
+        except InvalidToken as exc:
+            raise exceptions.AuthenticationFailed(str(exc))
+        return token_user(user_id), token
+
+    def authenticate_header(self, request):
+        return f'{self.keyword} realm="api"'
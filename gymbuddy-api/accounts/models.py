@@ -1,3 +1,5 @@
+import hashlib
+
 from django.contrib.auth.models import AbstractUser
 from django.db import models
 
@@ -10,6 +12,9 @@ class User(AbstractUser):
 
     email = models.EmailField(unique=True)
     # Keep username for Django admin compatibility, but we use email for login
+    # Signed access tokens carry the generation they were issued under; bumping it
+    # (accounts.tokens.revoke_all) invalidates every outstanding token for the user.
+    token_generation = models.PositiveIntegerField(default=0)
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username"]  # username still required for createsuperuser
@@ -42,3 +47,31 @@ class UserIdentity(models.Model):
 
     def __str__(self):
         return f"{self.user.email} ({self.provider})"
+
+
+class RefreshToken(models.Model):
+    """
+    One issued refresh token (see accounts/tokens.py). Only a SHA-256 of the secret is
+    stored. Each refresh consumes the token and issues the next one in the same family;
+    presenting a consumed token again revokes the whole family.
+    """
+
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name="refresh_tokens",
+    )
+    secret_hash = models.CharField(max_length=64, unique=True)
+    family = models.CharField(max_length=32, db_index=True)
+    generation = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField()
+    used_at = models.DateTimeField(null=True, blank=True)
+    revoked = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.user.email} refresh #{self.pk}"
+
+    @staticmethod
+    def hash_secret(secret):
+        return hashlib.sha256(secret.encode()).hexdigest()
@@ -0,0 +1,38 @@
+# accounts/signals.py
+"""
+Revoke signed tokens when a user loses access, however that happens (admin, shell,
+cascades): deactivation bumps token_generation like a sign-out everywhere, and deletion
+denies every generation the user had. Both are only seen by saves and deletes that go
+through the ORM's signals; a queryset .update(is_active=False) is not.
+"""
+
+from django.db.models.signals import post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .models import User
+from .tokens import deny_below, revoke_all
+
+
+@receiver(pre_save, sender=User)
+def _note_deactivation(sender, instance, **kwargs):
+    # Only saves of an inactive user pay for the lookup.
+    instance._deactivated = (
+        instance.pk is not None
+        and not instance.is_active
+        and User.objects.filter(pk=instance.pk, is_active=True).exists()
+    )
+
+
+@receiver(post_save, sender=User)
+def _revoke_on_deactivation(sender, instance, created, **kwargs):
+    if getattr(instance, "_deactivated", False):
+        instance._deactivated = False
+        generation = revoke_all(instance)
+        if generation is not None:
+            # Keep the instance in step, so saving it again doesn't write the old value back.
+            instance.token_generation = generation
+
+
+@receiver(pre_delete, sender=User)
+def _revoke_on_delete(sender, instance, **kwargs):
+    deny_below(instance.pk, instance.token_generation + 1)
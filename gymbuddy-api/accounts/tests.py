@@ -0,0 +1,171 @@
+import time
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from workouts.models import Session
+
+from .models import RefreshToken, User
+from .tokens import InvalidToken, issue_access, revoke_all, verify_access
+
+
+class AccessTokenTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_round_trip(self):
+        token, expires = issue_access(7, 2)
+        self.assertTrue(token.startswith("gba1.7.2."))
+        self.assertGreater(expires, time.time())
+        self.assertEqual(verify_access(token), (7, 2))
+
+    def test_tampering_is_rejected(self):
+        token, _ = issue_access(7, 2)
+        forged = token.replace("gba1.7.", "gba1.8.", 1)
+        with self.assertRaisesMessage(InvalidToken, "Invalid signature."):
+            verify_access(forged)
+        with self.assertRaisesMessage(InvalidToken, "Malformed token."):
+            verify_access("gba1.7.2")
+
+    def test_expiry(self):
+        token, expires = issue_access(7, 2)
+        with self.assertRaisesMessage(InvalidToken, "Token expired."):
+            verify_access(token, now=expires)
+
+    def test_old_secret_keys_still_verify(self):
+        with override_settings(SECRET_KEY="old-key-" + "x" * 50):
+            token, _ = issue_access(7, 2)
+        with override_settings(SECRET_KEY="new-key-" + "y" * 50, SECRET_KEY_FALLBACKS=[]):
+            with self.assertRaises(InvalidToken):
+                verify_access(token)
+        with override_settings(
+            SECRET_KEY="new-key-" + "y" * 50, SECRET_KEY_FALLBACKS=["old-key-" + "x" * 50]
+        ):
+            self.assertEqual(verify_access(token), (7, 2))
+
+
+class SignedTokenAPITests(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            email="test@example.com", username="testuser", password="testpass123"
+        )
+
+    def _obtain(self):
+        r = self.client.post(
+            "/api/v1/auth/signed-token/",
+            {"username": "test@example.com", "password": "testpass123"},
+            format="json",
+        )
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        return r.data
+
+    def _bearer(self, access):
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_obtain_requires_valid_credentials(self):
+        r = self.client.post(
+            "/api/v1/auth/signed-token/",
+            {"username": "test@example.com", "password": "wrong"},
+            format="json",
+        )
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_authenticated_requests_run_no_auth_query(self):
+        Session.objects.create(user=self.user)
+        self._bearer(self._obtain()["access"])
+        with self.assertNumQueries(2):  # sessions + exercises prefetch; nothing for auth
+            r = self.client.get("/api/v1/workouts/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(r.data), 1)
+
+    def test_bad_bearer_token_is_401(self):
+        self._bearer("gba1.1.0.9999999999.bogus")
+        r = self.client.get("/api/v1/workouts/")
+        self.assertIn(r.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.assertEqual(r.data["detail"], "Invalid signature.")
+
+    def test_refresh_rotates_and_detects_reuse(self):
+        pair = self._obtain()
+        r = self.client.post(
+            "/api/v1/auth/signed-token/refresh/", {"refresh": pair["refresh"]}, format="json"
+        )
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(r.data["refresh"], pair["refresh"])
+        successor = r.data["refresh"]
+
+        # Replaying the consumed token revokes the family, successor included.
+        r = self.client.post(
+            "/api/v1/auth/signed-token/refresh/", {"refresh": pair["refresh"]}, format="json"
+        )
+        self.assertEqual(r.status_code, status.HTTP_401_UNAUTHORIZED)
+        r = self.client.post(
+            "/api/v1/auth/signed-token/refresh/", {"refresh": successor}, format="json"
+        )
+        self.assertEqual(r.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertFalse(RefreshToken.objects.filter(revoked=False).exists())
+
+    def test_only_hashes_are_stored(self):
+        pair = self._obtain()
+        secret = pair["refresh"].split(".", 1)[1]
+        self.assertFalse(RefreshToken.objects.filter(secret_hash=secret).exists())
+        self.assertTrue(
+            RefreshToken.objects.filter(secret_hash=RefreshToken.hash_secret(secret)).exists()
+        )
+
+    def test_revoke_signs_out_everywhere(self):
+        pair = self._obtain()
+        self._bearer(pair["access"])
+        r = self.client.post("/api/v1/auth/signed-token/revoke/")
+        self.assertEqual(r.status_code, status.HTTP_204_NO_CONTENT)
+
+        r = self.client.get("/api/v1/workouts/")
+        self.assertIn(r.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.assertEqual(r.data["detail"], "Token revoked.")
+        self.client.credentials()
+        r = self.client.post(
+            "/api/v1/auth/signed-token/refresh/", {"refresh": pair["refresh"]}, format="json"
+        )
+        self.assertEqual(r.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Tokens issued after the revocation work.
+        self._bearer(self._obtain()["access"])
+        self.assertEqual(self.client.get("/api/v1/workouts/").status_code, status.HTTP_200_OK)
+
+    def test_deleted_user_is_signed_out(self):
+        self._bearer(self._obtain()["access"])
+        self.user.delete()
+        r = self.client.get("/api/v1/workouts/")
+        self.assertIn(r.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.assertEqual(r.data["detail"], "Token revoked.")
+        self.assertIsNone(revoke_all(self.user))
+
+    def test_deactivated_user_is_signed_out(self):
+        pair = self._obtain()
+        self._bearer(pair["access"])
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.user.token_generation, 1)
+        r = self.client.get("/api/v1/workouts/")
+        self.assertIn(r.status_code, (status.HTTP_401_UNAUTHORIZED, status.HTTP_403_FORBIDDEN))
+        self.assertEqual(r.data["detail"], "Token revoked.")
+        self.client.credentials()
+        r = self.client.post(
+            "/api/v1/auth/signed-token/refresh/", {"refresh": pair["refresh"]}, format="json"
+        )
+        self.assertEqual(r.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Saving an already inactive user doesn't revoke again.
+        self.user.save()
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.token_generation, 1)
+
+    def test_refresh_requires_a_token(self):
+        r = self.client.post("/api/v1/auth/signed-token/refresh/", {}, format="json")
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+        r = self.client.post(
+            "/api/v1/auth/signed-token/refresh/", {"refresh": "gbr1.nope"}, format="json"
+        )
+        self.assertEqual(r.status_code, status.HTTP_401_UNAUTHORIZED)
@@ -0,0 +1,166 @@
+# accounts/tokens.py
+"""
+Stateless signed access tokens with rotating refresh tokens.
+
+An access token is verified with CPU only: no table lookup per request.
+
+    gba1.<user id>.<generation>.<expiry, Unix seconds>.<HMAC-SHA256, base64url>
+
+The HMAC key is derived from SECRET_KEY (SECRET_KEY_FALLBACKS still verify, so keys can
+be rotated). Access tokens live SIGNED_TOKEN_ACCESS_SECONDS; clients trade a refresh
+token ("gbr1.<random>") for a new pair before then. Refresh tokens are single-use rows
+(only a hash is stored): each refresh consumes one and issues its successor, and
+presenting a consumed one again revokes its whole family, since it was probably stolen.
+
+Revocation: every token carries the user's token_generation. revoke_all() bumps it and
+records the new minimum in the cache (the deny-list) for as long as an access token can
+live, so older access tokens fail without a query. Deactivating a user revokes the same
+way, and deleting one denies its last generation (accounts/signals.py). With the
+default per-process LocMemCache that list is per process; set CACHE_URL to a shared
+cache when running several.
+"""
+
+import base64
+import secrets
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare, salted_hmac
+
+from .models import RefreshToken, User
+
+ACCESS_PREFIX = "gba1"
+REFRESH_PREFIX = "gbr1"
+_SALT = "accounts.tokens.access"
+
+
+class InvalidToken(Exception):
+    """A token is malformed, badly signed, expired, revoked or already used."""
+
+
+def access_lifetime():
+    return getattr(settings, "SIGNED_TOKEN_ACCESS_SECONDS", 900)
+
+
+def refresh_lifetime():
+    return timedelta(days=getattr(settings, "SIGNED_TOKEN_REFRESH_DAYS", 30))
+
+
+def _sign(message, secret=None):
+    digest = salted_hmac(_SALT, message, secret=secret, algorithm="sha256").digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def issue_access(user_id, generation, now=None):
+    """(token, expiry as Unix seconds) for user_id at generation."""
+    expires = int(now if now is not None else time.time()) + access_lifetime()
+    message = f"{ACCESS_PREFIX}.{user_id}.{generation}.{expires}"
+    return f"{message}.{_sign(message)}", expires
+
+
+def _deny_key(user_id):
+    return f"auth:min-generation:{user_id}"
+
+
+def deny_below(user_id, generation):
+    """Fail access tokens for user_id issued under an older generation than this one."""
+    cache.set(_deny_key(user_id), generation, access_lifetime() + 60)
+
+
+def verify_access(token, now=None):
+    """(user_id, generation) for a valid access token; raises InvalidToken otherwise."""
+    parts = token.split(".")
+    if len(parts) != 5 or parts[0] != ACCESS_PREFIX:
+        raise InvalidToken("Malformed token.")
+    message, signature = ".".join(parts[:4]), parts[4]
+    keys = [settings.SECRET_KEY, *getattr(settings, "SECRET_KEY_FALLBACKS", [])]
+    if not any(constant_time_compare(signature, _sign(message, key)) for key in keys):
+        raise InvalidToken("Invalid signature.")
+    try:
+        user_id, generation, expires = (int(p) for p in parts[1:4])
+    except ValueError:
+        raise InvalidToken("Malformed token.")
+    if expires <= (now if now is not None else time.time()):
+        raise InvalidToken("Token expired.")
+    if generation < cache.get(_deny_key(user_id), 0):
+        raise InvalidToken("Token revoked.")
+    return user_id, generation
+
+
+def token_user(user_id):
+    """
+    A User with only the primary key loaded. Other fields are deferred and fetched on
+    first access, so authenticating costs no query for views that only need the id.
+    """
+    return User.from_db(DEFAULT_DB_ALIAS, ["id"], [user_id])
+
+
+def issue_pair(user, family=None):
+    """A new access token plus a refresh token (stored hashed) for user."""
+    secret = secrets.token_urlsafe(32)
+    RefreshToken.objects.create(
+        user=user,
+        secret_hash=RefreshToken.hash_secret(secret),
+        family=family or uuid.uuid4().hex,
+        generation=user.token_generation,
+        expires_at=timezone.now() + refresh_lifetime(),
+    )
+    access, _ = issue_access(user.pk, user.token_generation)
+    return {
+        "access": access,
+        "refresh": f"{REFRESH_PREFIX}.{secret}",
+        "token_type": "Bearer",
+        "expires_in": access_lifetime(),
+    }
+
+
+def rotate(refresh):
+    """Consume a refresh token and return the next pair; raises InvalidToken."""
+    prefix, _, secret = refresh.partition(".")
+    if prefix != REFRESH_PREFIX or not secret:
+        raise InvalidToken("Malformed refresh token.")
+    reused = False
+    with transaction.atomic():
+        row = (
+            RefreshToken.objects.select_for_update()
+            .select_related("user")
+            .filter(secret_hash=RefreshToken.hash_secret(secret))
+            .first()
+        )
+        if row is None or row.revoked:
+            raise InvalidToken("Invalid refresh token.")
+        if row.used_at is not None:
+            RefreshToken.objects.filter(family=row.family).update(revoked=True)
+            reused = True
+        elif (
+            row.expires_at <= timezone.now()
+            or row.generation != row.user.token_generation
+            or not row.user.is_active
+        ):
+            raise InvalidToken("Refresh token expired or revoked.")
+        else:
+            row.used_at = timezone.now()
+            row.save(update_fields=["used_at"])
+            return issue_pair(row.user, family=row.family)
+    if reused:
+        raise InvalidToken("Refresh token already used; its family has been revoked.")
+
+
+def revoke_all(user):
+    """Invalidate every access and refresh token issued to user so far."""
+    User.objects.filter(pk=user.pk).update(token_generation=F("token_generation") + 1)
+    try:
+        generation = User.objects.values_list("token_generation", flat=True).get(pk=user.pk)
+    except User.DoesNotExist:
+        # Deleted in the meantime: deletion already denied its tokens and removed its
+        # refresh tokens.
+        return None
+    deny_below(user.pk, generation)
+    RefreshToken.objects.filter(user_id=user.pk, revoked=False).update(revoked=True)
+    return generation
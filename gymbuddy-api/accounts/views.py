@@ -0,0 +1,36 @@
+from rest_framework import status
+from rest_framework.authtoken.serializers import AuthTokenSerializer
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+
+from .tokens import InvalidToken, issue_pair, revoke_all, rotate
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def obtain_signed_token(request):
+    """POST /api/v1/auth/signed-token/ {username, password} - access + refresh tokens."""
+    serializer = AuthTokenSerializer(data=request.data, context={"request": request})
+    serializer.is_valid(raise_exception=True)
+    return Response(issue_pair(serializer.validated_data["user"]))
+
+
+@api_view(["POST"])
+@permission_classes([AllowAny])
+def refresh_signed_token(request):
+    """POST /api/v1/auth/signed-token/refresh/ {refresh} - consume it, get the next pair."""
+    refresh = request.data.get("refresh")
+    if not refresh or not isinstance(refresh, str):
+        return Response({"detail": "refresh required"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        return Response(rotate(refresh))
+    except InvalidToken as exc:
+        return Response({"detail": str(exc)}, status=status.HTTP_401_UNAUTHORIZED)
+
+
+@api_view(["POST"])
+def revoke_signed_tokens(request):
+    """POST /api/v1/auth/signed-token/revoke/ - sign out every device holding a signed token."""
+    revoke_all(request.user)
+    return Response(status=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,155 @@
+"""
+Negotiated response compression.
+
+CompressionMiddleware compresses responses with the best coding both sides support.
+It reads the client's Accept-Encoding q-values and breaks ties with the server order in
+settings.COMPRESSION_ENCODINGS (default zstd, br, gzip). gzip is always available.
+Brotli and Zstandard are only used when the `brotli` / `zstandard` modules are installed.
+
+These responses are left alone:
+
+- bodies under settings.COMPRESSION_MIN_SIZE bytes,
+- anything that already has a Content-Encoding.
+
+Streaming responses are compressed chunk by chunk. Each chunk is flushed so the client
+can decode what has arrived so far.
+
+gzip goes through Django's compress_string, which pads output randomly to blunt BREACH.
+"""
+
+import gzip
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence, compress_string
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # optional
+    zstandard = None
+
+_token_re = re.compile(r"^\s*([\w*-]+)\s*(?:;\s*q\s*=\s*([0-9.]+))?\s*$")
+
+
+def _gzip(data):
+    return compress_string(data)
+
+
+def _brotli(data):
+    return brotli.compress(data, quality=5)
+
+
+def _zstd(data):
+    return zstandard.ZstdCompressor(level=3).compress(data)
+
+
+def _brotli_stream(chunks):
+    compressor = brotli.Compressor(quality=5)
+    for chunk in chunks:
+        yield compressor.process(chunk) + compressor.flush()
+    yield compressor.finish()
+
+
+def _zstd_stream(chunks):
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+    yield compressor.flush()
+
+
+CODECS = {"gzip": _gzip}
+STREAM_CODECS = {"gzip": compress_sequence}
+DECODERS = {"gzip": gzip.decompress}
+if brotli is not None:
+    CODECS["br"] = _brotli
+    STREAM_CODECS["br"] = _brotli_stream
+    DECODERS["br"] = brotli.decompress
+if zstandard is not None:
+    CODECS["zstd"] = _zstd
+    STREAM_CODECS["zstd"] = _zstd_stream
+    DECODERS["zstd"] = lambda data: zstandard.ZstdDecompressor().decompressobj().decompress(data)
+
+
+def decompress(coding, data):
+    """Undo Content-Encoding `coding` (for clients and benchmarks in Python)."""
+    if not coding or coding == "identity":
+        return data
+    return DECODERS[coding](data)
+
+
+def parse_accept_encoding(header):
+    """{coding: q} from an Accept-Encoding header; malformed entries are skipped."""
+    accepted = {}
+    for part in (header or "").split(","):
+        match = _token_re.match(part)
+        if not match:
+            continue
+        try:
+            q = float(match.group(2)) if match.group(2) is not None else 1.0
+        except ValueError:
+            continue
+        accepted[match.group(1).lower()] = q
+    return accepted
+
+
+def choose_encoding(header, preference=None):
+    """The coding to use for this Accept-Encoding header, or None for identity."""
+    accepted = parse_accept_encoding(header)
+    preference = [c for c in (preference or default_preference()) if c in CODECS]
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for coding in preference:
+        q = accepted.get(coding, wildcard)
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def default_preference():
+    return getattr(settings, "COMPRESSION_ENCODINGS", ["zstd", "br", "gzip"])
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        patch_vary_headers(response, ("Accept-Encoding",))
+        if response.has_header("Content-Encoding"):
+            return response
+        if response.streaming:
+            return self._compress_stream(request, response)
+        if len(response.content) < getattr(settings, "COMPRESSION_MIN_SIZE", 1024):
+            return response
+        coding = choose_encoding(request.headers.get("Accept-Encoding"))
+        if coding is None:
+            return response
+
+        compressed = CODECS[coding](response.content)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response["Content-Length"] = str(len(compressed))
+        response["Content-Encoding"] = coding
+        # The bytes differ from the identity representation, so a strong ETag would lie.
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response["ETag"] = "W/" + etag
+        return response
+
+    def _compress_stream(self, request, response):
+        coding = choose_encoding(request.headers.get("Accept-Encoding"))
+        if coding is None:
+            return response
+        response.streaming_content = STREAM_CODECS[coding](response.streaming_content)
+        if response.has_header("Content-Length"):
+            del response["Content-Length"]
+        response["Content-Encoding"] = coding
+        return response
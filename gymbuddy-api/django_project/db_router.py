@@ -0,0 +1,151 @@
+"""
+Primary/replica routing for read-only endpoints.
+
+Reads go to the primary unless a view opts in: viewsets mix in ReplicaReadsMixin and
+list the actions that are safe to serve from the replica in `replica_actions`. While
+such an action runs, PrimaryReplicaRouter sends ORM reads to the "replica" alias
+(settings.DATABASE_REPLICA_ALIAS). Writes always go to the primary.
+
+Replicas lag. After a user writes anything, ReplicaPinMiddleware pins that user to the
+primary for REPLICA_STICKY_SECONDS so they read their own writes. The pin lives in the
+default cache, which must be shared between processes (settings.CACHE_URL) whenever a
+replica is configured; check_shared_cache refuses to start otherwise.
+"""
+
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core import checks
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+_use_replica = ContextVar("use_replica", default=False)
+
+# Backends that keep entries inside one process: a pin set there is invisible to the
+# worker that serves the user's next read.
+_LOCAL_CACHES = (
+    "django.core.cache.backends.locmem.LocMemCache",
+    "django.core.cache.backends.dummy.DummyCache",
+)
+
+
+def replica_alias():
+    """Return the replica alias when one is configured, else None."""
+    alias = getattr(settings, "DATABASE_REPLICA_ALIAS", "replica")
+    return alias if alias in connections.settings else None
+
+
+def using_replica():
+    """True while the current request/task has opted into replica reads."""
+    return _use_replica.get()
+
+
+@contextmanager
+def read_from_replica(enabled=True):
+    token = _use_replica.set(enabled)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def check_shared_cache(app_configs=None, **kwargs):
+    """System check: read-your-writes pins need a cache every process sees."""
+    backend = settings.CACHES.get("default", {}).get("BACKEND", "")
+    if replica_alias() is None or backend not in _LOCAL_CACHES:
+        return []
+    return [
+        checks.Error(
+            f"A read replica is configured but the default cache ({backend}) is per process, "
+            "so a user pinned to the primary after a write can still read stale data "
+            "from another worker.",
+            hint="Set CACHE_URL to a shared cache (redis://, memcached:// or db://).",
+            id="db_router.E001",
+        )
+    ]
+
+
+def _pin_key(user_id):
+    return f"db-router:pin-primary:{user_id}"
+
+
+def pin_to_primary(user_id):
+    cache.set(_pin_key(user_id), True, getattr(settings, "REPLICA_STICKY_SECONDS", 5))
+
+
+def is_pinned_to_primary(user_id):
+    return bool(cache.get(_pin_key(user_id)))
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if not using_replica():
+            return None
+        return replica_alias()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Primary and replica hold the same data, so objects may relate across them.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive schema through replication, never through migrate.
+        if db == replica_alias():
+            return False
+        return None
+
+
+class ReplicaPinMiddleware:
+    """Pin a user to the primary after any successful unsafe request."""
+
+    def __init__(self, get_response):
+        # Gunicorn never runs system checks; fail when the app loads instead.
+        errors = check_shared_cache()
+        if errors:
+            raise ImproperlyConfigured(errors[0].msg)
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            # DRF copies the authenticated user back onto the Django request.
+            user = getattr(request, "user", None)
+            if user is not None and user.is_authenticated and replica_alias():
+                pin_to_primary(user.pk)
+        return response
+
+
+class ReplicaReadsMixin:
+    """
+    Viewset mixin: serve the actions in `replica_actions` from the replica.
+
+    Only safe methods are routed, so an action that handles both GET and POST can be
+    listed; its POST still reads and writes on the primary.
+    """
+
+    replica_actions = frozenset()
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if (
+            request.method in SAFE_METHODS
+            and self.action in self.replica_actions
+            and replica_alias() is not None
+            and not (
+                request.user.is_authenticated
+                and is_pinned_to_primary(request.user.pk)
+            )
+        ):
+            self._replica_token = _use_replica.set(True)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, "_replica_token", None)
+        if token is not None:
+            _use_replica.reset(token)
+            self._replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
@@ -0,0 +1,34 @@
+"""
+Connection pool metrics for PostgreSQL deployments running with DB_POOL=1.
+
+psycopg_pool keeps counters (connections handed out, requests that had to wait,
+time spent waiting, ...) per pool. Each gunicorn worker process owns its own pool,
+so the numbers returned here describe the worker that served the request.
+"""
+
+from django.db import connections
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+
+def pool_stats(alias="default"):
+    """Return psycopg_pool statistics for alias, or None when it is not pooled."""
+    connection = connections[alias]
+    pool = getattr(connection, "pool", None)
+    if pool is None:
+        return None
+    return pool.get_stats()
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def db_pool_stats(request: Request) -> Response:
+    """GET /api/v1/ops/db-pool/ - pool statistics for every pooled database alias."""
+    stats = {}
+    for alias in connections:
+        alias_stats = pool_stats(alias)
+        if alias_stats is not None:
+            stats[alias] = alias_stats
+    return Response({"pooled": bool(stats), "pools": stats})
@@ -0,0 +1,404 @@
+"""
+Per-route performance instrumentation.
+
+PerformanceMiddleware times every request that resolves to a view and records:
+
+- wall time for the whole request,
+- number of DB queries and time spent in them (via connection.execute_wrapper),
+- serialize time (serializers building response.data from model instances; only
+  serializers that mix in TimedSerializerMixin are counted, and DB queries they trigger
+  are counted in both),
+- render time (the renderer turning response.data into bytes),
+- response size.
+
+Each request gets a Server-Timing header (visible in browser dev tools) and the numbers
+are aggregated into histograms labeled by DRF view and action name, served in the
+Prometheus text format at /metrics. Histograms live in process memory, so each
+gunicorn worker reports its own series. Background jobs (jobs/queue.py) record
+gymbuddy_job_* series the same way, in whichever process ran them: inline jobs show
+up on the web /metrics, and `run_worker --metrics-port` exports a worker's through
+serve_metrics().
+"""
+
+import threading
+import time
+from contextlib import ExitStack
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework import serializers
+
+from django_project.dbpool import pool_stats
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+class Histogram:
+    """A labeled Prometheus-style histogram with cumulative buckets."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = {
+                    "counts": [0] * len(self.buckets),
+                    "sum": 0.0,
+                    "count": 0,
+                }
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["counts"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            items = sorted(self._series.items())
+            for key, series in items:
+                base = _format_labels(key)
+                for bound, count in zip(self.buckets, series["counts"]):
+                    lines.append(
+                        f'{self.name}_bucket{_format_labels(key, le=_format_value(bound))} {count}'
+                    )
+                lines.append(
+                    f'{self.name}_bucket{_format_labels(key, le="+Inf")} {series["count"]}'
+                )
+                lines.append(f"{self.name}_sum{base} {_format_value(series['sum'])}")
+                lines.append(f"{self.name}_count{base} {series['count']}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+
+class Counter:
+    def __init__(self, name, documentation):
+        self.name = name
+        self.documentation = documentation
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, labels, amount=1):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def collect(self):
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(key)} {value}")
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+def _format_value(value):
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(key, **extra):
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in pairs) + "}"
+
+
+REQUESTS = Counter("gymbuddy_http_requests_total", "Requests by view, action and status.")
+REQUEST_DURATION = Histogram(
+    "gymbuddy_http_request_duration_seconds",
+    "Wall time spent handling the request.",
+    DURATION_BUCKETS,
+)
+DB_QUERIES = Histogram(
+    "gymbuddy_http_db_queries",
+    "Database queries issued per request.",
+    QUERY_COUNT_BUCKETS,
+)
+DB_DURATION = Histogram(
+    "gymbuddy_http_db_duration_seconds",
+    "Time spent executing database queries per request.",
+    DURATION_BUCKETS,
+)
+SERIALIZE_DURATION = Histogram(
+    "gymbuddy_http_serialize_duration_seconds",
+    "Time spent in serializers building the response data.",
+    DURATION_BUCKETS,
+)
+RENDER_DURATION = Histogram(
+    "gymbuddy_http_render_duration_seconds",
+    "Time spent rendering the response data to bytes.",
+    DURATION_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "gymbuddy_http_response_size_bytes",
+    "Size of the response body.",
+    SIZE_BUCKETS,
+)
+JOBS = Counter("gymbuddy_jobs_total", "Background jobs run, by task and outcome.")
+JOB_DURATION = Histogram(
+    "gymbuddy_job_duration_seconds",
+    "Wall time spent running a background job.",
+    DURATION_BUCKETS,
+)
+JOB_QUERIES = Histogram(
+    "gymbuddy_job_db_queries",
+    "Database queries issued per background job.",
+    QUERY_COUNT_BUCKETS,
+)
+METRICS = (
+    REQUESTS,
+    REQUEST_DURATION,
+    DB_QUERIES,
+    DB_DURATION,
+    SERIALIZE_DURATION,
+    RENDER_DURATION,
+    RESPONSE_SIZE,
+    JOBS,
+    JOB_DURATION,
+    JOB_QUERIES,
+)
+
+
+class QueryRecorder:
+    """connection.execute_wrapper callable that counts and times queries."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class SerializeTimer:
+    """Seconds spent in top-level serializer .data during one request."""
+
+    def __init__(self):
+        self.duration = 0.0
+        self.active = False
+
+
+_serialize_timer = ContextVar("serialize_timer", default=None)
+
+
+class TimedSerializerMixin:
+    """
+    Serializer mixin: add the time spent producing .data to the current request's
+    serialize timing. Only the outermost .data is timed, so a serializer that builds
+    another one's .data inside its own is not counted twice. many=True gets a timed
+    ListSerializer too.
+    """
+
+    @property
+    def data(self):
+        timer = _serialize_timer.get()
+        if timer is None or timer.active:
+            return super().data
+        timer.active = True
+        start = time.perf_counter()
+        try:
+            return super().data
+        finally:
+            timer.duration += time.perf_counter() - start
+            timer.active = False
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        serializer = super().many_init(*args, **kwargs)
+        if type(serializer) is serializers.ListSerializer:
+            serializer.__class__ = TimedListSerializer
+        return serializer
+
+
+class TimedListSerializer(TimedSerializerMixin, serializers.ListSerializer):
+    pass
+
+
+def view_labels(view_func, method):
+    """Return {"view", "action"} labels for a resolved view function."""
+    cls = getattr(view_func, "cls", None)
+    view = cls.__name__ if cls is not None else getattr(view_func, "__name__", "unknown")
+    actions = getattr(view_func, "actions", None) or {}
+    action = actions.get(method.lower(), method.lower())
+    return {"view": view, "action": action}
+
+
+def skip_metrics(view_func):
+    """Mark a view so PerformanceMiddleware does not record it."""
+    view_func.skip_perf_metrics = True
+    return view_func
+
+
+class PerformanceMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        serialize = SerializeTimer()
+        token = _serialize_timer.set(serialize)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for conn in connections.all():
+                    stack.enter_context(conn.execute_wrapper(recorder))
+                response = self.get_response(request)
+        finally:
+            _serialize_timer.reset(token)
+        elapsed = time.perf_counter() - start
+
+        labels = getattr(request, "_perf_labels", None)
+        if labels is None:
+            return response
+        render = getattr(request, "_perf_render_seconds", 0.0)
+        size = None if response.streaming else len(response.content)
+
+        REQUESTS.inc({**labels, "status": str(response.status_code)})
+        REQUEST_DURATION.observe(labels, elapsed)
+        DB_QUERIES.observe(labels, recorder.count)
+        DB_DURATION.observe(labels, recorder.duration)
+        SERIALIZE_DURATION.observe(labels, serialize.duration)
+        RENDER_DURATION.observe(labels, render)
+        if size is not None:
+            RESPONSE_SIZE.observe(labels, size)
+
+        if getattr(settings, "SERVER_TIMING", True):
+            response["Server-Timing"] = ", ".join(
+                [
+                    f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries"',
+                    f"serialize;dur={serialize.duration * 1000:.1f}",
+                    f"render;dur={render * 1000:.1f}",
+                    f"total;dur={elapsed * 1000:.1f}",
+                ]
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, "skip_perf_metrics", False):
+            return None
+        request._perf_labels = view_labels(view_func, request.method)
+        return None
+
+    def process_template_response(self, request, response):
+        started = time.perf_counter()
+
+        def rendered(_response):
+            request._perf_render_seconds = time.perf_counter() - started
+
+        response.add_post_render_callback(rendered)
+        return response
+
+
+def _pool_lines():
+    pools = {alias: pool_stats(alias) for alias in connections}
+    pools = {alias: stats for alias, stats in pools.items() if stats is not None}
+    lines = []
+    for key in ("pool_size", "pool_available", "requests_waiting"):
+        name = f"gymbuddy_db_{key}"
+        lines.append(f"# TYPE {name} gauge")
+        for alias, stats in pools.items():
+            lines.append(f'{name}{{alias="{alias}"}} {stats.get(key, 0)}')
+    return lines if pools else []
+
+
+def render_metrics():
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.collect())
+    lines.extend(_pool_lines())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    for metric in METRICS:
+        metric.reset()
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _authorized(authorization):
+    token = getattr(settings, "METRICS_TOKEN", "")
+    return not token or constant_time_compare(authorization, f"Bearer {token}")
+
+
+@skip_metrics
+def metrics_view(request):
+    """
+    GET /metrics - Prometheus text exposition.
+
+    Requires "Authorization: Bearer $METRICS_TOKEN" when METRICS_TOKEN is set; without a
+    token the endpoint only exists in DEBUG.
+    """
+    if not getattr(settings, "METRICS_TOKEN", "") and not settings.DEBUG:
+        raise Http404
+    if not _authorized(request.headers.get("Authorization", "")):
+        return HttpResponse(status=401)
+    return HttpResponse(render_metrics(), content_type=CONTENT_TYPE)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        if not _authorized(self.headers.get("Authorization", "")):
+            self.send_error(401)
+            return
+        body = render_metrics().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", CONTENT_TYPE)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # one line per scrape is noise
+
+
+def serve_metrics(port, host=""):
+    """
+    Serve this process's metrics at http://host:port/metrics from a daemon thread, for
+    processes that don't run the web app (run_worker). Same METRICS_TOKEN rule as
+    metrics_view, except that choosing a port is opt-in enough to work without one.
+    Returns the server; call shutdown() to stop it.
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    return server
@@ -0,0 +1,129 @@
+"""
+N+1 query detection.
+
+NPlusOneMiddleware fingerprints every SQL statement a request runs (literals and
+placeholder lists stripped, so `WHERE id = 1` and `WHERE id = 2` look the same) and
+flags any shape that repeats NPLUSONE_THRESHOLD or more times: the signature of a
+query issued inside a loop.
+
+NPLUSONE_MODE decides what happens then:
+
+- "raise": raise NPlusOneError (opt-in for development; the API test base class forces
+  this so regressions fail tests). Only for safe methods: by the time the middleware
+  sees an unsafe request's queries its writes are committed, so failing the response
+  would tell the client nothing was saved. Unsafe requests get an error log instead,
+- "log": log a warning with the view, the SQL shape and the stack that issued it, for a
+  NPLUSONE_SAMPLE_RATE fraction of requests (production),
+- "off": do nothing.
+"""
+
+import logging
+import random
+import re
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from rest_framework.permissions import SAFE_METHODS
+
+from django_project.metrics import view_labels
+
+logger = logging.getLogger(__name__)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)")
+_SPACE = re.compile(r"\s+")
+_IGNORED = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT", "BEGIN", "COMMIT")
+
+
+class NPlusOneError(Exception):
+    """A request ran the same query shape too many times."""
+
+
+def fingerprint(sql):
+    """Reduce SQL to its shape: no literals, placeholder lists collapsed, single spaces."""
+    shape = _STRING.sub("?", sql)
+    shape = _NUMBER.sub("?", shape)
+    shape = shape.replace("%s", "?")
+    shape = _PLACEHOLDER_LIST.sub("(...)", shape)
+    return _SPACE.sub(" ", shape).strip()
+
+
+def _app_stack():
+    """Stack frames from project code only, innermost last."""
+    base = str(settings.BASE_DIR)
+    frames = [
+        f
+        for f in traceback.extract_stack()[:-2]
+        if f.filename.startswith(base) and "site-packages" not in f.filename
+    ]
+    return "".join(traceback.format_list(frames))
+
+
+class QueryPatternRecorder:
+    """connection.execute_wrapper that counts statements per fingerprint."""
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.stacks = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        if not sql.lstrip().upper().startswith(_IGNORED):
+            shape = fingerprint(sql)
+            self.counts[shape] += 1
+            if self.counts[shape] == self.threshold:
+                self.stacks[shape] = _app_stack()
+        return execute(sql, params, many, context)
+
+    def offenders(self):
+        return [
+            (shape, count)
+            for shape, count in self.counts.most_common()
+            if count >= self.threshold
+        ]
+
+
+class NPlusOneMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        mode = getattr(settings, "NPLUSONE_MODE", "off")
+        if mode == "off" or (
+            mode == "log" and random.random() >= getattr(settings, "NPLUSONE_SAMPLE_RATE", 0.1)
+        ):
+            return self.get_response(request)
+
+        recorder = QueryPatternRecorder(getattr(settings, "NPLUSONE_THRESHOLD", 5))
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            response = self.get_response(request)
+
+        offenders = recorder.offenders()
+        if not offenders:
+            return response
+        labels = getattr(request, "_nplusone_labels", None) or {"view": request.path, "action": ""}
+        shape, count = offenders[0]
+        message = (
+            f"N+1 queries in {labels['view']}.{labels['action']} ({request.method} {request.path}): "
+            f"{count}x {shape}"
+        )
+        if mode == "raise" and request.method in SAFE_METHODS:
+            raise NPlusOneError(f"{message}\n{recorder.stacks.get(shape, '')}")
+        logger.log(
+            logging.ERROR if mode == "raise" else logging.WARNING,
+            "%s\n%s",
+            message,
+            recorder.stacks.get(shape, ""),
+            extra={"view": labels["view"], "action": labels["action"], "offenders": offenders},
+        )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._nplusone_labels = view_labels(view_func, request.method)
+        return None
@@ -70,11 +70,17 @@ INSTALLED_APPS = [
     # Local
     "accounts.apps.AccountsConfig",
     "workouts.apps.WorkoutsConfig",
+    "jobs.apps.JobsConfig",
 ]
 
 AUTH_USER_MODEL = "accounts.User"
 
 MIDDLEWARE = [
+    # First so its timings cover every other middleware as well as the view.
+    "django_project.metrics.PerformanceMiddleware",
+    # Right inside the metrics so response sizes are counted as sent on the wire.
+    "django_project.compression.CompressionMiddleware",
+    "django_project.nplusone.NPlusOneMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "whitenoise.middleware.WhiteNoiseMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -82,12 +88,46 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django_project.db_router.ReplicaPinMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
 ROOT_URLCONF = "django_project.urls"
 
+# Per-request Server-Timing header (db / serialize / render / total) from PerformanceMiddleware.
+SERVER_TIMING = os.environ.get("SERVER_TIMING", "True").lower() in ("true", "1", "yes")
+# Bearer token required to scrape /metrics. Without one, /metrics is only served in DEBUG.
+METRICS_TOKEN = os.environ.get("METRICS_TOKEN", "")
+
+# Response compression (django_project/compression.py): smallest body worth compressing,
+# and server preference among codings the client accepts (br/zstd need their modules).
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", "1024"))
+COMPRESSION_ENCODINGS = [
+    c.strip() for c in os.environ.get("COMPRESSION_ENCODINGS", "zstd,br,gzip").split(",") if c.strip()
+]
+
+# Rows per chunk for streamed list responses (?stream=1, django_project/streaming.py):
+# one prefetch round and one rendered fragment per chunk bounds the memory a response holds.
+STREAMING_CHUNK_SIZE = int(os.environ.get("STREAMING_CHUNK_SIZE", "100"))
+
+# N+1 detection (django_project/nplusone.py): "raise", "log" or "off". "raise" is opt-in
+# for development (the test suite forces it); it never fails a request that wrote.
+NPLUSONE_MODE = os.environ.get("NPLUSONE_MODE", "log")
+NPLUSONE_THRESHOLD = int(os.environ.get("NPLUSONE_THRESHOLD", "5"))
+NPLUSONE_SAMPLE_RATE = float(os.environ.get("NPLUSONE_SAMPLE_RATE", "0.05"))
+
+# Signed access/refresh tokens (accounts/tokens.py), alongside the DRF database tokens.
+SIGNED_TOKEN_ACCESS_SECONDS = int(os.environ.get("SIGNED_TOKEN_ACCESS_SECONDS", "900"))
+SIGNED_TOKEN_REFRESH_DAYS = int(os.environ.get("SIGNED_TOKEN_REFRESH_DAYS", "30"))
+
+# Background jobs (jobs/queue.py). Until a `manage.py run_worker` process is deployed
+# next to the web server, JOBS_INLINE runs enqueued tasks in the request as before.
+JOBS_INLINE = os.environ.get("JOBS_INLINE", "True").lower() in ("true", "1", "yes")
+JOBS_MAX_ATTEMPTS = int(os.environ.get("JOBS_MAX_ATTEMPTS", "3"))
+# Seconds before the first retry of a failed job; doubles with each further attempt.
+JOBS_RETRY_BACKOFF = int(os.environ.get("JOBS_RETRY_BACKOFF", "10"))
+
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
@@ -110,8 +150,18 @@ WSGI_APPLICATION = "django_project.wsgi.application"
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 
+# Set DB_POOL=1 to use psycopg 3's connection pool instead of one persistent
+# connection per worker thread. Django refuses persistent connections alongside
+# a pool, so conn_max_age drops to 0 and the pool owns connection lifetime.
+DB_POOL = os.environ.get("DB_POOL", "").lower() in ("true", "1", "yes")
+
 if os.environ.get("DATABASE_URL"):
-    DATABASES = {"default": dj_database_url.config(conn_max_age=600)}
+    DATABASES = {
+        "default": dj_database_url.config(
+            conn_max_age=0 if DB_POOL else 600,
+            conn_health_checks=True,
+        )
+    }
 else:
     DATABASES = {
         "default": {
@@ -120,6 +170,91 @@ else:
         }
     }
 
+# Optional read replica, used only by views that opt in (see django_project/db_router.py).
+# Two local SQLite files work too: DATABASE_REPLICA_URL=sqlite:////path/to/replica.sqlite3
+if os.environ.get("DATABASE_REPLICA_URL"):
+    DATABASES["replica"] = dj_database_url.parse(
+        os.environ["DATABASE_REPLICA_URL"],
+        conn_max_age=0 if DB_POOL else 600,
+        conn_health_checks=True,
+    )
+    DATABASES["replica"]["TEST"] = {"MIRROR": "default"}
+
+if DB_POOL:
+    from psycopg_pool import ConnectionPool
+
+    for db in DATABASES.values():
+        if db["ENGINE"] != "django.db.backends.postgresql":
+            continue
+        db.setdefault("OPTIONS", {})["pool"] = {
+            "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", "2")),
+            "max_size": int(os.environ.get("DB_POOL_MAX_SIZE", "10")),
+            "timeout": float(os.environ.get("DB_POOL_TIMEOUT", "10")),
+            "max_idle": float(os.environ.get("DB_POOL_MAX_IDLE", "600")),
+            # Ping connections on checkout so a dropped Cloud SQL socket is
+            # replaced instead of surfacing as an OperationalError mid-request.
+            "check": ConnectionPool.check_connection,
+        }
+
+# Opt-in SQLite profile for small installs that run on the file database on purpose.
+# WAL lets readers proceed during a write; BEGIN IMMEDIATE takes the write lock at the
+# start of a transaction so concurrent writers queue on busy_timeout instead of failing
+# with "database is locked" when a read lock can't be upgraded mid-transaction.
+SQLITE_TUNED = os.environ.get("SQLITE_TUNED", "").lower() in ("true", "1", "yes")
+SQLITE_BUSY_TIMEOUT = int(os.environ.get("SQLITE_BUSY_TIMEOUT", "20"))
+SQLITE_TUNED_OPTIONS = {
+    "transaction_mode": "IMMEDIATE",
+    "timeout": SQLITE_BUSY_TIMEOUT,
+    "init_command": ";".join(
+        [
+            "PRAGMA journal_mode=WAL",
+            "PRAGMA synchronous=NORMAL",
+            f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT * 1000}",
+            f"PRAGMA mmap_size={int(os.environ.get('SQLITE_MMAP_SIZE', 134217728))}",
+            # Negative cache_size is in KiB rather than pages.
+            f"PRAGMA cache_size=-{int(os.environ.get('SQLITE_CACHE_KIB', 20000))}",
+            "PRAGMA temp_store=MEMORY",
+        ]
+    ),
+}
+
+if SQLITE_TUNED:
+    for db in DATABASES.values():
+        if db["ENGINE"] == "django.db.backends.sqlite3":
+            db["OPTIONS"] = dict(SQLITE_TUNED_OPTIONS)
+
+DATABASE_ROUTERS = ["django_project.db_router.PrimaryReplicaRouter"]
+DATABASE_REPLICA_ALIAS = "replica"
+# How long a user's reads stay on the primary after they write, so replication lag
+# never hides their own changes. Pins live in the default cache, so a replica needs a
+# shared CACHE_URL: a per-process cache would only pin the worker that took the write.
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", "5"))
+
+# Shared cache for everything that must hold across processes (replica pins, ...):
+# redis://host:6379/0, memcached://host:11211 or db://table_name (run createcachetable).
+# Unset means a per-process in-memory cache, fine for one worker and for tests.
+CACHE_URL = os.environ.get("CACHE_URL", "")
+if CACHE_URL.startswith(("redis://", "rediss://")):
+    CACHES = {
+        "default": {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": CACHE_URL}
+    }
+elif CACHE_URL.startswith("memcached://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.memcached.PyMemcacheCache",
+            "LOCATION": CACHE_URL.removeprefix("memcached://"),
+        }
+    }
+elif CACHE_URL.startswith("db://"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": CACHE_URL.removeprefix("db://"),
+        }
+    }
+else:
+    CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
@@ -169,8 +304,14 @@ REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
         "rest_framework.authentication.SessionAuthentication",
         "rest_framework.authentication.TokenAuthentication",
+        "accounts.authentication.SignedTokenAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # orjson-backed when installed; byte-for-byte the same output as JSONRenderer.
+    "DEFAULT_RENDERER_CLASSES": [
+        "django_project.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
@@ -4,11 +4,19 @@ from rest_framework.authtoken.views import obtain_auth_token
 from rest_framework.decorators import permission_classes
 from rest_framework.permissions import AllowAny
 
+from accounts.views import obtain_signed_token, refresh_signed_token, revoke_signed_tokens
+from django_project.dbpool import db_pool_stats
+from django_project.metrics import metrics_view
 from firebase_auth import exchange_firebase_token
 
 urlpatterns = [
     path("admin/", admin.site.urls),
+    path("metrics", metrics_view),
     path("api/v1/auth/token/", permission_classes([AllowAny])(obtain_auth_token)),
     path("api/v1/auth/firebase-token/", exchange_firebase_token),
+    path("api/v1/auth/signed-token/", obtain_signed_token),
+    path("api/v1/auth/signed-token/refresh/", refresh_signed_token),
+    path("api/v1/auth/signed-token/revoke/", revoke_signed_tokens),
+    path("api/v1/ops/db-pool/", db_pool_stats),
     path("api/v1/", include("workouts.urls")),
 ]
@@ -24,6 +24,7 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 
 from accounts.models import UserIdentity
+from accounts.tokens import issue_pair
 
 User = get_user_model()
 
@@ -57,7 +58,12 @@ def _init_firebase():
 @api_view(["POST"])
 @permission_classes([AllowAny])
 def exchange_firebase_token(request: Request) -> Response:
-    """Exchange Firebase ID token for Django REST token."""
+    """
+    Exchange Firebase ID token for Django REST token.
+
+    Send "token_type": "signed" to get a signed access/refresh pair (accounts/tokens.py)
+    instead of the permanent database token.
+    """
     id_token = request.data.get("id_token")
     if not id_token or not isinstance(id_token, str):
         return Response(
@@ -105,6 +111,8 @@ def exchange_firebase_token(request: Request) -> Response:
                     provider=UserIdentity.Provider.FIREBASE,
                     provider_uid=uid,
                 )
+        if request.data.get("token_type") == "signed":
+            return Response(issue_pair(user))
         token, _ = Token.objects.get_or_create(user=user)
         return Response({"token": token.key})
     except FileNotFoundError as e:
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["task", "status", "attempts", "run_after", "duration_ms", "created_at"]
+    list_filter = ["status", "task"]
+    search_fields = ["task", "last_error"]
+    readonly_fields = ["claim", "locked_at", "finished_at", "duration_ms", "queries", "last_error"]
@@ -0,0 +1,117 @@
+"""
+Run background jobs from the database queue (see jobs/queue.py).
+
+    python manage.py run_worker                          # 1 process, 4 threads, forever
+    python manage.py run_worker --processes 2 --threads 8
+    python manage.py run_worker --burst                  # drain what's ready, then exit
+    python manage.py run_worker --processes 2 --metrics-port 9100   # :9100 and :9101
+
+SIGINT/SIGTERM stop claiming and let in-flight jobs finish. Each process prints
+per-task timings (count, p50/p95/max ms) when it exits. The gymbuddy_job_* metrics
+live in the process that ran the job, so with --metrics-port each process serves its
+own /metrics on the port plus its index.
+"""
+
+import json
+import multiprocessing
+import os
+import signal
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from django_project.metrics import serve_metrics
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = "Claim and run queued background jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--processes", type=int, default=1, help="worker processes to fork")
+        parser.add_argument("--threads", type=int, default=4, help="jobs in flight per process")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="seconds between polls when idle")
+        parser.add_argument(
+            "--stale-after",
+            type=int,
+            default=600,
+            help=(
+                "requeue RUNNING jobs locked longer than this many seconds (their worker "
+                "died); every task must finish well within it"
+            ),
+        )
+        parser.add_argument("--burst", action="store_true", help="exit when no job is ready")
+        parser.add_argument("--max-jobs", type=int, help="exit after running this many jobs (per process)")
+        parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+        parser.add_argument(
+            "--metrics-port",
+            type=int,
+            help="serve Prometheus metrics at /metrics on this port (plus the process index)",
+        )
+
+    def handle(self, *args, **options):
+        if options["processes"] < 1 or options["threads"] < 1:
+            raise CommandError("--processes and --threads must be at least 1")
+        if options["processes"] == 1:
+            self._work(options)
+            return
+
+        # Children must not share the parent's database sockets.
+        connections.close_all()
+        ctx = multiprocessing.get_context("fork")
+        children = [
+            ctx.Process(target=self._work, args=(options, index))
+            for index in range(options["processes"])
+        ]
+        for child in children:
+            child.start()
+
+        def forward(signum, frame):
+            for child in children:
+                if child.is_alive():
+                    os.kill(child.pid, signum)
+
+        signal.signal(signal.SIGTERM, forward)
+        signal.signal(signal.SIGINT, forward)
+        for child in children:
+            child.join()
+        failed = [c.exitcode for c in children if c.exitcode]
+        if failed:
+            raise CommandError(f"{len(failed)} worker process(es) exited with errors")
+
+    def _work(self, options, index=0):
+        server = None
+        if options["metrics_port"] is not None:
+            server = serve_metrics(options["metrics_port"] + index)
+        worker = Worker(
+            threads=options["threads"],
+            poll_interval=options["poll_interval"],
+            stale_after=timedelta(seconds=options["stale_after"]),
+        )
+        previous = {}
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            try:
+                previous[signum] = signal.signal(signum, lambda *_: worker.stop())
+            except ValueError:  # not the main thread (e.g. called from a test thread)
+                pass
+        try:
+            ran = worker.run(burst=options["burst"], max_jobs=options["max_jobs"])
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+            if server is not None:
+                server.shutdown()
+                server.server_close()
+        summary = {"pid": os.getpid(), "jobs": ran, **worker.summary()}
+        if options["json"]:
+            self.stdout.write(json.dumps(summary, indent=2))
+            return
+        outcomes = ", ".join(f"{n} {k}" for k, n in sorted(summary["outcomes"].items())) or "none"
+        self.stdout.write(f"worker {summary['pid']}: {ran} job(s) ({outcomes})")
+        if summary["tasks"]:
+            self.stdout.write(f"  {'task':<50}{'count':>6}{'p50 ms':>10}{'p95 ms':>10}{'max ms':>10}")
+        for name, row in summary["tasks"].items():
+            self.stdout.write(
+                f"  {name:<50}{row['count']:>6}{row['p50_ms']:>10}{row['p95_ms']:>10}{row['max_ms']:>10}"
+            )
@@ -0,0 +1,52 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """
+    One call of a registered task (see jobs/queue.py), waiting in or run by the queue.
+
+    Workers claim QUEUED rows whose run_after has passed; a claim stamps `claim` with a
+    token unique to that fetch, so the worker can read back exactly the rows it won.
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+
+    task = models.CharField(max_length=200)
+    kwargs = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED)
+    attempts = models.PositiveIntegerField(default=0)
+    max_attempts = models.PositiveIntegerField(default=3)
+    run_after = models.DateTimeField(default=timezone.now)
+    claim = models.CharField(max_length=64, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    duration_ms = models.FloatField(null=True, blank=True)
+    queries = models.PositiveIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # Partial: the ready scan never touches the (much larger) finished backlog.
+            models.Index(
+                fields=["run_after", "id"],
+                name="job_ready_idx",
+                condition=Q(status="queued"),
+            ),
+            models.Index(fields=["status", "locked_at"], name="job_status_locked_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.task} #{self.pk} ({self.status})"
@@ -0,0 +1,171 @@
+# jobs/queue.py
+"""
+A small job queue stored in the project database.
+
+Tasks are plain functions registered with @task (conventionally in an app's tasks.py,
+which JobsConfig autodiscovers). Callers enqueue them with JSON-serializable keyword
+arguments:
+
+    @task(max_attempts=5)
+    def refresh_user_exercises(user_id, exercise_ids): ...
+
+    refresh_user_exercises.enqueue(user_id=3, exercise_ids=[1, 2])
+
+enqueue() inserts a Job row on the caller's connection, so a job enqueued inside a
+transaction only becomes visible if that transaction commits. `manage.py run_worker`
+claims and runs queued jobs. With settings.JOBS_INLINE (the default until a worker is
+deployed, and in tests) enqueue() runs the task immediately instead.
+
+Claiming takes the oldest ready rows with SELECT ... FOR UPDATE SKIP LOCKED where the
+backend supports it (PostgreSQL), so concurrent workers never wait on each other's rows.
+SQLite has no row locks; there the claiming UPDATE only matches rows still QUEUED, and
+SQLite's single writer lock serializes it, so two workers can't both win a row.
+
+There is no heartbeat: a job still RUNNING after the worker's stale_after is taken for
+abandoned and handed out again, so tasks must finish well within it. The overrun run's
+outcome is then discarded (run_job only writes back while its claim is current), but
+its writes have committed, so tasks must also be safe to run twice.
+"""
+
+import logging
+import time
+import traceback
+import uuid
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from django_project.metrics import JOB_DURATION, JOB_QUERIES, JOBS, QueryRecorder
+
+from .models import Job
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(fn=None, *, name=None, max_attempts=None):
+    """Register fn as a task and give it an .enqueue(**kwargs) shortcut."""
+
+    def register(fn):
+        fn.task_name = name or f"{fn.__module__}.{fn.__qualname__}"
+        fn.max_attempts = max_attempts
+        fn.enqueue = lambda **kwargs: enqueue(fn, **kwargs)
+        _registry[fn.task_name] = fn
+        return fn
+
+    return register(fn) if fn is not None else register
+
+
+def get_task(name):
+    try:
+        return _registry[name]
+    except KeyError:
+        raise LookupError(f"no task registered as {name!r}") from None
+
+
+def enqueue(fn, *, delay=None, **kwargs):
+    """Queue fn(**kwargs); returns the Job, or None when it ran inline."""
+    if getattr(settings, "JOBS_INLINE", False):
+        fn(**kwargs)
+        return None
+    return Job.objects.create(
+        task=fn.task_name,
+        kwargs=kwargs,
+        max_attempts=fn.max_attempts or getattr(settings, "JOBS_MAX_ATTEMPTS", 3),
+        run_after=timezone.now() + (delay or timedelta()),
+    )
+
+
+def claim_jobs(limit):
+    """Mark up to `limit` ready jobs RUNNING for this caller and return them, oldest first."""
+    if limit <= 0:
+        return []
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    with transaction.atomic():
+        ready = Job.objects.filter(status=Job.QUEUED, run_after__lte=now).order_by("run_after", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            ready = ready.select_for_update(skip_locked=True)
+        ids = list(ready.values_list("id", flat=True)[:limit])
+        if not ids:
+            return []
+        Job.objects.filter(id__in=ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, claim=token, locked_at=now, attempts=F("attempts") + 1
+        )
+    return list(Job.objects.filter(id__in=ids, claim=token).order_by("run_after", "id"))
+
+
+def release_stale(older_than):
+    """
+    Requeue RUNNING jobs locked before now - older_than (their worker died), or mark
+    them FAILED when that was their last attempt. Returns how many were released.
+    """
+    now = timezone.now()
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=now - older_than)
+    failed = stale.filter(attempts__gte=F("max_attempts")).update(
+        status=Job.FAILED,
+        claim="",
+        finished_at=now,
+        last_error=f"worker lost: still running after {older_than}",
+    )
+    return failed + stale.update(status=Job.QUEUED, claim="", locked_at=None)
+
+
+def _retry_delay(attempts):
+    base = getattr(settings, "JOBS_RETRY_BACKOFF", 10)
+    return timedelta(seconds=base * 2 ** (attempts - 1))
+
+
+def run_job(job):
+    """
+    Run one claimed job in a transaction and record the outcome on its row.
+
+    A failure rolls the task's writes back and requeues the job with exponential backoff
+    until max_attempts, then marks it FAILED. Returns (outcome, seconds), where outcome
+    is "done", "retry" or "failed".
+    """
+    recorder = QueryRecorder()
+    start = time.perf_counter()
+    error = ""
+    try:
+        fn = get_task(job.task)
+        with ExitStack() as stack:
+            for conn in connections.all():
+                stack.enter_context(conn.execute_wrapper(recorder))
+            with transaction.atomic():
+                fn(**job.kwargs)
+    except Exception:
+        error = traceback.format_exc()
+        logger.exception("job %s (%s) failed on attempt %s", job.pk, job.task, job.attempts)
+    elapsed = time.perf_counter() - start
+
+    fields = {
+        "finished_at": timezone.now(),
+        "duration_ms": round(elapsed * 1000, 3),
+        "queries": recorder.count,
+        "last_error": error,
+        "claim": "",
+    }
+    if not error:
+        status, outcome = Job.DONE, "done"
+    elif job.attempts < job.max_attempts:
+        status, outcome = Job.QUEUED, "retry"
+        fields["run_after"] = timezone.now() + _retry_delay(job.attempts)
+        fields["locked_at"] = None
+        fields["finished_at"] = None
+    else:
+        status, outcome = Job.FAILED, "failed"
+    # Scoped to our claim: if release_stale() handed the job out again meanwhile, the
+    # new run owns the row.
+    Job.objects.filter(pk=job.pk, claim=job.claim).update(status=status, **fields)
+
+    labels = {"task": job.task}
+    JOBS.inc({**labels, "outcome": outcome})
+    JOB_DURATION.observe(labels, elapsed)
+    JOB_QUERIES.observe(labels, recorder.count)
+    return outcome, elapsed
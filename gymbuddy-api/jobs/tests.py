@@ -0,0 +1,221 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+from urllib.error import HTTPError
+from urllib.request import Request, urlopen
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APITestCase
+
+from django_project import metrics
+from workouts.models import Exercise, PerformedExercise, Session, UserExerciseNote
+
+from .models import Job
+from .queue import claim_jobs, enqueue, release_stale, run_job, task
+from .worker import Worker
+
+User = get_user_model()
+
+
+@task
+def create_exercise(name):
+    Exercise.objects.create(name=name, description="")
+
+
+@task(max_attempts=2)
+def create_then_fail(name):
+    Exercise.objects.create(name=name, description="")
+    raise RuntimeError("boom")
+
+
+@override_settings(JOBS_INLINE=False)
+class QueueTests(TestCase):
+    def test_inline_runs_immediately(self):
+        with override_settings(JOBS_INLINE=True):
+            self.assertIsNone(create_exercise.enqueue(name="Squat"))
+        self.assertTrue(Exercise.objects.filter(name="Squat").exists())
+        self.assertFalse(Job.objects.exists())
+
+    def test_enqueue_stores_the_call(self):
+        job = create_exercise.enqueue(name="Squat")
+        self.assertEqual(job.task, "jobs.tests.create_exercise")
+        self.assertEqual(job.kwargs, {"name": "Squat"})
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertFalse(Exercise.objects.filter(name="Squat").exists())
+
+    def test_claim_takes_ready_jobs_oldest_first_up_to_limit(self):
+        first = create_exercise.enqueue(name="A")
+        second = create_exercise.enqueue(name="B")
+        create_exercise.enqueue(name="C")
+        enqueue(create_exercise, delay=timedelta(hours=1), name="Later")
+
+        claimed = claim_jobs(2)
+        self.assertEqual([j.pk for j in claimed], [first.pk, second.pk])
+        self.assertTrue(all(j.status == Job.RUNNING and j.attempts == 1 for j in claimed))
+        self.assertEqual([j.kwargs["name"] for j in claim_jobs(5)], ["C"])
+        self.assertEqual(claim_jobs(5), [])
+
+    def test_run_job_records_outcome_and_timing(self):
+        create_exercise.enqueue(name="Squat")
+        (job,) = claim_jobs(1)
+        outcome, _ = run_job(job)
+        self.assertEqual(outcome, "done")
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.DONE)
+        self.assertIsNotNone(job.finished_at)
+        self.assertGreaterEqual(job.duration_ms, 0)
+        self.assertGreaterEqual(job.queries, 1)
+        self.assertTrue(Exercise.objects.filter(name="Squat").exists())
+
+    @override_settings(JOBS_RETRY_BACKOFF=0)
+    def test_failures_roll_back_retry_then_fail(self):
+        create_then_fail.enqueue(name="Ghost")
+        self.assertEqual(Job.objects.get().max_attempts, 2)
+
+        (job,) = claim_jobs(1)
+        with self.assertLogs("jobs.queue", "ERROR"):
+            self.assertEqual(run_job(job)[0], "retry")
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertIn("RuntimeError: boom", job.last_error)
+        self.assertFalse(Exercise.objects.filter(name="Ghost").exists())
+
+        (job,) = claim_jobs(1)
+        with self.assertLogs("jobs.queue", "ERROR"):
+            self.assertEqual(run_job(job)[0], "failed")
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 2))
+
+    def test_retry_backs_off(self):
+        create_then_fail.enqueue(name="Ghost")
+        with self.assertLogs("jobs.queue", "ERROR"):
+            run_job(claim_jobs(1)[0])
+        self.assertEqual(claim_jobs(1), [])
+        self.assertGreater(Job.objects.get().run_after, timezone.now() + timedelta(seconds=5))
+
+    def test_unknown_task_fails_the_job(self):
+        Job.objects.create(task="nope.missing", max_attempts=1)
+        (job,) = claim_jobs(1)
+        with self.assertLogs("jobs.queue", "ERROR"):
+            self.assertEqual(run_job(job)[0], "failed")
+        self.assertIn("no task registered", Job.objects.get().last_error)
+
+    def test_release_stale_requeues_abandoned_jobs(self):
+        create_exercise.enqueue(name="Squat")
+        claim_jobs(1)
+        self.assertEqual(release_stale(timedelta(minutes=10)), 0)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(release_stale(timedelta(minutes=10)), 1)
+        self.assertEqual(len(claim_jobs(1)), 1)
+
+    def test_release_stale_fails_jobs_out_of_attempts(self):
+        Job.objects.create(task="jobs.tests.create_exercise", kwargs={"name": "Squat"}, max_attempts=1)
+        claim_jobs(1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(release_stale(timedelta(minutes=10)), 1)
+        job = Job.objects.get()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 1))
+        self.assertIn("worker lost", job.last_error)
+        self.assertEqual(claim_jobs(1), [])
+
+    def test_overrun_run_does_not_overwrite_its_successor(self):
+        create_exercise.enqueue(name="Squat")
+        (overrun,) = claim_jobs(1)
+        Job.objects.update(locked_at=timezone.now() - timedelta(hours=1))
+        release_stale(timedelta(minutes=10))
+        (current,) = claim_jobs(1)
+        self.assertEqual(run_job(current)[0], "done")
+        with self.assertLogs("jobs.queue", "ERROR"):  # the exercise exists by now
+            self.assertEqual(run_job(overrun)[0], "retry")
+        self.assertEqual(Job.objects.get().status, Job.DONE)
+
+
+@override_settings(JOBS_INLINE=False)
+class RunWorkerCommandTests(TransactionTestCase):
+    # One thread: the shared-cache in-memory test database fails concurrent writers with
+    # "table is locked" instead of waiting on busy_timeout as a file database does.
+
+    def test_burst_drains_the_queue(self):
+        for i in range(6):
+            create_exercise.enqueue(name=f"Exercise {i}")
+        out = StringIO()
+        call_command("run_worker", burst=True, threads=1, poll_interval=0.01, json=True, stdout=out)
+        summary = json.loads(out.getvalue())
+        self.assertEqual(summary["jobs"], 6)
+        self.assertEqual(summary["outcomes"], {"done": 6})
+        self.assertEqual(summary["tasks"]["jobs.tests.create_exercise"]["count"], 6)
+        self.assertEqual(Exercise.objects.count(), 6)
+        self.assertFalse(Job.objects.exclude(status=Job.DONE).exists())
+
+    def test_max_jobs(self):
+        for i in range(3):
+            create_exercise.enqueue(name=f"Exercise {i}")
+        out = StringIO()
+        call_command("run_worker", max_jobs=2, threads=1, poll_interval=0.01, json=True, stdout=out)
+        self.assertEqual(json.loads(out.getvalue())["jobs"], 2)
+        self.assertEqual(Job.objects.filter(status=Job.QUEUED).count(), 1)
+
+    def test_database_errors_back_off_instead_of_crashing(self):
+        create_exercise.enqueue(name="Squat")
+        calls = []
+
+        def flaky_claim(limit):
+            calls.append(limit)
+            if len(calls) < 3:
+                raise OperationalError("server closed the connection unexpectedly")
+            return claim_jobs(limit)
+
+        worker = Worker(threads=1, poll_interval=0.01)
+        with mock.patch("jobs.worker.claim_jobs", flaky_claim):
+            with self.assertLogs("jobs.worker", "ERROR") as logs:
+                self.assertEqual(worker.run(burst=True), 1)
+        self.assertEqual(len(logs.records), 2)
+        self.assertTrue(Exercise.objects.filter(name="Squat").exists())
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_worker_exports_job_metrics(self):
+        metrics.reset_metrics()
+        create_exercise.enqueue(name="Squat")
+        Worker(threads=1, poll_interval=0.01).run(burst=True)
+        server = metrics.serve_metrics(0, host="127.0.0.1")
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with self.assertRaises(HTTPError) as denied:
+            urlopen(url)
+        self.assertEqual(denied.exception.code, 401)
+        with urlopen(Request(url, headers={"Authorization": "Bearer s3cret"})) as r:
+            body = r.read().decode()
+        self.assertIn('gymbuddy_jobs_total{outcome="done",task="jobs.tests.create_exercise"} 1', body)
+
+
+@override_settings(JOBS_INLINE=False, NPLUSONE_MODE="raise")
+class WorkoutJobsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            email="test@example.com", username="testuser", password="testpass123"
+        )
+        token = Token.objects.create(user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.squat = Exercise.objects.create(name="Squat", description="")
+        self.session = Session.objects.create(user=self.user)
+        PerformedExercise.objects.create(session=self.session, exercise=self.squat, order=1)
+        UserExerciseNote.objects.create(user=self.user, exercise=self.squat, note="go up")
+
+    def test_session_update_defers_note_clearing(self):
+        r = self.client.patch(
+            f"/api/v1/workouts/{self.session.id}/", {"notes": "done"}, format="json"
+        )
+        self.assertEqual(r.status_code, 200)
+        self.assertTrue(UserExerciseNote.objects.exists())
+
+        (job,) = claim_jobs(5)
+        self.assertEqual(job.task, "workouts.tasks.session_updated")
+        self.assertEqual(run_job(job)[0], "done")
+        self.assertFalse(UserExerciseNote.objects.exists())
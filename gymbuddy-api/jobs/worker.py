@@ -0,0 +1,118 @@
+# jobs/worker.py
+"""
+The loop behind `manage.py run_worker`.
+
+A Worker keeps up to `threads` jobs in flight on a thread pool, claiming only as many
+as it has free threads so other workers get the rest. Each thread uses (and closes)
+its own database connection. run_worker starts one Worker per process.
+
+A database error while claiming or releasing jobs (the database restarting, a dropped
+connection) doesn't kill the loop: the Worker logs it, drops its connections and
+retries with exponential backoff up to MAX_BACKOFF seconds.
+"""
+
+import logging
+import statistics
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.db import DatabaseError, connections
+
+from .queue import claim_jobs, release_stale, run_job
+
+logger = logging.getLogger(__name__)
+
+MAX_BACKOFF = 60.0
+
+
+class Worker:
+    def __init__(self, threads=1, poll_interval=1.0, stale_after=timedelta(minutes=10)):
+        self.threads = threads
+        self.poll_interval = poll_interval
+        self.stale_after = stale_after
+        self.stopping = threading.Event()
+        self._lock = threading.Lock()
+        self.timings = {}  # task -> [seconds, ...]
+        self.outcomes = {}  # outcome -> count
+        self._failures = 0  # consecutive database errors
+
+    def stop(self):
+        """Finish in-flight jobs, claim no more."""
+        self.stopping.set()
+
+    def run(self, burst=False, max_jobs=None):
+        """
+        Process jobs until stop(). With burst, return once nothing is ready or running;
+        with max_jobs, after that many jobs. Returns the number of jobs run.
+        """
+        ran = 0
+        self._queue_call(release_stale, self.stale_after)
+        with ThreadPoolExecutor(max_workers=self.threads, thread_name_prefix="job") as pool:
+            pending = set()
+            while not self.stopping.is_set():
+                free = self.threads - len(pending)
+                if max_jobs is not None:
+                    free = min(free, max_jobs - ran - len(pending))
+                jobs = self._queue_call(claim_jobs, free)
+                if jobs is None:
+                    # Backed off already; a failed claim doesn't mean the queue is empty.
+                    continue
+                for job in jobs:
+                    pending.add(pool.submit(self._run, job))
+                if not pending:
+                    if burst or (max_jobs is not None and ran >= max_jobs):
+                        break
+                    self.stopping.wait(self.poll_interval)
+                    self._queue_call(release_stale, self.stale_after)
+                    continue
+                done, pending = wait(pending, timeout=self.poll_interval, return_when=FIRST_COMPLETED)
+                ran += self._collect(done)
+            ran += self._collect(wait(pending).done)
+        connections.close_all()
+        return ran
+
+    def _queue_call(self, fn, *args):
+        """fn(*args), or None after logging a database error and backing off."""
+        try:
+            result = fn(*args)
+        except DatabaseError:
+            delay = min(self.poll_interval * 2**self._failures, MAX_BACKOFF)
+            self._failures += 1
+            logger.exception("%s failed; retrying in %.1fs", fn.__name__, delay)
+            connections.close_all()  # a broken connection reconnects on next use
+            self.stopping.wait(delay)
+            return None
+        self._failures = 0
+        return result
+
+    @staticmethod
+    def _collect(futures):
+        for future in futures:
+            if future.exception() is not None:
+                # run_job couldn't even record the outcome (e.g. the database went away);
+                # the job stays RUNNING until release_stale() hands it out again.
+                logger.error("worker thread crashed", exc_info=future.exception())
+        return len(futures)
+
+    def _run(self, job):
+        try:
+            outcome, seconds = run_job(job)
+        finally:
+            connections.close_all()  # this thread's connections only
+        with self._lock:
+            self.timings.setdefault(job.task, []).append(seconds)
+            self.outcomes[outcome] = self.outcomes.get(outcome, 0) + 1
+
+    def summary(self):
+        """Per-task count and p50/p95/max milliseconds, plus outcome totals."""
+        tasks = {}
+        for name, samples in sorted(self.timings.items()):
+            ordered = sorted(samples)
+            tasks[name] = {
+                "count": len(ordered),
+                "p50_ms": round(statistics.median(ordered) * 1000, 2),
+                "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2),
+                "max_ms": round(ordered[-1] * 1000, 2),
+            }
+        return {"outcomes": dict(self.outcomes), "tasks": tasks}
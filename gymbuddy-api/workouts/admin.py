@@ -1,11 +1,90 @@
 from django.contrib import admin
-from .models import Program, Exercise, Session, PerformedExercise, SetEntry, UserExerciseNote
+
+from . import taxonomy
+from .models import (
+    Program,
+    Exercise,
+    ExerciseMuscleGroup,
+    ExercisePercentiles,
+    MuscleGroup,
+    Session,
+    PerformedExercise,
+    Recommendations,
+    SetEntry,
+    UserExercise,
+    UserExerciseNote,
+    WeeklyMuscleVolume,
+)
+
+
+@admin.register(MuscleGroup)
+class MuscleGroupAdmin(admin.ModelAdmin):
+    list_display = ["name"]
+    search_fields = ["name"]
+
+
+class ExerciseMuscleGroupInline(admin.TabularInline):
+    model = ExerciseMuscleGroup
+    extra = 0
 
 
 @admin.register(Exercise)
 class ExerciseAdmin(admin.ModelAdmin):
-    list_display = ["name", "description"]
+    list_display = ["name", "movement_pattern", "description"]
+    list_filter = ["movement_pattern", "muscle_groups"]
     search_fields = ["name"]
+    inlines = [ExerciseMuscleGroupInline]
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        if not change:
+            # A new exercise added without contributions gets the default mapping.
+            taxonomy.apply([form.instance])
+        # New contributions apply to past sets too: rebuild the rollup of everyone
+        # who has done the exercise.
+        if any(formset.has_changed() for formset in formsets):
+            user_ids = list(
+                UserExercise.objects.filter(exercise=form.instance).values_list("user_id", flat=True)
+            )
+            if user_ids:
+                WeeklyMuscleVolume.rebuild(user_ids)
+
+
+class SessionResyncMixin:
+    """
+    ModelAdmin mixin for models that make up a session's history: after a save (inlines
+    included) or delete, resync the sessions involved, before and after the edit, so
+    their counters and history version follow. session_field is the path from the
+    model to its session id.
+    """
+
+    session_field = None
+
+    def _session_ids(self, queryset):
+        return set(queryset.values_list(self.session_field, flat=True))
+
+    def save_model(self, request, obj, form, change):
+        # A set or exercise moved to another session changes the old one too.
+        obj._sessions_before = (
+            self._session_ids(self.model.objects.filter(pk=obj.pk)) if change else set()
+        )
+        super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        obj = form.instance
+        after = self._session_ids(self.model.objects.filter(pk=obj.pk))
+        Session.resync(getattr(obj, "_sessions_before", set()) | after)
+
+    def delete_model(self, request, obj):
+        session_ids = self._session_ids(self.model.objects.filter(pk=obj.pk))
+        super().delete_model(request, obj)
+        Session.resync(session_ids)
+
+    def delete_queryset(self, request, queryset):
+        session_ids = self._session_ids(queryset)
+        super().delete_queryset(request, queryset)
+        Session.resync(session_ids)
 
 
 class SetEntryInline(admin.TabularInline):
@@ -28,7 +107,8 @@ class ProgramAdmin(admin.ModelAdmin):
 
 
 @admin.register(Session)
-class SessionAdmin(admin.ModelAdmin):
+class SessionAdmin(SessionResyncMixin, admin.ModelAdmin):
+    session_field = "pk"
     list_display = ["user", "program", "date", "name"]
     list_filter = ["date"]
     search_fields = ["user__username", "name"]
@@ -36,14 +116,16 @@ class SessionAdmin(admin.ModelAdmin):
 
 
 @admin.register(PerformedExercise)
-class PerformedExerciseAdmin(admin.ModelAdmin):
+class PerformedExerciseAdmin(SessionResyncMixin, admin.ModelAdmin):
+    session_field = "session_id"
     list_display = ["session", "exercise", "order"]
     list_filter = ["exercise"]
     inlines = [SetEntryInline]
 
 
 @admin.register(SetEntry)
-class SetEntryAdmin(admin.ModelAdmin):
+class SetEntryAdmin(SessionResyncMixin, admin.ModelAdmin):
+    session_field = "performed_exercise__session_id"
     list_display = ["performed_exercise", "order", "reps", "weight"]
     list_filter = ["performed_exercise__exercise"]
 
@@ -53,3 +135,39 @@ class UserExerciseNoteAdmin(admin.ModelAdmin):
     list_display = ["user", "exercise", "updated_at"]
     list_filter = ["exercise"]
     search_fields = ["user__username", "exercise__name", "note"]
+
+
+@admin.register(UserExercise)
+class UserExerciseAdmin(admin.ModelAdmin):
+    """Derived from workout history; rebuild with `manage.py sync_user_exercises`."""
+
+    list_display = ["user", "exercise", "times_performed", "last_performed_at"]
+    list_filter = ["exercise"]
+    search_fields = ["user__username", "exercise__name"]
+    readonly_fields = ["first_performed_at", "last_performed_at", "times_performed"]
+
+
+@admin.register(WeeklyMuscleVolume)
+class WeeklyMuscleVolumeAdmin(admin.ModelAdmin):
+    """Derived from workout history; rebuild with `manage.py rebuild_muscle_volume`."""
+
+    list_display = ["user", "week", "muscle_group", "sets", "volume"]
+    list_filter = ["muscle_group"]
+    search_fields = ["user__username"]
+    readonly_fields = ["sets", "volume"]
+
+
+@admin.register(ExercisePercentiles)
+class ExercisePercentilesAdmin(admin.ModelAdmin):
+    """Replaced nightly by `manage.py compute_percentiles`."""
+
+    list_display = ["exercise", "users", "computed_at"]
+    readonly_fields = ["exercise", "users", "cut_points", "computed_at"]
+
+
+@admin.register(Recommendations)
+class RecommendationsAdmin(admin.ModelAdmin):
+    """Replaced by `manage.py compute_recommendations` and the refresh task."""
+
+    list_display = ["user", "algorithm", "version", "computed_at"]
+    readonly_fields = ["user", "algorithm", "version", "computed_at", "exercises"]
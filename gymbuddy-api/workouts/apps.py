@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.core import checks
 
 
 class WorkoutsConfig(AppConfig):
     name = "workouts"
+
+    def ready(self):
+        from django_project.db_router import check_shared_cache
+
+        from . import search
+
+        checks.register(check_shared_cache, checks.Tags.caches)
+        checks.register(search.check_backend, checks.Tags.database)
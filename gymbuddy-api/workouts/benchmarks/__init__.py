@@ -0,0 +1,12 @@
+"""
+Performance benchmarks for the workouts API.
+
+- seed: bulk-generates realistic users and years of Session/PerformedExercise/SetEntry
+  history.
+- workflow: the scripted mobile flow (open home, create from template, add exercises,
+  log sets, look up previous performance) run against the Django test client or a
+  live server.
+- report: latency percentiles, queries per request, throughput, JSON baselines.
+
+Run it with `python manage.py bench_api`.
+"""
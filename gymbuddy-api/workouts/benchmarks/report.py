@@ -0,0 +1,80 @@
+"""Summaries, JSON baselines and baseline comparison for benchmark samples."""
+
+import json
+import math
+from collections import defaultdict
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(samples, wall_seconds):
+    """Per-step latency percentiles (ms), mean queries and sizes, plus throughput."""
+    by_step = defaultdict(list)
+    for s in samples:
+        by_step[s.step].append(s)
+    steps = {}
+    for step, items in by_step.items():
+        latencies = sorted(s.seconds * 1000 for s in items)
+        queries = [s.queries for s in items if s.queries is not None]
+        steps[step] = {
+            "count": len(items),
+            "errors": sum(1 for s in items if s.status >= 400),
+            "p50_ms": round(percentile(latencies, 50), 2),
+            "p95_ms": round(percentile(latencies, 95), 2),
+            "p99_ms": round(percentile(latencies, 99), 2),
+            "queries_mean": round(sum(queries) / len(queries), 2) if queries else None,
+            "queries_max": max(queries) if queries else None,
+            "bytes_mean": round(sum(s.size for s in items) / len(items)),
+        }
+    all_latencies = sorted(s.seconds * 1000 for s in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if s.status >= 400),
+        "wall_seconds": round(wall_seconds, 3),
+        "throughput_rps": round(len(samples) / wall_seconds, 1) if wall_seconds else 0.0,
+        "p50_ms": round(percentile(all_latencies, 50), 2),
+        "p95_ms": round(percentile(all_latencies, 95), 2),
+        "p99_ms": round(percentile(all_latencies, 99), 2),
+        "steps": dict(sorted(steps.items())),
+    }
+
+
+def save_baseline(path, summary, meta):
+    with open(path, "w") as f:
+        json.dump({"meta": meta, "summary": summary}, f, indent=2, sort_keys=True)
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline_summary, summary, latency_tolerance=0.2):
+    """
+    List regressions against a baseline: p95 latency more than `latency_tolerance`
+    slower, or more queries per request than before, for any step.
+    """
+    regressions = []
+    for step, current in summary["steps"].items():
+        before = baseline_summary["steps"].get(step)
+        if not before:
+            continue
+        if before["p95_ms"] and current["p95_ms"] > before["p95_ms"] * (1 + latency_tolerance):
+            regressions.append(
+                f"{step}: p95 {before['p95_ms']}ms -> {current['p95_ms']}ms"
+            )
+        if (
+            before.get("queries_max") is not None
+            and current.get("queries_max") is not None
+            and current["queries_max"] > before["queries_max"]
+        ):
+            regressions.append(
+                f"{step}: queries {before['queries_max']} -> {current['queries_max']}"
+            )
+    return regressions
@@ -0,0 +1,348 @@
+"""
+Bulk generator for realistic workout history.
+
+Rows are generated as plain tuples per chunk of users and written by one of two writers:
+BulkCreateWriter (any database: bulk_create plus executemany) or CopyWriter (PostgreSQL COPY with
+ids pre-allocated from the table sequences). Output is deterministic for a given seed
+and end date.
+"""
+
+import random
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+from .. import taxonomy
+from ..models import (
+    Exercise,
+    PerformedExercise,
+    Program,
+    Session,
+    SetEntry,
+    UserExercise,
+    WeeklyMuscleVolume,
+)
+
+User = get_user_model()
+
+# (name, typical working weight in lb or 0 for bodyweight, relative popularity)
+EXERCISE_CATALOG = [
+    ("Bench Press", 135, 10),
+    ("Incline DB Press", 50, 5),
+    ("Overhead Press", 85, 6),
+    ("Dips", 0, 3),
+    ("Tricep Pushdown", 40, 5),
+    ("Lateral Raise", 15, 5),
+    ("Squat", 185, 10),
+    ("Romanian Deadlift", 155, 5),
+    ("Leg Press", 270, 6),
+    ("Leg Curl", 70, 4),
+    ("Calf Raise", 90, 3),
+    ("Deadlift", 225, 8),
+    ("Pull-up", 0, 7),
+    ("Barbell Row", 135, 7),
+    ("Lat Pulldown", 120, 6),
+    ("Face Pull", 35, 3),
+    ("Bicep Curl", 30, 6),
+    ("Hammer Curl", 30, 3),
+]
+
+BENCH_EMAIL_DOMAIN = "bench.gymbuddy.local"
+
+
+@dataclass
+class SeedConfig:
+    users: int = 20
+    weeks: int = 52
+    sessions_per_week: float = 3.0
+    programs_per_user: int = 1
+    days_per_program: int = 3
+    exercises_per_session: tuple = (4, 6)
+    sets_per_exercise: tuple = (3, 5)
+    reps: tuple = (5, 12)
+    # "builtin": EXERCISE_CATALOG with its popularity weights; "db": every Exercise row,
+    # equally weighted.
+    catalog: str = "builtin"
+    seed: int = 0
+    end_date: datetime = field(
+        default_factory=lambda: datetime.combine(
+            datetime.now(dt_timezone.utc).date(), time(), tzinfo=dt_timezone.utc
+        )
+    )
+    user_chunk: int = 50
+    batch_size: int = 5000
+
+
+@dataclass
+class SeedResult:
+    users: list = field(default_factory=list)
+    programs: int = 0
+    sessions: int = 0
+    performed_exercises: int = 0
+    set_entries: int = 0
+
+
+def ensure_exercises(catalog=EXERCISE_CATALOG):
+    """Return {name: Exercise} for the catalog, creating any that are missing."""
+    names = [entry[0] for entry in catalog]
+    existing = {e.name: e for e in Exercise.objects.filter(name__in=names)}
+    missing = [Exercise(name=n, description="") for n in names if n not in existing]
+    if missing:
+        Exercise.objects.bulk_create(missing)
+        existing = {e.name: e for e in Exercise.objects.filter(name__in=names)}
+        taxonomy.apply([existing[e.name] for e in missing])
+    return existing
+
+
+def _exercise_mix(config):
+    """[(exercise_id, base_weight, popularity)] to draw session contents from."""
+    if config.catalog == "db":
+        rows = list(Exercise.objects.order_by("id").values_list("id", "name"))
+        known = {entry[0]: entry[1] for entry in EXERCISE_CATALOG}
+        return [(pk, known.get(name, 50), 1) for pk, name in rows]
+    exercises = ensure_exercises()
+    return [(exercises[name].pk, weight, pop) for name, weight, pop in EXERCISE_CATALOG]
+
+
+def _weighted_sample(rng, mix, k):
+    """k distinct entries from mix, drawn proportionally to popularity."""
+    pool = list(mix)
+    chosen = []
+    for _ in range(min(k, len(pool))):
+        pick = rng.choices(pool, weights=[m[2] for m in pool])[0]
+        chosen.append(pick)
+        pool.remove(pick)
+    return chosen
+
+
+@contextmanager
+def _explicit_timestamps():
+    """Let bulk_create keep generated dates instead of auto_now(_add)'s now()."""
+    fields = [
+        Session._meta.get_field("date"),
+        Session._meta.get_field("last_modified"),
+        Program._meta.get_field("created_at"),
+    ]
+    saved = [(f.auto_now, f.auto_now_add) for f in fields]
+    for f in fields:
+        f.auto_now = f.auto_now_add = False
+    try:
+        yield
+    finally:
+        for f, (auto_now, auto_now_add) in zip(fields, saved):
+            f.auto_now, f.auto_now_add = auto_now, auto_now_add
+
+
+class BulkCreateWriter:
+    """
+    Portable writer. Rows whose ids are needed go through bulk_create (ids come back via
+    RETURNING); leaf rows skip model instances and SQL compilation entirely and are sent
+    with executemany, which is several times faster for millions of sets.
+    """
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+
+    def insert(self, model, columns, rows, need_ids=False):
+        if not need_ids:
+            self._executemany(model, columns, rows)
+            return None
+        objs = [model(**dict(zip(columns, row))) for row in rows]
+        with _explicit_timestamps():
+            created = model.objects.bulk_create(objs, batch_size=self.batch_size)
+        return [obj.pk for obj in created]
+
+    def _executemany(self, model, columns, rows):
+        quote = connection.ops.quote_name
+        fields = [model._meta.get_field(c) for c in columns]
+        sql = "INSERT INTO {} ({}) VALUES ({})".format(
+            quote(model._meta.db_table),
+            ", ".join(quote(f.column) for f in fields),
+            ", ".join(["%s"] * len(fields)),
+        )
+        with connection.cursor() as cursor:
+            for i in range(0, len(rows), self.batch_size):
+                cursor.executemany(sql, rows[i : i + self.batch_size])
+
+
+class CopyWriter:
+    """PostgreSQL writer: COPY FROM STDIN, ids taken from the sequence up front."""
+
+    def __init__(self, batch_size):
+        if connection.vendor != "postgresql":
+            raise ValueError("COPY seeding requires PostgreSQL")
+        self.batch_size = batch_size
+
+    def insert(self, model, columns, rows, need_ids=False):
+        table = model._meta.db_table
+        db_columns = [model._meta.get_field(c).column for c in columns]
+        with connection.cursor() as cursor:
+            ids = None
+            if need_ids:
+                cursor.execute(
+                    "SELECT nextval(pg_get_serial_sequence(%s, 'id')) FROM generate_series(1, %s)",
+                    [table, len(rows)],
+                )
+                ids = [r[0] for r in cursor.fetchall()]
+                db_columns = ["id"] + db_columns
+                rows = [(pk, *row) for pk, row in zip(ids, rows)]
+            column_sql = ", ".join(connection.ops.quote_name(c) for c in db_columns)
+            raw = cursor.cursor
+            with raw.copy(
+                f"COPY {connection.ops.quote_name(table)} ({column_sql}) FROM STDIN"
+            ) as copy:
+                for row in rows:
+                    copy.write_row(row)
+        return ids
+
+
+@contextmanager
+def throwaway_database():
+    """Run the block against a freshly migrated test database, destroyed afterwards."""
+    setup_test_environment()
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def _round_weight_centi(value):
+    """Nearest 2.5 lb plate step, as stored: integer hundredths."""
+    return round(value / 2.5) * 250
+
+
+def seed_history(config=None, use_copy=False, log=None):
+    """Generate config.users users with config.weeks weeks of history each."""
+    config = config or SeedConfig()
+    rng = random.Random(config.seed)
+    mix = _exercise_mix(config)
+    if not mix:
+        raise ValueError("exercise catalog is empty")
+    writer = (CopyWriter if use_copy else BulkCreateWriter)(config.batch_size)
+    result = SeedResult()
+
+    offset = User.objects.filter(email__endswith=f"@{BENCH_EMAIL_DOMAIN}").count()
+    # One real hash shared by all users; hashing per user would dominate seeding time.
+    password = make_password(None)
+    start = config.end_date - timedelta(weeks=config.weeks)
+
+    for chunk_start in range(0, config.users, config.user_chunk):
+        chunk_size = min(config.user_chunk, config.users - chunk_start)
+        users = User.objects.bulk_create(
+            [
+                User(
+                    username=f"bench-{offset + chunk_start + i}",
+                    email=f"bench-{offset + chunk_start + i}@{BENCH_EMAIL_DOMAIN}",
+                    password=password,
+                )
+                for i in range(chunk_size)
+            ]
+        )
+        result.users.extend(users)
+
+        # Programs: each user's history is split into consecutive program blocks, each
+        # with its own rotation of day templates.
+        plans = []
+        program_rows = []
+        for user in users:
+            block_weeks = max(1, config.weeks // config.programs_per_user)
+            for p in range(config.programs_per_user):
+                block_start = start + timedelta(weeks=p * block_weeks)
+                days = [
+                    _weighted_sample(rng, mix, rng.randint(*config.exercises_per_session))
+                    for _ in range(config.days_per_program)
+                ]
+                plans.append((user.pk, block_start, block_weeks, days))
+                program_rows.append((user.pk, f"Program {p + 1}", "", block_start))
+        program_ids = writer.insert(
+            Program, ["user_id", "name", "description", "created_at"], program_rows, need_ids=True
+        )
+        result.programs += len(program_ids)
+
+        session_rows = []
+        session_days = []
+        for program_id, (user_id, block_start, block_weeks, days) in zip(program_ids, plans):
+            rotation = 0
+            for week in range(block_weeks):
+                count = max(0, min(7, round(rng.gauss(config.sessions_per_week, 0.7))))
+                for day in sorted(rng.sample(range(7), count)):
+                    when = block_start + timedelta(
+                        weeks=week, days=day, hours=rng.uniform(6, 21)
+                    )
+                    if when > config.end_date:
+                        continue
+                    session_rows.append((user_id, program_id, when, when, "", "", 0, 0, 0))
+                    session_days.append(days[rotation % len(days)])
+                    rotation += 1
+        session_ids = writer.insert(
+            Session,
+            [
+                "user_id",
+                "program_id",
+                "date",
+                "last_modified",
+                "name",
+                "notes",
+                "exercise_count",
+                "set_count",
+                "total_volume",
+            ],
+            session_rows,
+            need_ids=True,
+        )
+        result.sessions += len(session_ids)
+
+        performed_rows = []
+        performed_meta = []
+        for n, (session_id, day) in enumerate(zip(session_ids, session_days)):
+            progress = 1 + 0.3 * (n / max(1, len(session_ids)))
+            for order, (exercise_id, base, _) in enumerate(day, start=1):
+                performed_rows.append((session_id, exercise_id, "", order, base == 0))
+                performed_meta.append((base, progress))
+        performed_ids = writer.insert(
+            PerformedExercise,
+            ["session_id", "exercise_id", "user_preferred_name", "order", "is_bodyweight"],
+            performed_rows,
+            need_ids=True,
+        )
+        result.performed_exercises += len(performed_ids)
+
+        reps_mid = sum(config.reps) / 2
+        set_rows = []
+        for performed_id, (base, progress) in zip(performed_ids, performed_meta):
+            for order in range(1, rng.randint(*config.sets_per_exercise) + 1):
+                reps = max(config.reps[0], min(config.reps[1], round(rng.gauss(reps_mid, 1.5))))
+                weight = (
+                    _round_weight_centi(base * progress * rng.uniform(0.9, 1.05)) if base else None
+                )
+                # Leaf rows skip the ORM, so reps/weight go in as stored hundredths.
+                set_rows.append((performed_id, order, reps * 100, weight, ""))
+            if len(set_rows) >= config.batch_size * 4:
+                writer.insert(
+                    SetEntry, ["performed_exercise_id", "order", "reps", "weight", "notes"], set_rows
+                )
+                result.set_entries += len(set_rows)
+                set_rows = []
+        if set_rows:
+            writer.insert(
+                SetEntry, ["performed_exercise_id", "order", "reps", "weight", "notes"], set_rows
+            )
+            result.set_entries += len(set_rows)
+        # Sessions went in with zero counters; fill them from the rows just written.
+        Session.recount(Session.objects.filter(user__in=users))
+        UserExercise.rebuild([user.pk for user in users])
+        WeeklyMuscleVolume.rebuild([user.pk for user in users])
+        if log:
+            log(
+                f"users {chunk_start + chunk_size}/{config.users}: "
+                f"{result.sessions} sessions, {result.set_entries} sets"
+            )
+    return result
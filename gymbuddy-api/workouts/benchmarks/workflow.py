@@ -0,0 +1,223 @@
+"""The scripted mobile workflow, replayable in-process or against a live server."""
+
+import json
+import re
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from django_project.compression import decompress
+
+_QUERIES = re.compile(r'desc="(\d+) queries"')
+
+
+@dataclass
+class Sample:
+    step: str
+    status: int
+    seconds: float
+    queries: int | None
+    size: int
+
+
+def _queries_from_server_timing(header):
+    match = _QUERIES.search(header or "")
+    return int(match.group(1)) if match else None
+
+
+class TestClientTransport:
+    """Drive the API through django.test.Client (no network, same process)."""
+
+    def __init__(self, token, accept_encoding=None):
+        from django.test import Client
+
+        self.client = Client()
+        self.headers = {"HTTP_AUTHORIZATION": f"Token {token}"}
+        if accept_encoding:
+            self.headers["HTTP_ACCEPT_ENCODING"] = accept_encoding
+
+    def request(self, method, path, body=None):
+        """(status, decoded body, seconds, queries, bytes on the wire)."""
+        kwargs = dict(self.headers)
+        if body is not None:
+            kwargs["data"] = json.dumps(body)
+            kwargs["content_type"] = "application/json"
+        start = time.perf_counter()
+        response = getattr(self.client, method.lower())(path, **kwargs)
+        elapsed = time.perf_counter() - start
+        content = b"".join(response.streaming_content) if response.streaming else response.content
+        return (
+            response.status_code,
+            decompress(response.headers.get("Content-Encoding"), content),
+            elapsed,
+            _queries_from_server_timing(response.headers.get("Server-Timing")),
+            len(content),
+        )
+
+
+class HttpTransport:
+    """Drive a running server over HTTP (e.g. `runserver` or gunicorn)."""
+
+    def __init__(self, base_url, token, accept_encoding=None):
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.accept_encoding = accept_encoding
+
+    def request(self, method, path, body=None):
+        """(status, decoded body, seconds, queries, bytes on the wire)."""
+        data = json.dumps(body).encode() if body is not None else None
+        headers = {
+            "Authorization": f"Token {self.token}",
+            "Content-Type": "application/json",
+            "Accept": "application/json",
+        }
+        if self.accept_encoding:
+            headers["Accept-Encoding"] = self.accept_encoding
+        req = urllib.request.Request(self.base_url + path, data=data, method=method, headers=headers)
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req) as response:
+                content = response.read()
+                status = response.status
+                response_headers = response.headers
+        except urllib.error.HTTPError as exc:
+            content = exc.read()
+            status = exc.code
+            response_headers = exc.headers
+        elapsed = time.perf_counter() - start
+        return (
+            status,
+            decompress(response_headers.get("Content-Encoding"), content),
+            elapsed,
+            _queries_from_server_timing(response_headers.get("Server-Timing")),
+            len(content),
+        )
+
+
+class Workflow:
+    """
+    One pass through the app as the mobile client does it:
+
+    home (list + template) -> create session from the latest one -> open the detail
+    screen (session, last five sessions' exercises, user exercises, one batched
+    last-performance lookup for the rest) -> add two exercises, look up the last
+    performance of any still unknown, log three sets each -> correct one set.
+    """
+
+    def __init__(self, transport):
+        self.transport = transport
+        self.samples = []
+
+    def _call(self, step, method, path, body=None, raw=False):
+        status, content, elapsed, queries, size = self.transport.request(method, path, body)
+        self.samples.append(Sample(step, status, elapsed, queries, size))
+        if status >= 400:
+            return None
+        if raw:
+            return content
+        return json.loads(content) if content else None
+
+    def run(self, exercise_names):
+        api = "/api/v1"
+        sessions = self._call("list_sessions", "GET", f"{api}/workouts/") or []
+        self._call("template", "GET", f"{api}/workouts/template/")
+        body = {"template_session_id": sessions[0]["id"]} if sessions else {}
+        session = self._call("create_session", "POST", f"{api}/workouts/", body)
+        if not session:
+            return self.samples
+        sid = session["id"]
+        self._call("retrieve_session", "GET", f"{api}/workouts/{sid}/")
+        previous = self._call(
+            "previous_exercises", "GET", f"{api}/workouts/{sid}/previous_exercises/?depth=5"
+        )
+        # Exercises whose last performance the client already has (or knows is absent).
+        known = {entry["exercise"]["id"] for entry in previous or []}
+        user_exercises = self._call("user_exercises", "GET", f"{api}/workouts/user_exercises/")
+        missing = [e["id"] for e in user_exercises or [] if e["id"] not in known][:100]
+        if missing:
+            ids = ",".join(map(str, missing))
+            self._call(
+                "last_performance_batch",
+                "GET",
+                f"{api}/workouts/last_exercise_performance/?exercise_ids={ids}",
+            )
+            known.update(missing)
+
+        order = len(session.get("exercises") or []) + 1
+        for name in exercise_names:
+            performed = self._call(
+                "add_exercise",
+                "POST",
+                f"{api}/workouts/{sid}/exercises/",
+                {"exercise_name": name, "order": order},
+            )
+            order += 1
+            if not performed:
+                continue
+            exercise_id = performed["exercise"]["id"]
+            if exercise_id not in known:
+                self._call(
+                    "last_exercise_performance",
+                    "GET",
+                    f"{api}/workouts/last_exercise_performance/?exercise_id={exercise_id}",
+                )
+            last_set = None
+            for set_order in range(1, 4):
+                last_set = self._call(
+                    "log_set",
+                    "POST",
+                    f"{api}/performed-exercises/{performed['id']}/sets/",
+                    {"order": set_order, "reps": 8, "weight": "135"},
+                )
+            if last_set:
+                self._call(
+                    "update_set",
+                    "PATCH",
+                    f"{api}/set-entries/{last_set['id']}/",
+                    {"reps": 7},
+                )
+        return self.samples
+
+
+class HistoryQueries(Workflow):
+    """
+    History browsing: the full unpaginated list versus the filtered, keyset-paginated
+    queries clients should use instead (last quarter, one program, sessions containing
+    an exercise, heavy sessions), a program's sessions and weekly rollup, plus the
+    columnar snapshot charts use in both encodings.
+    """
+
+    def run(self, exercise_names=None):
+        api = "/api/v1/workouts/"
+        quarter_ago = (date.today() - timedelta(days=90)).isoformat()
+        exercises = self._call("user_exercises", "GET", f"{api}user_exercises/") or []
+        programs = self._call("list_programs", "GET", "/api/v1/programs/") or []
+
+        self._call("history_full", "GET", api)
+        self._call("history_last_quarter", "GET", f"{api}?date_from={quarter_ago}&page_size=50")
+        if programs:
+            self._call("history_program", "GET", f"{api}?program={programs[0]['id']}&page_size=50")
+            program_api = f"/api/v1/programs/{programs[0]['id']}/"
+            self._call("program_sessions", "GET", f"{program_api}sessions/?page_size=50")
+            self._call("program_weeks", "GET", f"{program_api}weeks/")
+        if exercises:
+            self._call(
+                "history_contains_exercise",
+                "GET",
+                f"{api}?exercise={exercises[0]['id']}&date_from={quarter_ago}&page_size=50",
+            )
+        self._call("history_min_volume", "GET", f"{api}?min_volume=5000&page_size=50")
+
+        self._call("snapshot_json", "GET", f"{api}history_snapshot/", raw=True)
+        self._call("snapshot_packed", "GET", f"{api}history_snapshot/?encoding=packed", raw=True)
+
+        page = self._call("history_page", "GET", f"{api}?page_size=20")
+        for _ in range(2):
+            if not page or not page.get("next"):
+                break
+            next_url = urllib.parse.urlsplit(page["next"])
+            page = self._call("history_page", "GET", f"{next_url.path}?{next_url.query}")
+        return self.samples
@@ -0,0 +1,140 @@
+# workouts/fields.py
+"""
+Fixed-point numbers stored as integer hundredths.
+
+Reps and weights have at most two decimal places. Storing them as hundredths in an
+integer column (8.5 reps -> 850) keeps Decimal out of the hot paths:
+
+- rows load as plain int/float (8.5, 135) instead of Decimal("8.50"),
+- serializers emit JSON numbers,
+- SUM(reps * weight) and friends run as integer math in the database.
+
+Code keeps using natural units (`SetEntry(reps=8.5, weight=Decimal("135"))`,
+`filter(weight__gte=100)`); only raw SQL and `centi()` see the stored integers.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal, DecimalException, InvalidOperation
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import models
+from django.db.models import ExpressionWrapper, F
+from django.db.models.functions import Cast
+from rest_framework import serializers
+
+SCALE = 100
+
+
+def to_centi(value):
+    """
+    Natural units (int, float, Decimal or numeric str) -> integer hundredths.
+    Raises ValueError for anything else, including infinities and NaN.
+    """
+    if value is None:
+        return None
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value * SCALE
+    try:
+        exact = Decimal(str(value)) * SCALE
+        if not exact.is_finite():
+            raise ValueError(f"{value!r} is not a finite number")
+        # quantize() raises too when the result needs more digits than the context has.
+        return int(exact.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except DecimalException:
+        raise ValueError(f"{value!r} is not a representable number")
+
+
+def from_centi(value):
+    """Integer hundredths -> int when whole, else float (8.5, not Decimal("8.50"))."""
+    if value is None:
+        return None
+    whole, rest = divmod(value, SCALE)
+    return whole if not rest else value / SCALE
+
+
+def centi(field_name):
+    """Select a FixedPointField's stored integer as-is, skipping the conversion."""
+    return ExpressionWrapper(F(field_name), output_field=models.IntegerField())
+
+
+def wide(operand):
+    """
+    A field name or expression cast to bigint. The columns are int4 on PostgreSQL, so
+    products of hundredths (500 reps x 500 = 2.5e9) must be widened before multiplying.
+    """
+    return Cast(F(operand) if isinstance(operand, str) else operand, models.BigIntegerField())
+
+
+class FixedPointField(models.Field):
+    """
+    A two-decimal-place number stored as integer hundredths; see the module docstring.
+
+    Deliberately not an IntegerField subclass: IntegerField's lookups round float
+    arguments to whole numbers before they reach get_prep_value.
+    """
+
+    description = "Fixed-point number stored as integer hundredths"
+    default_error_messages = {"invalid": "“%(value)s” value must be a number."}
+
+    def from_db_value(self, value, expression, connection):
+        return from_centi(value)
+
+    def to_python(self, value):
+        if value is None:
+            return None
+        try:
+            return from_centi(to_centi(value))
+        except ValueError:
+            raise ValidationError(self.error_messages["invalid"], code="invalid", params={"value": value})
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None or hasattr(value, "resolve_expression"):
+            return value
+        return to_centi(value)
+
+    def pre_save(self, model_instance, add):
+        # Normalize what callers assigned (Decimal, str) to what a reload would give.
+        value = self.to_python(getattr(model_instance, self.attname))
+        setattr(model_instance, self.attname, value)
+        return value
+
+    def get_internal_type(self):
+        return "IntegerField"
+
+    def formfield(self, **kwargs):
+        return super().formfield(**{"form_class": forms.DecimalField, "decimal_places": 2, **kwargs})
+
+
+class FixedPointSerializerField(serializers.Field):
+    """
+    Accepts numbers or numeric strings with up to two decimal places; renders JSON
+    numbers. Bounds match the old DecimalField(max_digits=5, decimal_places=2).
+    """
+
+    default_error_messages = {
+        "invalid": "A valid number is required.",
+        "max_decimal_places": "Ensure that there are no more than 2 decimal places.",
+        "max_value": "Ensure this value is less than 1000.",
+    }
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("invalid")
+        try:
+            value = Decimal(str(data).strip())
+        except InvalidOperation:
+            self.fail("invalid")
+        if not value.is_finite():
+            self.fail("invalid")
+        if abs(value) >= 1000:
+            self.fail("max_value")
+        if value != value.quantize(Decimal("0.01")):
+            self.fail("max_decimal_places")
+        return from_centi(to_centi(value))
+
+    def to_representation(self, value):
+        # Loaded rows are already int/float; only freshly assigned values need normalizing.
+        if type(value) in (int, float):
+            return value
+        return from_centi(to_centi(value))
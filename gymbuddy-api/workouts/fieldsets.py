@@ -0,0 +1,186 @@
+# workouts/fieldsets.py
+"""
+Sparse fieldsets: let a caller ask for part of a response, and load only that part.
+
+Two query parameters, both taking comma-separated, dotted paths:
+
+    ?fields=id,date                       only these fields
+    ?fields=id,exercises.sets.reps        nested paths narrow nested objects
+    ?expand=exercises,exercises.sets      nest only these relations
+
+Without `fields` every field is rendered. Without `expand` relations nest as they always
+have; with it, a relation not listed renders as its primary key(s) instead
+("exercise": 3, "sets": [7, 8]), and `?expand=` alone nests nothing.
+
+Serializers opt in with SparseFieldsMixin; `shape(queryset)` then turns the requested
+shape into only() columns and Prefetch objects, so unrequested columns and relations
+are never read. Viewsets add SparseFieldsetMixin to pass the request's FieldSet down.
+"""
+
+from django.db.models import Prefetch
+from rest_framework import serializers
+from rest_framework.relations import ManyRelatedField
+
+
+def _tree(value):
+    """Parse "a,b.c,b.d" into {"a": {}, "b": {"c": {}, "d": {}}}."""
+    tree = {}
+    for path in value.split(","):
+        node = tree
+        for part in path.strip().split("."):
+            if part:
+                node = node.setdefault(part, {})
+    return tree
+
+
+class FieldSet:
+    """The requested shape at one level of a response; child() descends into a relation."""
+
+    def __init__(self, fields=None, expand=None):
+        self.fields = fields  # {name: subtree}; None for every field
+        self.expand = expand  # {name: subtree}; None for the default nesting
+
+    @classmethod
+    def from_query(cls, params):
+        fields = _tree(params["fields"]) if "fields" in params else None
+        expand = _tree(params["expand"]) if "expand" in params else None
+        return cls(fields or None, expand)
+
+    def wants(self, name):
+        return self.fields is None or name in self.fields
+
+    def expands(self, name):
+        return self.expand is None or name in self.expand
+
+    def child(self, name):
+        fields = self.fields.get(name) if self.fields is not None else None
+        expand = self.expand.get(name, {}) if self.expand is not None else None
+        return FieldSet(fields or None, expand)
+
+
+class SparseFieldsMixin:
+    """
+    Serializer mixin: render only the fields in the FieldSet from context["fieldset"]
+    (the root) or handed down by the parent serializer (nested).
+
+    expandable_fields maps a relation to the field that renders it nested, or None when
+    the declared field already does; collapsed, it renders as primary key(s). Writes
+    still see every declared field. field_sources lists the attributes a method field
+    reads, for shape().
+    """
+
+    expandable_fields = {}
+    field_sources = {}
+
+    @property
+    def fieldset(self):
+        if getattr(self, "_fieldset", None) is None:
+            parent = self.parent
+            if isinstance(parent, serializers.ListSerializer):
+                parent = parent.parent
+            root = parent is None
+            self._fieldset = (root and self.context.get("fieldset")) or FieldSet()
+        return self._fieldset
+
+    @property
+    def _readable_fields(self):
+        if getattr(self, "_sparse_fields", None) is None:
+            self._sparse_fields = list(self._select_fields())
+        return iter(self._sparse_fields)
+
+    def _select_fields(self):
+        fieldset = self.fieldset
+        for name, field in self.fields.items():
+            if field.write_only or not fieldset.wants(name):
+                continue
+            if name in self.expandable_fields:
+                field = self._expandable(name, field, fieldset.expands(name))
+            nested = field.child if isinstance(field, serializers.ListSerializer) else field
+            if isinstance(nested, SparseFieldsMixin):
+                nested._fieldset = fieldset.child(name)
+            yield field
+
+    def _expandable(self, name, declared, expand):
+        factory = self.expandable_fields[name]
+        if expand:
+            if factory is None:
+                return declared
+            field = factory()
+        elif factory is not None:
+            return declared
+        else:
+            many = isinstance(declared, serializers.ListSerializer)
+            source = {} if declared.source == name else {"source": declared.source}
+            field = serializers.PrimaryKeyRelatedField(many=many, read_only=True, **source)
+        field.bind(field_name=name, parent=self)
+        return field
+
+    def sources(self):
+        """Model attributes (columns or annotations) the rendered scalar fields read."""
+        names = set()
+        for field in self._readable_fields:
+            if _nested(field) is None and not isinstance(field, ManyRelatedField):
+                default = field.field_name if field.source == "*" else field.source.split(".")[0]
+                names.update(self.field_sources.get(field.field_name, (default,)))
+        return names
+
+    def shape(self, queryset, *keep):
+        """
+        `queryset` narrowed to what this serializer will render: only() the columns it
+        reads (plus `keep`), a join per nested foreign key and a Prefetch per nested
+        reverse relation, each shaped the same way.
+        """
+        columns, joins, prefetches = self._plan(queryset.model, "")
+        queryset = queryset.only(*columns, *keep)
+        if joins:
+            queryset = queryset.select_related(*joins)
+        return queryset.prefetch_related(*prefetches)
+
+    def _plan(self, model, prefix):
+        concrete = {f.name for f in model._meta.concrete_fields}
+        columns = {prefix + name for name in {model._meta.pk.name} | (self.sources() & concrete)}
+        joins, prefetches = [], []
+        for field in self._readable_fields:
+            nested = _nested(field)
+            if nested is None and not isinstance(field, ManyRelatedField):
+                continue
+            relation = model._meta.get_field(field.source)
+            path = prefix + field.source
+            if relation.many_to_one:
+                columns.add(path)
+                if nested is not None:
+                    joins.append(path)
+                    more = nested._plan(relation.related_model, path + "__")
+                    columns |= more[0]
+                    joins += more[1]
+                    prefetches += more[2]
+                continue
+            related = relation.related_model._default_manager.all()
+            if nested is not None:
+                related = nested.shape(related, relation.field.name)
+            else:
+                related = related.only(relation.related_model._meta.pk.name, relation.field.name)
+            prefetches.append(Prefetch(path, related))
+        return columns, joins, prefetches
+
+
+def _nested(field):
+    """The SparseFieldsMixin serializer that renders `field`, if it is one."""
+    nested = field.child if isinstance(field, serializers.ListSerializer) else field
+    return nested if isinstance(nested, SparseFieldsMixin) else None
+
+
+def shape(serializer, queryset, *keep):
+    """serializer.shape(queryset, *keep), for a single or many=True serializer."""
+    if isinstance(serializer, serializers.ListSerializer):
+        serializer = serializer.child
+    return serializer.shape(queryset, *keep)
+
+
+class SparseFieldsetMixin:
+    """Viewset mixin: hand the request's ?fields= / ?expand= to its serializers."""
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context["fieldset"] = FieldSet.from_query(self.request.query_params)
+        return context
@@ -0,0 +1,88 @@
+# workouts/filters.py
+from datetime import datetime, time, timedelta, timezone as dt_timezone
+
+from django.db.models import Exists, OuterRef
+from django.utils.dateparse import parse_date, parse_datetime
+from rest_framework.exceptions import ValidationError
+from rest_framework.filters import BaseFilterBackend
+
+from .fields import SCALE, to_centi
+from .models import PerformedExercise
+
+# total_volume is a bigint in 1/10000ths; larger bounds can't be bound as parameters.
+_MAX_VOLUME = (2**63 - 1) // SCALE
+
+
+def _parse_bound(name, raw, end_of_day):
+    """
+    Accept a date, meaning the start (or end) of that UTC day, or an ISO datetime.
+    Returns (bound, is_day) so callers can make a day's end exclusive.
+    """
+    # Well-formed but impossible values (2024-13-45) raise ValueError instead of
+    # returning None; both are the client's mistake.
+    try:
+        day = parse_date(raw)
+        value = None if day is not None else parse_datetime(raw)
+    except ValueError:
+        day = value = None
+    if day is not None:
+        start = datetime.combine(day, time(), tzinfo=dt_timezone.utc)
+        return (start + timedelta(days=1) if end_of_day else start), True
+    if value is None:
+        raise ValidationError({name: "Use YYYY-MM-DD or an ISO 8601 datetime."})
+    return (value if value.tzinfo else value.replace(tzinfo=dt_timezone.utc)), False
+
+
+def _parse_ids(name, raw):
+    try:
+        return [int(part) for part in raw.split(",") if part.strip()]
+    except ValueError:
+        raise ValidationError({name: "Must be an integer or comma-separated integers."})
+
+
+class SessionHistoryFilter(BaseFilterBackend):
+    """
+    Query-string filters for workout history:
+
+    - date_from / date_to: inclusive range on Session.date (dates or datetimes),
+    - program: program id,
+    - exercise: exercise id(s), comma-separated; a session must contain every one,
+    - min_volume: minimum total reps x weight for the session.
+
+    Each exercise filter is an EXISTS probe on (exercise, session) instead of a join, so
+    no DISTINCT is needed and the (user, -date) index keeps driving the scan.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        params = request.query_params
+        if params.get("date_from"):
+            bound, _ = _parse_bound("date_from", params["date_from"], end_of_day=False)
+            queryset = queryset.filter(date__gte=bound)
+        if params.get("date_to"):
+            bound, is_day = _parse_bound("date_to", params["date_to"], end_of_day=True)
+            queryset = queryset.filter(date__lt=bound) if is_day else queryset.filter(date__lte=bound)
+        if params.get("program"):
+            try:
+                program_id = int(params["program"])
+            except ValueError:
+                raise ValidationError({"program": "Must be an integer."})
+            queryset = queryset.filter(program_id=program_id)
+        if params.get("exercise"):
+            for exercise_id in _parse_ids("exercise", params["exercise"]):
+                queryset = queryset.filter(
+                    Exists(
+                        PerformedExercise.objects.filter(
+                            session=OuterRef("pk"), exercise_id=exercise_id
+                        )
+                    )
+                )
+        if params.get("min_volume"):
+            try:
+                min_volume = to_centi(params["min_volume"])
+            except ValueError:
+                raise ValidationError({"min_volume": "Must be a finite number."})
+            if abs(min_volume) > _MAX_VOLUME:
+                raise ValidationError({"min_volume": "Out of range."})
+            # total_volume is in 1/10000ths (hundredths x hundredths).
+            queryset = queryset.filter(total_volume__gte=min_volume * SCALE)
+        return queryset
@@ -0,0 +1,139 @@
+# workouts/history.py
+"""
+Columnar snapshot of a user's whole set history, for charts.
+
+One row per set, stored as parallel arrays (struct-of-arrays) instead of nested
+session -> exercise -> set objects:
+
+    session   session id
+    date      session date, Unix seconds (UTC)
+    exercise  exercise id
+    reps      reps x 100, as stored (fixed point)
+    weight    weight x 100, as stored (fixed point), -1 for bodyweight sets
+
+Two encodings are served: JSON ({"version", "count", "columns": {...}}) and "packed",
+a little-endian binary layout a phone can map straight into typed arrays:
+
+    magic b"GBH1" | uint32 count | uint32[count] date | uint32[count] session
+    | uint32[count] exercise | int32[count] reps | int32[count] weight
+
+Snapshots are cached per user *data version*, derived from the user's sessions: the
+latest last_modified, the session count and the summed set counters. The API views
+touch last_modified on every write (auto_now, or Session.bump for exercise and set
+writes), the admin resyncs the sessions it edits (Session.resync), and deleting a
+session changes the counts, so the version agrees across processes. Other writes to
+exercises or sets (shell, queryset.update()) leave it unchanged: call Session.resync()
+on the sessions they touched.
+"""
+
+import json
+import struct
+import sys
+from array import array
+
+from django.core.cache import cache
+from django.db.models import Count, Max, Sum
+
+from .fields import SCALE, centi
+from .models import Session, SetEntry
+
+PACKED_MAGIC = b"GBH1"
+SNAPSHOT_CACHE_SECONDS = 24 * 60 * 60
+BODYWEIGHT = -1
+
+_COLUMNS = (("date", "I"), ("session", "I"), ("exercise", "I"), ("reps", "i"), ("weight", "i"))
+
+
+def history_version(user_id):
+    """The user's current data version: one aggregate over their sessions."""
+    stats = Session.objects.filter(user_id=user_id).aggregate(
+        modified=Max("last_modified"), sessions=Count("id"), sets=Sum("set_count")
+    )
+    if not stats["sessions"]:
+        return "0"
+    modified = int(stats["modified"].timestamp() * 1_000_000)
+    return f"{modified:x}.{stats['sessions']:x}.{stats['sets']:x}"
+
+
+def build_columns(user_id, chunk_size=5000):
+    """Stream the user's sets from a values_list cursor into typed arrays."""
+    columns = {name: array(code) for name, code in _COLUMNS}
+    rows = (
+        SetEntry.objects.filter(performed_exercise__session__user_id=user_id)
+        .order_by(
+            "performed_exercise__session__date",
+            "performed_exercise__session_id",
+            "performed_exercise__order",
+            "order",
+        )
+        .values_list(
+            "performed_exercise__session__date",
+            "performed_exercise__session_id",
+            "performed_exercise__exercise_id",
+            centi("reps"),
+            centi("weight"),
+        )
+    )
+    dates, sessions, exercises = columns["date"], columns["session"], columns["exercise"]
+    reps_col, weights = columns["reps"], columns["weight"]
+    for date, session_id, exercise_id, reps, weight in rows.iterator(chunk_size=chunk_size):
+        dates.append(int(date.timestamp()))
+        sessions.append(session_id)
+        exercises.append(exercise_id)
+        reps_col.append(reps)
+        weights.append(BODYWEIGHT if weight is None else weight)
+    return columns
+
+
+def encode_json(columns, version):
+    payload = {
+        "version": version,
+        "count": len(columns["date"]),
+        "scale": SCALE,
+        "columns": {name: col.tolist() for name, col in columns.items()},
+    }
+    return json.dumps(payload, separators=(",", ":")).encode()
+
+
+def encode_packed(columns):
+    parts = [PACKED_MAGIC, struct.pack("<I", len(columns["date"]))]
+    for name, _ in _COLUMNS:
+        col = columns[name]
+        if sys.byteorder != "little":
+            col = array(col.typecode, col)
+            col.byteswap()
+        parts.append(col.tobytes())
+    return b"".join(parts)
+
+
+def decode_packed(data):
+    """Inverse of encode_packed (used by tests and Python consumers)."""
+    if data[:4] != PACKED_MAGIC:
+        raise ValueError("not a packed history snapshot")
+    (count,) = struct.unpack_from("<I", data, 4)
+    offset = 8
+    columns = {}
+    for name, code in _COLUMNS:
+        col = array(code)
+        size = col.itemsize * count
+        col.frombytes(data[offset : offset + size])
+        if sys.byteorder != "little":
+            col.byteswap()
+        columns[name] = col
+        offset += size
+    return columns
+
+
+ENCODINGS = {"json": "application/json", "packed": "application/octet-stream"}
+
+
+def snapshot(user_id, encoding):
+    """(version, content_type, body) for the user's current history, cached per version."""
+    version = history_version(user_id)
+    key = f"history:snapshot:{user_id}:{version}:{encoding}"
+    body = cache.get(key)
+    if body is None:
+        columns = build_columns(user_id)
+        body = encode_json(columns, version) if encoding == "json" else encode_packed(columns)
+        cache.set(key, body, SNAPSHOT_CACHE_SECONDS)
+    return version, ENCODINGS[encoding], body
@@ -0,0 +1,32 @@
+"""
+Map exercises to muscle groups from the default taxonomy (workouts/taxonomy.py).
+
+    python manage.py apply_muscle_taxonomy
+
+Only exercises named in the table that have no contributions yet are mapped; hand-made
+mappings are kept. The weekly muscle volume rollup of everyone who has done a newly
+mapped exercise is rebuilt, so their past sets count too. Run it after adding names
+to the table.
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from workouts import taxonomy
+from workouts.models import UserExercise, WeeklyMuscleVolume
+
+
+class Command(BaseCommand):
+    help = "Map exercises to muscle groups from the default taxonomy and rebuild affected rollups."
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            mapped = taxonomy.apply()
+            user_ids = list(
+                UserExercise.objects.filter(exercise_id__in=mapped)
+                .values_list("user_id", flat=True)
+                .distinct()
+            )
+            if user_ids:
+                WeeklyMuscleVolume.rebuild(user_ids)
+        self.stdout.write(f"mapped {len(mapped)} exercise(s); rebuilt {len(user_ids)} user rollup(s)")
@@ -0,0 +1,175 @@
+"""
+Replay the mobile workflow and report latency, queries per request and throughput.
+
+In-process (default): creates a throwaway test database, seeds it, and drives the API
+through the Django test client:
+
+    python manage.py bench_api --users 20 --weeks 104 --iterations 5
+
+Against a running server (seed it first with `manage.py seed_workouts`):
+
+    python manage.py bench_api --url http://127.0.0.1:8000 --token <token>
+
+Save a baseline with --save and check a later run against it with --compare.
+"""
+
+import json
+import random
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.authtoken.models import Token
+
+from workouts.benchmarks import report
+from workouts.benchmarks.seed import (
+    EXERCISE_CATALOG,
+    SeedConfig,
+    seed_history,
+    throwaway_database,
+)
+from workouts.benchmarks.workflow import (
+    HistoryQueries,
+    HttpTransport,
+    TestClientTransport,
+    Workflow,
+)
+
+SCENARIOS = {"workflow": Workflow, "history": HistoryQueries}
+
+
+class Command(BaseCommand):
+    help = "Benchmark the API hot paths with a scripted mobile workflow."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=20, help="users to seed")
+        parser.add_argument("--weeks", type=int, default=52, help="weeks of history per user")
+        parser.add_argument("--sessions-per-week", type=int, default=3)
+        parser.add_argument("--iterations", type=int, default=3, help="workflow runs per worker")
+        parser.add_argument("--concurrency", type=int, default=1, help="parallel workers")
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--scenario",
+            choices=sorted(SCENARIOS),
+            default="workflow",
+            help="workflow: the mobile logging flow; history: filtered/paginated history reads",
+        )
+        parser.add_argument(
+            "--accept-encoding",
+            help='send this Accept-Encoding (e.g. "gzip" or "zstd, br, gzip"); bytes are then on-the-wire sizes',
+        )
+        parser.add_argument("--url", help="benchmark a live server instead of the test client")
+        parser.add_argument("--token", action="append", help="API token(s) for --url mode")
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="seed into the configured database instead of a throwaway test database",
+        )
+        parser.add_argument("--save", help="write the summary as a JSON baseline")
+        parser.add_argument("--compare", help="compare against a JSON baseline")
+        parser.add_argument("--tolerance", type=float, default=0.2)
+        parser.add_argument("--fail-on-regression", action="store_true")
+        parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+
+    def handle(self, *args, **options):
+        if options["url"]:
+            if not options["token"]:
+                raise CommandError("--url needs at least one --token")
+            summary = self._run(options, options["token"])
+        elif options["use_current_db"]:
+            summary = self._run(options, self._seed(options))
+        else:
+            with throwaway_database():
+                summary = self._run(options, self._seed(options))
+        self._report(summary, options)
+
+    def _seed(self, options):
+        started = time.perf_counter()
+        result = seed_history(
+            SeedConfig(
+                users=options["users"],
+                weeks=options["weeks"],
+                sessions_per_week=options["sessions_per_week"],
+                seed=options["seed"],
+            )
+        )
+        if options["verbosity"] > 1:
+            self.stdout.write(
+                f"seeded {len(result.users)} users, {result.set_entries} sets "
+                f"in {time.perf_counter() - started:.1f}s"
+            )
+        return [Token.objects.get_or_create(user=u)[0].key for u in result.users]
+
+    def _run(self, options, tokens):
+        samples = []
+        lock = threading.Lock()
+        names = [entry[0] for entry in EXERCISE_CATALOG]
+
+        def worker(n):
+            rng = random.Random(options["seed"] + n)
+            token = tokens[n % len(tokens)]
+            if options["url"]:
+                transport = HttpTransport(options["url"], token, options["accept_encoding"])
+            else:
+                transport = TestClientTransport(token, options["accept_encoding"])
+            local = []
+            for _ in range(options["iterations"]):
+                scenario = SCENARIOS[options["scenario"]](transport)
+                local.extend(scenario.run(rng.sample(names, 2)))
+            with lock:
+                samples.extend(local)
+
+        started = time.perf_counter()
+        if options["concurrency"] == 1:
+            worker(0)
+        else:
+            threads = [
+                threading.Thread(target=worker, args=(n,)) for n in range(options["concurrency"])
+            ]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+        return report.summarize(samples, time.perf_counter() - started)
+
+    def _report(self, summary, options):
+        meta = {
+            "users": options["users"],
+            "weeks": options["weeks"],
+            "iterations": options["iterations"],
+            "concurrency": options["concurrency"],
+            "scenario": options["scenario"],
+            "accept_encoding": options["accept_encoding"],
+            "mode": "http" if options["url"] else "test-client",
+            "vendor": connection.vendor,
+        }
+        if options["json"]:
+            self.stdout.write(json.dumps({"meta": meta, "summary": summary}, indent=2))
+        else:
+            self.stdout.write(
+                f"{summary['requests']} requests, {summary['errors']} errors, "
+                f"{summary['throughput_rps']} req/s, p50 {summary['p50_ms']}ms "
+                f"p95 {summary['p95_ms']}ms p99 {summary['p99_ms']}ms"
+            )
+            self.stdout.write(
+                f"{'step':<28}{'n':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'queries':>9}{'bytes':>9}"
+            )
+            for step, s in summary["steps"].items():
+                queries = "-" if s["queries_max"] is None else s["queries_max"]
+                self.stdout.write(
+                    f"{step:<28}{s['count']:>5}{s['p50_ms']:>9}{s['p95_ms']:>9}"
+                    f"{s['p99_ms']:>9}{queries:>9}{s['bytes_mean']:>9}"
+                )
+
+        if options["save"]:
+            report.save_baseline(options["save"], summary, meta)
+        if options["compare"]:
+            baseline = report.load_baseline(options["compare"])
+            regressions = report.compare(baseline["summary"], summary, options["tolerance"])
+            for line in regressions:
+                self.stderr.write(f"REGRESSION {line}")
+            if not regressions:
+                self.stdout.write("no regressions against baseline")
+            elif options["fail_on_regression"]:
+                raise CommandError(f"{len(regressions)} regression(s) against {options['compare']}")
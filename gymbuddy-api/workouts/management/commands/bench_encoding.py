@@ -0,0 +1,83 @@
+"""
+Measure bytes and CPU per request for the JSON renderers and compression codings.
+
+Seeds a throwaway database, serializes one user's full session history (the payload of
+GET /api/v1/workouts/), then times each renderer and each available coding on it:
+
+    python manage.py bench_encoding --weeks 156 --repeat 20
+"""
+
+import json
+import time
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIRequestFactory
+
+from django_project.compression import CODECS
+from django_project.renderers import FastJSONRenderer, orjson
+from workouts.benchmarks.seed import SeedConfig, seed_history, throwaway_database
+from workouts.models import Session
+from workouts.serializers import SessionSerializer
+
+
+def _cpu_ms(fn, repeat):
+    """Mean CPU milliseconds per call (process time, so other load doesn't count)."""
+    fn()
+    start = time.process_time()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.process_time() - start) * 1000 / repeat
+
+
+class Command(BaseCommand):
+    help = "Benchmark JSON rendering and response compression on a real history payload."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--weeks", type=int, default=104, help="history length to seed")
+        parser.add_argument("--repeat", type=int, default=10)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="seed into the configured database instead of a throwaway test database",
+        )
+        parser.add_argument("--json", action="store_true", help="print results as JSON")
+
+    def handle(self, *args, **options):
+        with nullcontext() if options["use_current_db"] else throwaway_database():
+            user = seed_history(
+                SeedConfig(users=1, weeks=options["weeks"], seed=options["seed"])
+            ).users[0]
+            request = APIRequestFactory().get("/api/v1/workouts/")
+            request.user = user
+            sessions = Session.objects.filter(user=user).prefetch_related(
+                "exercises__exercise", "exercises__sets"
+            )
+            data, serialize_ms = _cpu_ms(
+                lambda: SessionSerializer(sessions, many=True, context={"request": request}).data,
+                1,
+            )
+
+        repeat = options["repeat"]
+        rows = [{"stage": "serialize", "bytes": None, "cpu_ms": round(serialize_ms, 2)}]
+        renderers = [("render:json", JSONRenderer())]
+        if orjson is not None:
+            renderers.append(("render:orjson", FastJSONRenderer()))
+        body = None
+        for name, renderer in renderers:
+            body, ms = _cpu_ms(lambda: renderer.render(data), repeat)
+            rows.append({"stage": name, "bytes": len(body), "cpu_ms": round(ms, 2)})
+        for coding, compress in CODECS.items():
+            compressed, ms = _cpu_ms(lambda: compress(body), repeat)
+            rows.append({"stage": f"compress:{coding}", "bytes": len(compressed), "cpu_ms": round(ms, 2)})
+
+        if options["json"]:
+            self.stdout.write(json.dumps({"sessions": len(data), "results": rows}, indent=2))
+            return
+        self.stdout.write(f"{len(data)} sessions, {repeat} repeats")
+        self.stdout.write(f"{'stage':<20}{'bytes':>12}{'cpu ms':>10}")
+        for row in rows:
+            size = "-" if row["bytes"] is None else row["bytes"]
+            self.stdout.write(f"{row['stage']:<20}{size:>12}{row['cpu_ms']:>10}")
@@ -0,0 +1,148 @@
+"""
+Compare the fixed-point set columns with the Decimal representation they replaced.
+
+Seeds a throwaway database, then times, per set row:
+
+- serialize: SetEntrySerializer (JSON numbers) vs a DecimalField(5, 2) serializer over
+  the same rows as Decimals, which is what the API did before,
+- aggregate: per-exercise SUM(reps * weight) as integer math on the stored hundredths vs
+  the same sum over NUMERIC casts, and vs loading the rows and summing Decimals in Python:
+
+    python manage.py bench_numeric --users 5 --weeks 104
+"""
+
+import json
+import time
+from contextlib import nullcontext
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db.models import BigIntegerField, DecimalField, ExpressionWrapper, F, Sum
+from django.db.models.functions import Cast
+from rest_framework import serializers
+
+from workouts.benchmarks.seed import SeedConfig, seed_history, throwaway_database
+from workouts.models import SetEntry
+from workouts.serializers import SetEntrySerializer
+
+
+class LegacySetEntrySerializer(serializers.Serializer):
+    """The old wire format: DecimalField(max_digits=5, decimal_places=2) strings."""
+
+    id = serializers.IntegerField()
+    order = serializers.IntegerField()
+    reps = serializers.DecimalField(max_digits=5, decimal_places=2)
+    weight = serializers.DecimalField(max_digits=5, decimal_places=2, allow_null=True)
+    notes = serializers.CharField()
+
+
+def _timed(fn, repeat):
+    fn()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return result, (time.perf_counter() - start) / repeat
+
+
+def _as_decimal(value):
+    return None if value is None else Decimal(value).quantize(Decimal("0.01"))
+
+
+class Command(BaseCommand):
+    help = "Benchmark fixed-point vs Decimal set data for serialization and aggregation."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5)
+        parser.add_argument("--weeks", type=int, default=104)
+        parser.add_argument("--repeat", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument(
+            "--use-current-db",
+            action="store_true",
+            help="seed into the configured database instead of a throwaway test database",
+        )
+        parser.add_argument("--json", action="store_true", help="print results as JSON")
+
+    def handle(self, *args, **options):
+        with nullcontext() if options["use_current_db"] else throwaway_database():
+            seed_history(
+                SeedConfig(users=options["users"], weeks=options["weeks"], seed=options["seed"])
+            )
+            rows = self._measure(options["repeat"])
+
+        if options["json"]:
+            self.stdout.write(json.dumps(rows, indent=2))
+            return
+        self.stdout.write(f"{'stage':<28}{'rows':>10}{'ms':>10}{'rows/s':>12}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['stage']:<28}{row['rows']:>10}{row['ms']:>10}{row['rows_per_s']:>12}"
+            )
+
+    def _measure(self, repeat):
+        sets = list(SetEntry.objects.all())
+        legacy = [
+            {
+                "id": s.id,
+                "order": s.order,
+                "reps": _as_decimal(s.reps),
+                "weight": _as_decimal(s.weight),
+                "notes": s.notes,
+            }
+            for s in sets
+        ]
+        decimal = DecimalField(max_digits=12, decimal_places=2)
+        per_exercise = SetEntry.objects.values("performed_exercise__exercise_id").order_by()
+        stages = [
+            ("serialize:fixed_point", lambda: SetEntrySerializer(sets, many=True).data),
+            ("serialize:decimal", lambda: LegacySetEntrySerializer(legacy, many=True).data),
+            (
+                "aggregate:db_integer",
+                lambda: list(
+                    per_exercise.annotate(
+                        v=Sum(
+                            ExpressionWrapper(
+                                F("reps") * F("weight"), output_field=BigIntegerField()
+                            )
+                        )
+                    )
+                ),
+            ),
+            (
+                "aggregate:db_numeric",
+                lambda: list(
+                    per_exercise.annotate(
+                        v=Sum(
+                            Cast(F("reps"), decimal) * Cast(F("weight"), decimal),
+                            output_field=decimal,
+                        )
+                    )
+                ),
+            ),
+            ("aggregate:python_decimal", self._python_volume),
+        ]
+        results = []
+        for stage, fn in stages:
+            _, seconds = _timed(fn, repeat)
+            results.append(
+                {
+                    "stage": stage,
+                    "rows": len(sets),
+                    "ms": round(seconds * 1000, 2),
+                    "rows_per_s": round(len(sets) / seconds) if seconds else None,
+                }
+            )
+        return results
+
+    @staticmethod
+    def _python_volume():
+        """Load every set and sum in Decimal, as analytics code had to before."""
+        totals = {}
+        for exercise_id, reps, weight in SetEntry.objects.values_list(
+            "performed_exercise__exercise_id", "reps", "weight"
+        ).iterator(chunk_size=5000):
+            if weight is not None:
+                totals[exercise_id] = totals.get(exercise_id, 0) + _as_decimal(reps) * _as_decimal(
+                    weight
+                )
+        return totals
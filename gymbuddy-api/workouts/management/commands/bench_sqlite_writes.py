@@ -0,0 +1,158 @@
+"""
+Multi-threaded SQLite write benchmark: default journaling vs the SQLITE_TUNED profile.
+
+    python manage.py bench_sqlite_writes --threads 8 --transactions 200
+
+Each profile gets a fresh database file in a temporary directory, so the project's
+own database is never touched. Every thread opens its own Django connection and runs
+short read-then-write transactions (the shape of "add a set": look up the next order,
+insert), which is what trips "database is locked" under default DEFERRED transactions.
+"""
+
+import json
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connections, transaction
+from django.db.utils import load_backend
+
+
+PROFILES = {
+    "default": {},
+    "tuned": settings.SQLITE_TUNED_OPTIONS,
+}
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent SQLite writes with and without the tuned profile."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--transactions", type=int, default=200, help="per thread")
+        parser.add_argument("--rows", type=int, default=3, help="inserts per transaction")
+        parser.add_argument("--json", action="store_true", help="print results as JSON")
+
+    def handle(self, *args, **options):
+        results = []
+        with tempfile.TemporaryDirectory() as tmp:
+            for profile, profile_options in PROFILES.items():
+                results.append(
+                    self._run_profile(
+                        profile,
+                        dict(profile_options),
+                        Path(tmp) / f"{profile}.sqlite3",
+                        options,
+                    )
+                )
+        if options["json"]:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for r in results:
+            self.stdout.write(
+                f"{r['profile']:>8}: {r['committed']}/{r['attempted']} txns committed, "
+                f"{r['locked_errors']} locked, {r['txns_per_sec']:.0f} txn/s, "
+                f"p95 {r['p95_ms']:.1f} ms"
+            )
+
+    def _run_profile(self, profile, profile_options, path, options):
+        # The benchmark aliases are attached per thread rather than added to
+        # settings.DATABASES, so they never mix with the project's own connections.
+        alias = f"bench_sqlite_{profile}"
+        settings_dict = connections.configure_settings(
+            {
+                **connections.settings,
+                alias: {
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": str(path),
+                    "OPTIONS": profile_options,
+                },
+            }
+        )[alias]
+        self._attach(alias, settings_dict)
+        try:
+            with connections[alias].cursor() as cursor:
+                cursor.execute(
+                    "CREATE TABLE bench_set (id INTEGER PRIMARY KEY, parent INTEGER, "
+                    "ord INTEGER, reps REAL, weight REAL)"
+                )
+        finally:
+            self._detach(alias)
+        return self._hammer(alias, settings_dict, profile, options)
+
+    @staticmethod
+    def _attach(alias, settings_dict):
+        backend = load_backend(settings_dict["ENGINE"])
+        connections[alias] = backend.DatabaseWrapper(settings_dict, alias)
+
+    @staticmethod
+    def _detach(alias):
+        connections[alias].close()
+        del connections[alias]
+
+    def _hammer(self, alias, settings_dict, profile, options):
+        n_threads = options["threads"]
+        per_thread = options["transactions"]
+        rows = options["rows"]
+        barrier = threading.Barrier(n_threads)
+        lock = threading.Lock()
+        latencies = []
+        counters = {"committed": 0, "locked": 0}
+
+        def worker(thread_no):
+            local_latencies = []
+            committed = locked = 0
+            self._attach(alias, settings_dict)
+            try:
+                barrier.wait()
+                for i in range(per_thread):
+                    parent = thread_no * per_thread + i
+                    start = time.perf_counter()
+                    try:
+                        with transaction.atomic(using=alias):
+                            with connections[alias].cursor() as cursor:
+                                cursor.execute(
+                                    "SELECT COALESCE(MAX(ord), 0) FROM bench_set WHERE parent = %s",
+                                    [parent],
+                                )
+                                next_order = cursor.fetchone()[0] + 1
+                                for n in range(rows):
+                                    cursor.execute(
+                                        "INSERT INTO bench_set (parent, ord, reps, weight) "
+                                        "VALUES (%s, %s, %s, %s)",
+                                        [parent, next_order + n, 8, 135.5],
+                                    )
+                        committed += 1
+                    except OperationalError:
+                        locked += 1
+                    local_latencies.append(time.perf_counter() - start)
+            finally:
+                self._detach(alias)
+                with lock:
+                    latencies.extend(local_latencies)
+                    counters["committed"] += committed
+                    counters["locked"] += locked
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(n_threads)]
+        started = time.perf_counter()
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1] if latencies else 0.0
+        return {
+            "profile": profile,
+            "threads": n_threads,
+            "attempted": n_threads * per_thread,
+            "committed": counters["committed"],
+            "locked_errors": counters["locked"],
+            "elapsed_sec": round(elapsed, 3),
+            "txns_per_sec": counters["committed"] / elapsed if elapsed else 0.0,
+            "p95_ms": p95 * 1000,
+        }
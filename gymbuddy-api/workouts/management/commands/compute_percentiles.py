@@ -0,0 +1,49 @@
+"""
+Recompute the cross-user e1RM percentile tables (workouts/rankings.py). Meant to run
+nightly; reads from the replica when one is configured.
+
+    python manage.py compute_percentiles
+    python manage.py compute_percentiles --min-users 50
+
+Tables of exercises that no longer reach --min-users lifters are removed.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from django_project.db_router import read_from_replica
+from workouts import rankings
+from workouts.models import ExercisePercentiles
+
+
+class Command(BaseCommand):
+    help = "Recompute per-exercise e1RM percentile tables across all users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--min-users", type=int, default=rankings.MIN_USERS)
+        parser.add_argument("--chunk-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        with read_from_replica():
+            # A few hundred bytes per exercise; the per-user rows are streamed.
+            tables = list(
+                rankings.compute_tables(options["min_users"], chunk_size=options["chunk_size"])
+            )
+        with transaction.atomic():
+            ExercisePercentiles.objects.exclude(
+                exercise_id__in=[t.exercise_id for t in tables]
+            ).delete()
+            ExercisePercentiles.objects.bulk_create(
+                tables,
+                update_conflicts=True,
+                unique_fields=["exercise"],
+                update_fields=["users", "cut_points", "computed_at"],
+            )
+        self.stdout.write(
+            f"computed percentiles for {len(tables)} exercise(s) "
+            f"from {sum(t.users for t in tables)} lifter best(s) "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
@@ -0,0 +1,56 @@
+"""
+Batch-compute the progressive-overload suggestions (workouts/recommend.py) into the
+Recommendations table, so GET /api/v1/workouts/recommendations/ is a lookup. Meant to
+run nightly.
+
+    python manage.py compute_recommendations               # users active in the last 30 days
+    python manage.py compute_recommendations --days 0      # everyone with a session
+    python manage.py compute_recommendations --user 12 --force
+
+Users whose stored suggestions already match their data version are skipped unless
+--force is given.
+"""
+
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from workouts import recommend
+from workouts.models import Session
+
+
+class Command(BaseCommand):
+    help = "Compute and store next-session suggestions for active users."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="limit to user id(s)")
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=30,
+            help="only users with a session in the last N days (0 for everyone)",
+        )
+        parser.add_argument("--force", action="store_true", help="recompute current entries too")
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.all()
+        if options["user"]:
+            sessions = sessions.filter(user_id__in=options["user"])
+        if options["days"]:
+            sessions = sessions.filter(date__gte=timezone.now() - timedelta(days=options["days"]))
+        user_ids = sessions.order_by("user_id").values_list("user_id", flat=True).distinct()
+
+        computed = skipped = 0
+        start = time.perf_counter()
+        for user_id in user_ids.iterator():
+            if not options["force"] and not recommend.is_stale(*recommend.lookup(user_id)):
+                skipped += 1
+                continue
+            recommend.refresh(user_id)
+            computed += 1
+        self.stdout.write(
+            f"computed suggestions for {computed} user(s), {skipped} already current, "
+            f"in {time.perf_counter() - start:.1f}s"
+        )
@@ -0,0 +1,74 @@
+"""
+Rebuild or verify the WeeklyMuscleVolume rollup against the set rows.
+
+    python manage.py rebuild_muscle_volume                # rebuild everything
+    python manage.py rebuild_muscle_volume --user 12
+    python manage.py rebuild_muscle_volume --verify       # report drift, exit 1 if any
+    python manage.py rebuild_muscle_volume --verify --fix # rebuild only drifted users
+
+Run it after changing exercise-to-muscle mappings outside the admin: the rollup only
+applies contributions as sets are written.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from workouts.fields import to_centi
+from workouts.models import WeeklyMuscleVolume
+
+
+def find_drift(user_ids=None):
+    """{user_id: [description, ...]} for every (user, week, muscle group) that disagrees."""
+    expected = {
+        (row["user_id"], row["week"], row["muscle_group_id"]): (row["sets"], row["volume"])
+        for row in WeeklyMuscleVolume.source_rows(user_ids).iterator()
+    }
+    stored = WeeklyMuscleVolume.objects.all()
+    if user_ids is not None:
+        stored = stored.filter(user_id__in=user_ids)
+    drift = {}
+    for user_id, week, group_id, sets, volume in stored.values_list(
+        "user_id", "week", "muscle_group_id", "sets", "volume"
+    ).iterator():
+        want = expected.pop((user_id, week, group_id), (0, 0))
+        # Rows bumped down to zero are equivalent to no row.
+        if want != (to_centi(sets), volume):
+            drift.setdefault(user_id, []).append(
+                f"{week} muscle group {group_id}: stored {sets} sets / {volume}, "
+                f"actual {want[0] / 100:g} sets / {want[1]}"
+            )
+    for user_id, week, group_id in expected:
+        drift.setdefault(user_id, []).append(f"{week} muscle group {group_id}: missing")
+    return drift
+
+
+class Command(BaseCommand):
+    help = "Rebuild the weekly per-muscle-group volume rollup from workout history, or check it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="limit to user id(s)")
+        parser.add_argument("--verify", action="store_true", help="compare instead of rebuilding")
+        parser.add_argument("--fix", action="store_true", help="with --verify, rebuild drifted users")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        user_ids = options["user"]
+        if not options["verify"]:
+            with transaction.atomic():
+                created = WeeklyMuscleVolume.rebuild(user_ids, batch_size=options["batch_size"])
+            self.stdout.write(f"rebuilt {created} weekly muscle volume rows")
+            return
+
+        drift = find_drift(user_ids)
+        for user_id, problems in sorted(drift.items()):
+            for problem in problems:
+                self.stdout.write(f"user {user_id}: {problem}")
+        if not drift:
+            self.stdout.write("weekly muscle volume is in sync")
+            return
+        if options["fix"]:
+            with transaction.atomic():
+                WeeklyMuscleVolume.rebuild(list(drift), batch_size=options["batch_size"])
+            self.stdout.write(f"rebuilt {len(drift)} drifted user(s)")
+            return
+        raise CommandError(f"{len(drift)} user(s) out of sync; rerun with --fix")
@@ -0,0 +1,38 @@
+"""
+Install and re-index the notes search (workouts/search.py), or check it.
+
+    python manage.py rebuild_search_index           # (re)create indexes/triggers, re-index
+    python manage.py rebuild_search_index --verify  # report problems, exit 1 if any
+
+Needed on SQLite after a migration that rebuilds workouts_session, workouts_setentry or
+workouts_userexercisenote: SQLite's table rebuild drops the triggers that keep the FTS5
+tables current. On PostgreSQL the indexes maintain themselves; this only recreates them.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+from workouts import search
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text notes search index, or check it."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default=DEFAULT_DB_ALIAS)
+        parser.add_argument("--verify", action="store_true", help="check instead of rebuilding")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if not options["verify"]:
+            with transaction.atomic(using=connection.alias):
+                search.rebuild(connection)
+            self.stdout.write(f"rebuilt notes search on {connection.vendor}")
+            return
+
+        problems = search.verify(connection)
+        for problem in problems:
+            self.stdout.write(problem)
+        if problems:
+            raise CommandError(f"{len(problems)} search index problem(s); rerun without --verify")
+        self.stdout.write("notes search index is in sync")
@@ -0,0 +1,69 @@
+"""
+Recompute or verify the denormalized Session counters (exercise_count, set_count,
+total_volume) against the exercise and set rows.
+
+    python manage.py reconcile_session_counters                # recount everything
+    python manage.py reconcile_session_counters --user 12
+    python manage.py reconcile_session_counters --verify       # report drift, exit 1 if any
+    python manage.py reconcile_session_counters --verify --fix # recount only drifted sessions
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from workouts.models import Session
+
+
+def recount_in_batches(sessions, batch_size):
+    """Recount `sessions` one primary-key range at a time, so no UPDATE runs for long."""
+    total = 0
+    last_pk = 0
+    while True:
+        ids = list(
+            sessions.filter(pk__gt=last_pk).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        with transaction.atomic():
+            total += Session.recount(Session.objects.filter(pk__in=ids))
+        last_pk = ids[-1]
+
+
+class Command(BaseCommand):
+    help = "Recompute per-session exercise/set/volume counters, or check them for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="limit to user id(s)")
+        parser.add_argument("--verify", action="store_true", help="compare instead of recounting")
+        parser.add_argument("--fix", action="store_true", help="with --verify, recount drifted sessions")
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        sessions = Session.objects.all()
+        if options["user"]:
+            sessions = sessions.filter(user_id__in=options["user"])
+        if not options["verify"]:
+            count = recount_in_batches(sessions, options["batch_size"])
+            self.stdout.write(f"recounted {count} session(s)")
+            return
+
+        fields = ["pk", "user_id"]
+        for name in Session.COUNTERS:
+            fields += [name, f"actual_{name}"]
+        drifted = []
+        for row in Session.drifted(sessions).order_by("pk").values(*fields).iterator():
+            drifted.append(row["pk"])
+            problems = ", ".join(
+                f"{name} {row[name]} (actual {row[f'actual_{name}']})"
+                for name in Session.COUNTERS
+                if row[name] != row[f"actual_{name}"]
+            )
+            self.stdout.write(f"session {row['pk']} (user {row['user_id']}): {problems}")
+        if not drifted:
+            self.stdout.write("session counters are in sync")
+            return
+        if options["fix"]:
+            recount_in_batches(Session.objects.filter(pk__in=drifted), options["batch_size"])
+            self.stdout.write(f"recounted {len(drifted)} drifted session(s)")
+            return
+        raise CommandError(f"{len(drifted)} session(s) out of sync; rerun with --fix")
@@ -0,0 +1,97 @@
+"""
+Generate a large, realistic dataset for scale testing.
+
+    python manage.py seed_workouts --users 1000 --weeks 156 --seed 42
+    python manage.py seed_workouts --users 5000 --copy          # PostgreSQL COPY
+
+Users are named bench-N@bench.gymbuddy.local and share an unusable password; mint
+API tokens for them with --tokens if you want to drive a live server with bench_api.
+"""
+
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from rest_framework.authtoken.models import Token
+
+from workouts.benchmarks.seed import SeedConfig, seed_history
+
+
+def _int_range(value):
+    """Parse "4-6" (or "5") into an inclusive (low, high) tuple."""
+    low, _, high = value.partition("-")
+    try:
+        bounds = (int(low), int(high or low))
+    except ValueError:
+        raise CommandError(f"invalid range {value!r}; use N or LOW-HIGH")
+    if bounds[0] < 1 or bounds[0] > bounds[1]:
+        raise CommandError(f"invalid range {value!r}")
+    return bounds
+
+
+class Command(BaseCommand):
+    help = "Bulk-generate users with programs and years of workout history."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=100)
+        parser.add_argument("--weeks", type=int, default=52, help="history length per user")
+        parser.add_argument("--sessions-per-week", type=float, default=3.0)
+        parser.add_argument("--programs", type=int, default=1, help="programs per user")
+        parser.add_argument("--days-per-program", type=int, default=3)
+        parser.add_argument("--exercises", default="4-6", help="exercises per session")
+        parser.add_argument("--sets", default="3-5", help="sets per exercise")
+        parser.add_argument("--reps", default="5-12", help="reps per set")
+        parser.add_argument(
+            "--catalog",
+            choices=["builtin", "db"],
+            default="builtin",
+            help="builtin weighted exercise mix, or every Exercise row in the database",
+        )
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--end-date", help="YYYY-MM-DD the history ends on (default today)")
+        parser.add_argument("--user-chunk", type=int, default=50)
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--copy", action="store_true", help="use PostgreSQL COPY")
+        parser.add_argument("--tokens", action="store_true", help="print an API token per user")
+
+    def handle(self, *args, **options):
+        if options["copy"] and connection.vendor != "postgresql":
+            raise CommandError("--copy requires PostgreSQL")
+        config = SeedConfig(
+            users=options["users"],
+            weeks=options["weeks"],
+            sessions_per_week=options["sessions_per_week"],
+            programs_per_user=options["programs"],
+            days_per_program=options["days_per_program"],
+            exercises_per_session=_int_range(options["exercises"]),
+            sets_per_exercise=_int_range(options["sets"]),
+            reps=_int_range(options["reps"]),
+            catalog=options["catalog"],
+            seed=options["seed"],
+            user_chunk=options["user_chunk"],
+            batch_size=options["batch_size"],
+        )
+        if options["end_date"]:
+            config.end_date = datetime.strptime(options["end_date"], "%Y-%m-%d").replace(
+                tzinfo=dt_timezone.utc
+            )
+
+        log = self.stdout.write if options["verbosity"] > 1 else None
+        started = time.perf_counter()
+        try:
+            with transaction.atomic():
+                result = seed_history(config, use_copy=options["copy"], log=log)
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        elapsed = time.perf_counter() - started
+
+        self.stdout.write(
+            f"{len(result.users)} users, {result.programs} programs, {result.sessions} sessions, "
+            f"{result.performed_exercises} exercises, {result.set_entries} sets "
+            f"in {elapsed:.1f}s ({result.set_entries / elapsed if elapsed else 0:.0f} sets/s)"
+        )
+        if options["tokens"]:
+            for user in result.users:
+                token, _ = Token.objects.get_or_create(user=user)
+                self.stdout.write(f"{user.email} {token.key}")
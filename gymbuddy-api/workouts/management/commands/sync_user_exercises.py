@@ -0,0 +1,71 @@
+"""
+Backfill or verify the UserExercise index against PerformedExercise.
+
+    python manage.py sync_user_exercises                # rebuild everything
+    python manage.py sync_user_exercises --user 12 --user 40
+    python manage.py sync_user_exercises --verify       # report drift, exit 1 if any
+    python manage.py sync_user_exercises --verify --fix # rebuild only drifted users
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from workouts.models import UserExercise
+
+
+def find_drift(user_ids=None):
+    """{user_id: [description, ...]} for every (user, exercise) row that disagrees with the source."""
+    expected = {
+        (row["session__user_id"], row["exercise_id"]): (row["first"], row["last"], row["count"])
+        for row in UserExercise.source_rows(user_ids).iterator()
+    }
+    stored = UserExercise.objects.all()
+    if user_ids is not None:
+        stored = stored.filter(user_id__in=user_ids)
+    drift = {}
+    for user_id, exercise_id, first, last, count in stored.values_list(
+        "user_id", "exercise_id", "first_performed_at", "last_performed_at", "times_performed"
+    ).iterator():
+        want = expected.pop((user_id, exercise_id), None)
+        if want is None:
+            drift.setdefault(user_id, []).append(f"exercise {exercise_id}: not performed")
+        elif want != (first, last, count):
+            drift.setdefault(user_id, []).append(
+                f"exercise {exercise_id}: stored {count}x {first:%Y-%m-%d}..{last:%Y-%m-%d}, "
+                f"actual {want[2]}x {want[0]:%Y-%m-%d}..{want[1]:%Y-%m-%d}"
+            )
+    for user_id, exercise_id in expected:
+        drift.setdefault(user_id, []).append(f"exercise {exercise_id}: missing")
+    return drift
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-user exercise index from workout history, or check it for drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", type=int, action="append", help="limit to user id(s)")
+        parser.add_argument("--verify", action="store_true", help="compare instead of rebuilding")
+        parser.add_argument("--fix", action="store_true", help="with --verify, rebuild drifted users")
+        parser.add_argument("--batch-size", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        user_ids = options["user"]
+        if not options["verify"]:
+            with transaction.atomic():
+                created = UserExercise.rebuild(user_ids, batch_size=options["batch_size"])
+            self.stdout.write(f"rebuilt {created} user exercise rows")
+            return
+
+        drift = find_drift(user_ids)
+        for user_id, problems in sorted(drift.items()):
+            for problem in problems:
+                self.stdout.write(f"user {user_id}: {problem}")
+        if not drift:
+            self.stdout.write("user exercise index is in sync")
+            return
+        if options["fix"]:
+            with transaction.atomic():
+                UserExercise.rebuild(list(drift), batch_size=options["batch_size"])
+            self.stdout.write(f"rebuilt {len(drift)} drifted user(s)")
+            return
+        raise CommandError(f"{len(drift)} user(s) out of sync; rerun with --fix")
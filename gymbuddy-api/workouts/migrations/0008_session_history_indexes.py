@@ -0,0 +1,27 @@
+# Generated by Django 6.0.2 on 2026-10-19 10:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0007_alter_setentry_reps"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="performedexercise",
+            index=models.Index(fields=["exercise", "session"], name="performed_exercise_session_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(fields=["user", "-date"], name="session_user_date_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="session",
+            index=models.Index(fields=["program", "-date"], name="session_program_date_idx"),
+        ),
+    ]
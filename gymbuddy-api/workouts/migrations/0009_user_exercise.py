@@ -0,0 +1,56 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Min
+
+
+def backfill_user_exercises(apps, schema_editor):
+    PerformedExercise = apps.get_model("workouts", "PerformedExercise")
+    UserExercise = apps.get_model("workouts", "UserExercise")
+    rows = (
+        PerformedExercise.objects.values("session__user_id", "exercise_id")
+        .annotate(first=Min("session__date"), last=Max("session__date"), count=Count("id"))
+        .order_by()
+    )
+    UserExercise.objects.bulk_create(
+        (
+            UserExercise(
+                user_id=row["session__user_id"],
+                exercise_id=row["exercise_id"],
+                first_performed_at=row["first"],
+                last_performed_at=row["last"],
+                times_performed=row["count"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0008_session_history_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserExercise",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("first_performed_at", models.DateTimeField()),
+                ("last_performed_at", models.DateTimeField()),
+                ("times_performed", models.PositiveIntegerField()),
+                ("exercise", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="user_stats", to="workouts.exercise")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="exercise_stats", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["user", "-last_performed_at"], name="user_exercise_recent_idx"), models.Index(fields=["user", "-times_performed"], name="user_exercise_frequent_idx")],
+                "unique_together": {("user", "exercise")},
+            },
+        ),
+        migrations.RunPython(backfill_user_exercises, migrations.RunPython.noop),
+    ]
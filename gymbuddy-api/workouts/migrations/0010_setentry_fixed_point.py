@@ -0,0 +1,70 @@
+# Generated by Django 6.0.2 on 2026-10-19 12:10
+
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import F, IntegerField
+from django.db.models.functions import Cast, Round
+
+import workouts.fields
+
+BATCH_SIZE = 5000
+
+
+def decimals_to_centi(apps, schema_editor):
+    SetEntry = apps.get_model("workouts", "SetEntry")
+    SetEntry.objects.update(
+        reps_centi=Cast(Round(F("reps") * 100), IntegerField()),
+        weight_centi=Cast(Round(F("weight") * 100), IntegerField()),
+    )
+
+
+def centi_to_decimals(apps, schema_editor):
+    SetEntry = apps.get_model("workouts", "SetEntry")
+    batch = []
+    for entry in SetEntry.objects.only("id", "reps_centi", "weight_centi").iterator():
+        # FixedPointField already reads the hundredths back in natural units.
+        entry.reps = Decimal(str(entry.reps_centi))
+        if entry.weight_centi is not None:
+            entry.weight = Decimal(str(entry.weight_centi))
+        batch.append(entry)
+        if len(batch) >= BATCH_SIZE:
+            SetEntry.objects.bulk_update(batch, ["reps", "weight"])
+            batch = []
+    SetEntry.objects.bulk_update(batch, ["reps", "weight"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0009_user_exercise"),
+    ]
+
+    operations = [
+        # Nullable while both columns exist, so unapplying can re-add it before refilling.
+        migrations.AlterField(
+            model_name="setentry",
+            name="reps",
+            field=models.DecimalField(decimal_places=2, max_digits=5, null=True),
+        ),
+        migrations.AddField(
+            model_name="setentry",
+            name="reps_centi",
+            field=workouts.fields.FixedPointField(null=True),
+        ),
+        migrations.AddField(
+            model_name="setentry",
+            name="weight_centi",
+            field=workouts.fields.FixedPointField(blank=True, null=True),
+        ),
+        migrations.RunPython(decimals_to_centi, centi_to_decimals),
+        migrations.RemoveField(model_name="setentry", name="reps"),
+        migrations.RemoveField(model_name="setentry", name="weight"),
+        migrations.RenameField(model_name="setentry", old_name="reps_centi", new_name="reps"),
+        migrations.RenameField(model_name="setentry", old_name="weight_centi", new_name="weight"),
+        migrations.AlterField(
+            model_name="setentry",
+            name="reps",
+            field=workouts.fields.FixedPointField(),
+        ),
+    ]
@@ -0,0 +1,78 @@
+# Generated by Django 6.0.2 on 2026-10-19 11:30
+
+from django.db import migrations, models
+from django.db.models import (
+    BigIntegerField,
+    Count,
+    ExpressionWrapper,
+    F,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Cast, Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Session = apps.get_model("workouts", "Session")
+    PerformedExercise = apps.get_model("workouts", "PerformedExercise")
+    SetEntry = apps.get_model("workouts", "SetEntry")
+    zero = Value(0, output_field=BigIntegerField())
+    exercises = (
+        PerformedExercise.objects.filter(session=OuterRef("pk"))
+        .order_by()
+        .values("session")
+        .annotate(n=Count("id"))
+        .values("n")
+    )
+    sets = (
+        SetEntry.objects.filter(performed_exercise__session=OuterRef("pk"))
+        .order_by()
+        .values("performed_exercise__session")
+    )
+    # Widen before multiplying: the columns are int4 on PostgreSQL.
+    volume = ExpressionWrapper(
+        Cast(F("reps"), BigIntegerField()) * Cast(F("weight"), BigIntegerField()),
+        output_field=BigIntegerField(),
+    )
+    Session.objects.update(
+        exercise_count=Coalesce(Subquery(exercises), 0),
+        set_count=Coalesce(Subquery(sets.annotate(n=Count("id")).values("n")), 0),
+        total_volume=Coalesce(
+            Subquery(sets.annotate(v=Sum(volume)).values("v"), output_field=BigIntegerField()),
+            zero,
+        ),
+        last_modified=F("date"),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0010_setentry_fixed_point"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="session",
+            name="exercise_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="session",
+            name="last_modified",
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name="session",
+            name="set_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name="session",
+            name="total_volume",
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:05
+
+from django.db import migrations
+
+from workouts import search
+
+
+def install(apps, schema_editor):
+    search.rebuild(schema_editor.connection)
+
+
+def uninstall(apps, schema_editor):
+    search.uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("workouts", "0011_session_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(install, uninstall),
+    ]
@@ -0,0 +1,164 @@
+# Generated by Django 6.0.2 on 2026-10-19 14:40
+
+import django.db.models.deletion
+import workouts.fields
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import BigIntegerField, DateField, ExpressionWrapper, F, IntegerField, Sum
+from django.db.models.functions import Cast, Coalesce, TruncWeek
+
+# Frozen copy of workouts.taxonomy as of this migration: (pattern, {group: contribution}).
+# Later additions go in that module, which maps new exercises as they're created.
+MUSCLE_GROUPS = [
+    "Back",
+    "Biceps",
+    "Calves",
+    "Chest",
+    "Core",
+    "Glutes",
+    "Hamstrings",
+    "Quads",
+    "Shoulders",
+    "Triceps",
+]
+EXERCISES = {
+    "Bench Press": ("horizontal_push", {"Chest": 1, "Triceps": 0.5, "Shoulders": 0.5}),
+    "Incline DB Press": ("horizontal_push", {"Chest": 1, "Shoulders": 0.5, "Triceps": 0.5}),
+    "Overhead Press": ("vertical_push", {"Shoulders": 1, "Triceps": 0.5}),
+    "Dips": ("vertical_push", {"Triceps": 1, "Chest": 0.5}),
+    "Tricep Pushdown": ("isolation", {"Triceps": 1}),
+    "Lateral Raise": ("isolation", {"Shoulders": 1}),
+    "Squat": ("squat", {"Quads": 1, "Glutes": 0.5}),
+    "Leg Press": ("squat", {"Quads": 1, "Glutes": 0.5}),
+    "Romanian Deadlift": ("hinge", {"Hamstrings": 1, "Glutes": 0.5}),
+    "Deadlift": ("hinge", {"Glutes": 1, "Hamstrings": 0.5, "Back": 0.5}),
+    "Leg Curl": ("isolation", {"Hamstrings": 1}),
+    "Calf Raise": ("isolation", {"Calves": 1}),
+    "Pull-up": ("vertical_pull", {"Back": 1, "Biceps": 0.5}),
+    "Lat Pulldown": ("vertical_pull", {"Back": 1, "Biceps": 0.5}),
+    "Barbell Row": ("horizontal_pull", {"Back": 1, "Biceps": 0.5}),
+    "Face Pull": ("horizontal_pull", {"Shoulders": 1, "Back": 0.5}),
+    "Bicep Curl": ("isolation", {"Biceps": 1}),
+    "Hammer Curl": ("isolation", {"Biceps": 1}),
+    "Plank": ("core", {"Core": 1}),
+}
+
+
+def seed_taxonomy(apps, schema_editor):
+    """
+    Backfill: create the muscle groups, map the exercises that exist now (names
+    matched case-insensitively, as taxonomy.mapping_for does), and fill the rollup.
+    """
+    MuscleGroup = apps.get_model("workouts", "MuscleGroup")
+    Exercise = apps.get_model("workouts", "Exercise")
+    ExerciseMuscleGroup = apps.get_model("workouts", "ExerciseMuscleGroup")
+    SetEntry = apps.get_model("workouts", "SetEntry")
+    WeeklyMuscleVolume = apps.get_model("workouts", "WeeklyMuscleVolume")
+
+    by_name = {name.casefold(): mapping for name, mapping in EXERCISES.items()}
+    groups = {name: MuscleGroup.objects.create(name=name) for name in MUSCLE_GROUPS}
+    links = []
+    for exercise in Exercise.objects.all():
+        mapping = by_name.get(" ".join(exercise.name.split()).casefold())
+        if mapping is None:
+            continue
+        pattern, contributions = mapping
+        exercise.movement_pattern = pattern
+        exercise.save(update_fields=["movement_pattern"])
+        links += [
+            ExerciseMuscleGroup(exercise=exercise, muscle_group=groups[name], contribution=share)
+            for name, share in contributions.items()
+        ]
+    ExerciseMuscleGroup.objects.bulk_create(links)
+
+    path = "performed_exercise__exercise__muscle_contributions__"
+    share = ExpressionWrapper(F(path + "contribution"), output_field=IntegerField())
+    # Widen before multiplying: the columns are int4 on PostgreSQL, and 10 reps x 225
+    # at a full share is already 2.25e9 millionths.
+    volume = ExpressionWrapper(
+        Cast(F("reps"), BigIntegerField())
+        * Cast(F("weight"), BigIntegerField())
+        * Cast(share, BigIntegerField()),
+        output_field=BigIntegerField(),
+    )
+    rows = (
+        SetEntry.objects.filter(**{path + "isnull": False})
+        .values(
+            user=F("performed_exercise__session__user_id"),
+            week_start=TruncWeek("performed_exercise__session__date", output_field=DateField()),
+            group=F(path + "muscle_group_id"),
+        )
+        .annotate(n=Sum(share), v=Coalesce(Sum(volume), 0))
+        .order_by()
+    )
+    WeeklyMuscleVolume.objects.bulk_create(
+        (
+            WeeklyMuscleVolume(
+                user_id=row["user"],
+                week=row["week_start"],
+                muscle_group_id=row["group"],
+                sets=row["n"] / 100,
+                volume=row["v"],
+            )
+            for row in rows.iterator()
+        ),
+        batch_size=5000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0012_notes_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MuscleGroup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("name", models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                "ordering": ["name"],
+            },
+        ),
+        migrations.AddField(
+            model_name="exercise",
+            name="movement_pattern",
+            field=models.CharField(blank=True, choices=[("squat", "Squat"), ("hinge", "Hinge"), ("lunge", "Lunge"), ("horizontal_push", "Horizontal push"), ("vertical_push", "Vertical push"), ("horizontal_pull", "Horizontal pull"), ("vertical_pull", "Vertical pull"), ("carry", "Carry"), ("core", "Core"), ("isolation", "Isolation")], max_length=20),
+        ),
+        migrations.CreateModel(
+            name="ExerciseMuscleGroup",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("contribution", workouts.fields.FixedPointField(default=1)),
+                ("exercise", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="muscle_contributions", to="workouts.exercise")),
+                ("muscle_group", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="exercise_contributions", to="workouts.musclegroup")),
+            ],
+            options={
+                "unique_together": {("exercise", "muscle_group")},
+            },
+        ),
+        migrations.AddField(
+            model_name="exercise",
+            name="muscle_groups",
+            field=models.ManyToManyField(blank=True, related_name="exercises", through="workouts.ExerciseMuscleGroup", to="workouts.musclegroup"),
+        ),
+        migrations.CreateModel(
+            name="WeeklyMuscleVolume",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("week", models.DateField()),
+                ("sets", workouts.fields.FixedPointField(default=0)),
+                ("volume", models.BigIntegerField(default=0)),
+                ("muscle_group", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="weekly_volume", to="workouts.musclegroup")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name="weekly_muscle_volume", to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "unique_together": {("user", "week", "muscle_group")},
+            },
+        ),
+        migrations.RunPython(seed_taxonomy, migrations.RunPython.noop),
+    ]
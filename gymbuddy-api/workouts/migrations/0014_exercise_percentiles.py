@@ -0,0 +1,24 @@
+# Generated by Django 6.0.2 on 2026-10-19 15:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0013_muscle_groups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ExercisePercentiles",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("users", models.PositiveIntegerField()),
+                ("cut_points", models.BinaryField()),
+                ("computed_at", models.DateTimeField()),
+                ("exercise", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="percentiles", to="workouts.exercise")),
+            ],
+        ),
+    ]
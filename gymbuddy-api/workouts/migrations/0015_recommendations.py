@@ -0,0 +1,28 @@
+# Generated by Django 6.0.2 on 2026-10-19 16:05
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("workouts", "0014_exercise_percentiles"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Recommendations",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("algorithm", models.PositiveSmallIntegerField()),
+                ("version", models.CharField(max_length=64)),
+                ("computed_at", models.DateTimeField()),
+                ("exercises", models.JSONField(default=list, encoder=django.core.serializers.json.DjangoJSONEncoder)),
+                ("user", models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name="recommendations", to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+    ]
@@ -1,6 +1,56 @@
 # workouts/models.py
+from datetime import timedelta
+
 from django.conf import settings
-from django.db import models
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, models
+from django.db.models import (
+    BigIntegerField,
+    Count,
+    ExpressionWrapper,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+    Value,
+)
+from django.db.models.functions import Coalesce, Greatest, TruncWeek
+from django.utils import timezone
+
+from .fields import FixedPointField, centi, from_centi, to_centi, wide
+
+
+def week_start(value):
+    """The Monday of `value`'s week, in the current time zone (as TruncWeek computes it)."""
+    day = timezone.localdate(value)
+    return day - timedelta(days=day.weekday())
+
+
+class MuscleGroup(models.Model):
+    """A muscle group that exercises train (Chest, Quads, ...)."""
+
+    name = models.CharField(max_length=50, unique=True)
+
+    class Meta:
+        ordering = ["name"]
+
+    def __str__(self):
+        return self.name
+
+
+class MovementPattern(models.TextChoices):
+    SQUAT = "squat", "Squat"
+    HINGE = "hinge", "Hinge"
+    LUNGE = "lunge", "Lunge"
+    HORIZONTAL_PUSH = "horizontal_push", "Horizontal push"
+    VERTICAL_PUSH = "vertical_push", "Vertical push"
+    HORIZONTAL_PULL = "horizontal_pull", "Horizontal pull"
+    VERTICAL_PULL = "vertical_pull", "Vertical pull"
+    CARRY = "carry", "Carry"
+    CORE = "core", "Core"
+    ISOLATION = "isolation", "Isolation"
 
 
 class Exercise(models.Model):
@@ -8,11 +58,42 @@ class Exercise(models.Model):
 
     name = models.CharField(max_length=100, unique=True)
     description = models.TextField(blank=True)
+    movement_pattern = models.CharField(max_length=20, choices=MovementPattern.choices, blank=True)
+    muscle_groups = models.ManyToManyField(
+        MuscleGroup,
+        through="ExerciseMuscleGroup",
+        related_name="exercises",
+        blank=True,
+    )
 
     def __str__(self):
         return self.name
 
 
+class ExerciseMuscleGroup(models.Model):
+    """
+    How much one set of an exercise counts toward a muscle group: 1 for a prime mover,
+    fractions (0.5) for synergists, so a bench press set is a chest set and half a
+    triceps set.
+    """
+
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name="muscle_contributions",
+    )
+    muscle_group = models.ForeignKey(
+        MuscleGroup,
+        on_delete=models.CASCADE,
+        related_name="exercise_contributions",
+    )
+    # Stored as integer hundredths like the set columns (1 -> 100, 0.5 -> 50).
+    contribution = FixedPointField(default=1)
+
+    class Meta:
+        unique_together = ("exercise", "muscle_group")
+
+
 class Program(models.Model):
     """A training program that groups multiple workout sessions (e.g. Push/Pull/Legs, 5/3/1)."""
 
@@ -50,9 +131,97 @@ class Session(models.Model):
     date = models.DateTimeField(auto_now_add=True)  # when the workout was logged
     name = models.CharField(max_length=100, blank=True)  # “Push day”, etc.
     notes = models.TextField(blank=True)
+    # Denormalized from the session's exercises and sets so listings don't join and
+    # count them. Views adjust them with bump() as they write;
+    # `manage.py reconcile_session_counters` recomputes them from the rows.
+    exercise_count = models.PositiveIntegerField(default=0)
+    set_count = models.PositiveIntegerField(default=0)
+    # SUM(reps * weight) over the sets, in 1/10000ths (hundredths x hundredths).
+    total_volume = models.BigIntegerField(default=0)
+    last_modified = models.DateTimeField(auto_now=True)
+
+    COUNTERS = ("exercise_count", "set_count", "total_volume")
 
     class Meta:
         ordering = ["-date"]
+        indexes = [
+            # History listings, range filters and keyset pagination for one user.
+            models.Index(fields=["user", "-date"], name="session_user_date_idx"),
+            models.Index(fields=["program", "-date"], name="session_program_date_idx"),
+        ]
+
+    @classmethod
+    def bump(cls, session_id, exercises=0, sets=0, volume=0):
+        """
+        Add deltas to a session's counters and touch last_modified, in one UPDATE of
+        F() expressions so concurrent writers can't lose each other's changes.
+
+        Decrements stop at zero: a counter that already drifted low (rows written
+        outside these paths) must not fail the request; reconcile repairs it.
+        """
+
+        def shift(name, delta):
+            value = F(name) + delta
+            return Greatest(value, Value(0)) if delta < 0 else value
+
+        cls.objects.filter(pk=session_id).update(
+            exercise_count=shift("exercise_count", exercises),
+            set_count=shift("set_count", sets),
+            total_volume=shift("total_volume", volume),
+            last_modified=timezone.now(),
+        )
+
+    @classmethod
+    def actual_counters(cls):
+        """{counter: correlated subquery} recomputing each counter from the rows."""
+        zero = Value(0, output_field=BigIntegerField())
+        exercises = (
+            PerformedExercise.objects.filter(session=OuterRef("pk"))
+            .order_by()
+            .values("session")
+            .annotate(n=Count("id"))
+            .values("n")
+        )
+        sets = (
+            SetEntry.objects.filter(performed_exercise__session=OuterRef("pk"))
+            .order_by()
+            .values("performed_exercise__session")
+        )
+        volume = ExpressionWrapper(wide("reps") * wide("weight"), output_field=BigIntegerField())
+        return {
+            "exercise_count": Coalesce(Subquery(exercises), 0),
+            "set_count": Coalesce(Subquery(sets.annotate(n=Count("id")).values("n")), 0),
+            "total_volume": Coalesce(
+                Subquery(sets.annotate(v=Sum(volume)).values("v"), output_field=BigIntegerField()),
+                zero,
+            ),
+        }
+
+    @classmethod
+    def drifted(cls, sessions=None):
+        """Sessions (from `sessions`, default all) whose stored counters disagree with the rows."""
+        sessions = cls.objects.all() if sessions is None else sessions
+        actual = {f"actual_{name}": expr for name, expr in cls.actual_counters().items()}
+        return sessions.annotate(**actual).exclude(
+            **{name: F(f"actual_{name}") for name in cls.COUNTERS}
+        )
+
+    @classmethod
+    def recount(cls, sessions):
+        """Recompute the counters of every session in `sessions` in one UPDATE."""
+        return sessions.update(**cls.actual_counters())
+
+    @classmethod
+    def resync(cls, session_ids):
+        """
+        Recount and touch last_modified on sessions whose rows were written outside the
+        API views (the admin), so history versions see the change. One UPDATE.
+        """
+        if not session_ids:
+            return 0
+        return cls.objects.filter(pk__in=session_ids).update(
+            **cls.actual_counters(), last_modified=timezone.now()
+        )
 
 
 class PerformedExercise(models.Model):
@@ -75,6 +244,10 @@ class PerformedExercise(models.Model):
     class Meta:
         ordering = ["order"]
         unique_together = ("session", "order")
+        indexes = [
+            # "Sessions containing exercise X" EXISTS probes and per-exercise history.
+            models.Index(fields=["exercise", "session"], name="performed_exercise_session_idx"),
+        ]
 
 
 class SetEntry(models.Model):
@@ -86,14 +259,22 @@ class SetEntry(models.Model):
         related_name="sets",
     )
     order = models.PositiveSmallIntegerField()
-    reps = models.DecimalField(max_digits=5, decimal_places=2)
-    weight = models.DecimalField(max_digits=5, decimal_places=2, null=True, blank=True)
+    # Stored as integer hundredths; read back as int/float (see workouts/fields.py).
+    reps = FixedPointField()
+    weight = FixedPointField(null=True, blank=True)
     notes = models.CharField(max_length=200, blank=True)
 
     class Meta:
         ordering = ["order"]
         unique_together = ("performed_exercise", "order")
 
+    @property
+    def volume(self):
+        """reps x weight in 1/10000ths: this set's share of Session.total_volume."""
+        if self.weight is None:
+            return 0
+        return to_centi(self.reps) * to_centi(self.weight)
+
 
 class UserExerciseNote(models.Model):
     """Note for next time the user does this exercise (one per user per exercise type)."""
@@ -125,3 +306,270 @@ class UserExerciseNote(models.Model):
         """Bulk-clear notes for multiple exercises at once."""
         if exercise_ids:
             cls.objects.filter(user=user, exercise_id__in=exercise_ids).delete()
+
+
+class UserExercise(models.Model):
+    """
+    Which exercises a user has performed, with first/last dates and how often.
+
+    Derived from PerformedExercise: views call refresh_for() (directly, or through the
+    refresh_user_exercises job) after writes that add, remove, move or re-date performed
+    exercises; `manage.py sync_user_exercises` backfills and verifies it.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="exercise_stats",
+    )
+    exercise = models.ForeignKey(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name="user_stats",
+    )
+    first_performed_at = models.DateTimeField()
+    last_performed_at = models.DateTimeField()
+    times_performed = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ("user", "exercise")
+        indexes = [
+            models.Index(fields=["user", "-last_performed_at"], name="user_exercise_recent_idx"),
+            models.Index(fields=["user", "-times_performed"], name="user_exercise_frequent_idx"),
+        ]
+
+    @staticmethod
+    def source_rows(user_ids=None, exercise_ids=None):
+        """What the table should contain, aggregated straight from PerformedExercise."""
+        performed = PerformedExercise.objects.all()
+        if user_ids is not None:
+            performed = performed.filter(session__user_id__in=user_ids)
+        if exercise_ids is not None:
+            performed = performed.filter(exercise_id__in=exercise_ids)
+        return (
+            performed.values("session__user_id", "exercise_id")
+            .annotate(
+                first=Min("session__date"),
+                last=Max("session__date"),
+                count=Count("id"),
+            )
+            .order_by()
+        )
+
+    @classmethod
+    def _from_source(cls, row):
+        return cls(
+            user_id=row["session__user_id"],
+            exercise_id=row["exercise_id"],
+            first_performed_at=row["first"],
+            last_performed_at=row["last"],
+            times_performed=row["count"],
+        )
+
+    @classmethod
+    def refresh_for(cls, user_id, exercise_ids):
+        """Recompute the rows for one user's exercises (upsert, or delete when none are left)."""
+        exercise_ids = set(exercise_ids)
+        if not exercise_ids:
+            return
+        rows = [cls._from_source(r) for r in cls.source_rows([user_id], exercise_ids)]
+        if rows:
+            cls.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["user", "exercise"],
+                update_fields=["first_performed_at", "last_performed_at", "times_performed"],
+            )
+        gone = exercise_ids - {r.exercise_id for r in rows}
+        if gone:
+            cls.objects.filter(user_id=user_id, exercise_id__in=gone).delete()
+
+    @classmethod
+    def rebuild(cls, user_ids=None, batch_size=5000):
+        """Replace the rows for user_ids (default: everyone) from PerformedExercise."""
+        stale = cls.objects.all() if user_ids is None else cls.objects.filter(user_id__in=user_ids)
+        stale.delete()
+        batch = []
+        created = 0
+        for row in cls.source_rows(user_ids).iterator(chunk_size=batch_size):
+            batch.append(cls._from_source(row))
+            if len(batch) >= batch_size:
+                cls.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            cls.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+
+class WeeklyMuscleVolume(models.Model):
+    """
+    Sets and volume per user, week and muscle group, weighted by ExerciseMuscleGroup,
+    so "chest sets this week" is one indexed row read.
+
+    Derived from SetEntry: views call bump() with each write's deltas, in the same
+    request; `manage.py rebuild_muscle_volume` recomputes it from the rows, which is
+    also how a changed exercise mapping reaches history (ExerciseAdmin does it on save).
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="weekly_muscle_volume",
+    )
+    muscle_group = models.ForeignKey(
+        MuscleGroup,
+        on_delete=models.CASCADE,
+        related_name="weekly_volume",
+    )
+    week = models.DateField()  # Monday, see week_start()
+    # Weighted set count in hundredths (a half-counted set adds 0.5).
+    sets = FixedPointField(default=0)
+    # SUM(reps * weight * contribution) in millionths (hundredths x hundredths x hundredths).
+    volume = models.BigIntegerField(default=0)
+
+    class Meta:
+        # Also the index behind the dashboard's "this user's last N weeks" read.
+        unique_together = ("user", "week", "muscle_group")
+
+    @classmethod
+    def bump(cls, user_id, deltas):
+        """
+        Apply (week, exercise_id, sets, volume) deltas, volume in 1/10000ths as
+        SetEntry.volume, spread over each exercise's muscle groups by contribution.
+
+        One INSERT ... ON CONFLICT DO UPDATE for all of them, adding to the stored
+        values in the database so concurrent writers can't lose each other's changes.
+        Like Session.bump, stored totals stop at zero rather than fail on drift.
+        """
+        totals = {}
+        for week, exercise_id, sets, volume in deltas:
+            n, v = totals.get((week, exercise_id), (0, 0))
+            totals[(week, exercise_id)] = (n + sets, v + volume)
+        params = [user_id]
+        for (week, exercise_id), (n, v) in totals.items():
+            if n or v:
+                params += [week, exercise_id, n, v]
+        if len(params) == 1:
+            return
+
+        def clamp(expr):
+            return f"CASE WHEN {expr} < 0 THEN 0 ELSE {expr} END"
+
+        table = cls._meta.db_table
+        values = ", ".join(["(%s, %s, %s, %s)"] * ((len(params) - 1) // 4))
+        # VALUES columns are column1..column4 on both SQLite and PostgreSQL.
+        sql = f"""
+            INSERT INTO {table} (user_id, week, muscle_group_id, sets, volume)
+            SELECT %s, d.column1, m.muscle_group_id,
+                   SUM(d.column3 * m.contribution), SUM(d.column4 * m.contribution)
+            FROM (VALUES {values}) AS d, {ExerciseMuscleGroup._meta.db_table} m
+            WHERE m.exercise_id = d.column2
+            GROUP BY d.column1, m.muscle_group_id
+            ON CONFLICT (user_id, week, muscle_group_id) DO UPDATE SET
+                sets = {clamp(f"{table}.sets + excluded.sets")},
+                volume = {clamp(f"{table}.volume + excluded.volume")}
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    @staticmethod
+    def session_deltas(session_id, week, sign=1):
+        """bump() deltas adding (sign=1) or removing (sign=-1) a session's sets at `week`."""
+        volume = ExpressionWrapper(wide("reps") * wide("weight"), output_field=BigIntegerField())
+        rows = (
+            SetEntry.objects.filter(performed_exercise__session_id=session_id)
+            .values("performed_exercise__exercise_id")
+            .annotate(n=Count("id"), v=Coalesce(Sum(volume), 0))
+            .order_by()
+        )
+        return [
+            (week, row["performed_exercise__exercise_id"], sign * row["n"], sign * row["v"])
+            for row in rows
+        ]
+
+    @staticmethod
+    def source_rows(user_ids=None):
+        """What the table should contain, aggregated straight from SetEntry."""
+        sets = SetEntry.objects.filter(performed_exercise__exercise__muscle_contributions__isnull=False)
+        if user_ids is not None:
+            sets = sets.filter(performed_exercise__session__user_id__in=user_ids)
+        share = centi("performed_exercise__exercise__muscle_contributions__contribution")
+        volume = ExpressionWrapper(
+            wide("reps") * wide("weight") * wide(share), output_field=BigIntegerField()
+        )
+        return (
+            sets.values(
+                user_id=F("performed_exercise__session__user_id"),
+                week=TruncWeek("performed_exercise__session__date", output_field=models.DateField()),
+                muscle_group_id=F("performed_exercise__exercise__muscle_contributions__muscle_group_id"),
+            )
+            .annotate(sets=Sum(share), volume=Coalesce(Sum(volume), 0))
+            .order_by()
+        )
+
+    @classmethod
+    def _from_source(cls, row):
+        return cls(
+            user_id=row["user_id"],
+            week=row["week"],
+            muscle_group_id=row["muscle_group_id"],
+            sets=from_centi(row["sets"]),
+            volume=row["volume"],
+        )
+
+    @classmethod
+    def rebuild(cls, user_ids=None, batch_size=5000):
+        """Replace the rows for user_ids (default: everyone) from SetEntry."""
+        stale = cls.objects.all() if user_ids is None else cls.objects.filter(user_id__in=user_ids)
+        stale.delete()
+        batch = []
+        created = 0
+        for row in cls.source_rows(user_ids).iterator(chunk_size=batch_size):
+            batch.append(cls._from_source(row))
+            if len(batch) >= batch_size:
+                cls.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        if batch:
+            cls.objects.bulk_create(batch)
+            created += len(batch)
+        return created
+
+
+class ExercisePercentiles(models.Model):
+    """
+    How users' best e1RMs for an exercise are distributed, as cut points (quantiles)
+    for a binary-search lookup. Replaced nightly by `manage.py compute_percentiles`; see
+    workouts/rankings.py.
+    """
+
+    exercise = models.OneToOneField(
+        Exercise,
+        on_delete=models.CASCADE,
+        related_name="percentiles",
+    )
+    users = models.PositiveIntegerField()  # lifters the cut points were computed over
+    # rankings.QUANTILES little-endian float32 e1RMs, from the 0th to the 100th percentile.
+    cut_points = models.BinaryField()
+    computed_at = models.DateTimeField()
+
+
+class Recommendations(models.Model):
+    """
+    A user's batch-computed next-session suggestions, with the history data version and
+    algorithm they were computed from. Replaced by each computation; see
+    workouts/recommend.py.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="recommendations",
+    )
+    algorithm = models.PositiveSmallIntegerField()
+    version = models.CharField(max_length=64)
+    computed_at = models.DateTimeField()
+    # recommend.compute()'s suggestions, most recently performed exercise first.
+    exercises = models.JSONField(default=list, encoder=DjangoJSONEncoder)
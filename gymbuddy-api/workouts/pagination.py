@@ -0,0 +1,27 @@
+# workouts/pagination.py
+from rest_framework.pagination import CursorPagination
+
+
+class SessionCursorPagination(CursorPagination):
+    """Keyset pagination over sessions, newest first: (-date, -id)."""
+
+    ordering = ("-date", "-id")
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+
+
+class OptionalCursorPagination(SessionCursorPagination):
+    """
+    SessionCursorPagination, opt-in per request.
+
+    Existing clients that call the list endpoint without `page_size` or `cursor` still
+    get a plain array; sending either switches to {"next", "previous", "results"} pages
+    that seek on the (user, -date) index instead of OFFSET-scanning old history.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        params = request.query_params
+        if self.cursor_query_param not in params and self.page_size_query_param not in params:
+            return None
+        return super().paginate_queryset(queryset, request, view)
@@ -0,0 +1,110 @@
+# workouts/rankings.py
+"""
+Cross-user strength percentiles: where a user's best e1RM for an exercise falls among
+everyone who does it.
+
+A nightly batch (`manage.py compute_percentiles`) streams one row per (exercise,
+user) – the user's best e1RM, aggregated in the database – exercise by exercise, and
+reduces each exercise's values with NumPy to QUANTILES cut points: the 0th, 1st, ...,
+100th percentiles. Those are stored as ExercisePercentiles rows of packed float32
+(404 bytes an exercise), replacing the previous night's.
+
+A lookup never touches other users' sets. It binary-searches the stored cut points
+for the user's own best and interpolates between the two it falls between.
+
+e1RM is Epley's weight x (1 + reps / 30), over sets with a weight and reps. Exercises
+with fewer than MIN_USERS lifters get no table, so the cut points never describe a
+handful of identifiable people.
+"""
+
+from array import array
+from itertools import groupby
+
+import numpy as np
+from django.db.models import BigIntegerField, ExpressionWrapper, Max
+from django.utils import timezone
+
+from .fields import SCALE, wide
+from .models import ExercisePercentiles, SetEntry
+
+QUANTILES = 101
+MIN_USERS = 10
+
+# weight x (3000 + reps) on the stored hundredths is e1RM x 300000, so MAX() over it
+# stays exact integer math in the database (in bigint: it passes int4 on PostgreSQL).
+_E1RM = ExpressionWrapper(wide("weight") * (wide("reps") + 30 * SCALE), output_field=BigIntegerField())
+_E1RM_SCALE = 30 * SCALE * SCALE
+_DTYPE = np.dtype("<f4")
+
+
+def best_e1rms(sets):
+    """(exercise_id, user_id, best e1RM x 300000) rows over a SetEntry queryset, by exercise."""
+    return (
+        sets.filter(weight__isnull=False, reps__gt=0)
+        .values_list("performed_exercise__exercise_id", "performed_exercise__session__user_id")
+        .annotate(best=Max(_E1RM))
+        .order_by("performed_exercise__exercise_id")
+    )
+
+
+def user_bests(user_id, exercise_ids=None):
+    """{exercise_id: best e1RM} for one user."""
+    sets = SetEntry.objects.filter(performed_exercise__session__user_id=user_id)
+    if exercise_ids is not None:
+        sets = sets.filter(performed_exercise__exercise_id__in=exercise_ids)
+    return {exercise_id: best / _E1RM_SCALE for exercise_id, _, best in best_e1rms(sets)}
+
+
+def cut_points(values):
+    """The QUANTILES evenly spaced quantiles of `values` (e1RM x 300000), as float32 e1RMs."""
+    values = np.asarray(values, dtype=np.float64) / _E1RM_SCALE
+    return np.quantile(values, np.linspace(0, 1, QUANTILES)).astype(_DTYPE)
+
+
+def compute_tables(min_users=MIN_USERS, chunk_size=5000):
+    """
+    Yield an unsaved ExercisePercentiles per exercise with at least min_users lifters.
+    Reads the per-user bests as a stream; only one exercise's values are held at a time.
+    """
+    now = timezone.now()
+    rows = best_e1rms(SetEntry.objects.all()).iterator(chunk_size=chunk_size)
+    for exercise_id, group in groupby(rows, key=lambda row: row[0]):
+        values = array("q", (best for _, _, best in group))
+        if len(values) < min_users:
+            continue
+        yield ExercisePercentiles(
+            exercise_id=exercise_id,
+            users=len(values),
+            cut_points=cut_points(values).tobytes(),
+            computed_at=now,
+        )
+
+
+def unpack(table):
+    return np.frombuffer(bytes(table.cut_points), dtype=_DTYPE)
+
+
+def quantile(cuts, q):
+    """The stored cut point nearest quantile q (0-1)."""
+    return float(cuts[round(q * (len(cuts) - 1))])
+
+
+def percentile(cuts, value):
+    """
+    Percentile (0-100) of `value` against cut points from cut_points(): a binary search
+    for the neighbouring cut points, then linear interpolation between them. Ties with
+    a run of equal cut points land in the middle of the run.
+    """
+    value = np.float32(value)
+    if value < cuts[0]:
+        return 0.0
+    if value > cuts[-1]:
+        return 100.0
+    lo = int(np.searchsorted(cuts, value, side="left"))
+    hi = int(np.searchsorted(cuts, value, side="right"))
+    if hi > lo:
+        rank = (lo + hi - 1) / 2
+    else:
+        below, above = float(cuts[lo - 1]), float(cuts[lo])
+        rank = lo - 1 + (float(value) - below) / (above - below)
+    return round(rank * 100 / (len(cuts) - 1), 1)
@@ -0,0 +1,192 @@
+# workouts/recommend.py
+"""
+Progressive-overload suggestions: what to do next time for each exercise a user has done.
+
+Computed from the columnar set history (history.build_columns) with NumPy, all of a
+user's exercises at once:
+
+- e1RM: each weighted set's estimated one-rep max (Epley, weight x (1 + reps / 30));
+  a session's e1RM for an exercise is its best set's.
+- trend: least-squares slope of the session e1RMs over the last TREND_SESSIONS
+  sessions, per week.
+- the last session's working sets (the ones at its top weight) decide the next step,
+  without RPE:
+    increase  every working set within REP_DROP_OFF reps of the best one: add a
+              weight step (2.5% rounded to the 2.5 plate step, at least one step)
+    hold      reps fell off across the working sets: same weight, aim for the best
+              set's reps on all of them
+    deload    e1RM trending down more than DELOAD_TREND per week and the last session
+              DELOAD_GAP below the window's mean: 90% of the weight
+    add_reps  bodyweight exercise without drop-off: one more rep per set
+
+Results are batch-computed (`manage.py compute_recommendations`, or the
+refresh_recommendations task) and stored as one Recommendations row per user along with
+the history data version they were computed from, so serving them is a row lookup and
+they survive restarts. A write changes the version, which marks the row stale until the
+next computation.
+"""
+
+from datetime import datetime, timezone
+
+import numpy as np
+from django.utils import timezone as dj_timezone
+
+from . import history
+from .fields import SCALE, from_centi
+from .models import Recommendations
+
+# Bump when the heuristics change, so rows computed by the old ones count as stale.
+ALGORITHM = 1
+# How long a queued recomputation suppresses queueing another for the same version.
+QUEUED_SECONDS = 60 * 60
+
+TREND_SESSIONS = 8
+MIN_TREND_SESSIONS = 3
+REP_DROP_OFF = 1
+STEP_RATIO = 0.025
+DELOAD_TREND = 0.02
+DELOAD_GAP = 0.05
+DELOAD_RATIO = 0.9
+# Hundredths, as the weight column: 2.5 plate step.
+WEIGHT_STEP = 250
+
+
+def _column(columns, name):
+    col = columns[name]
+    return np.frombuffer(col, dtype=np.dtype(col.typecode)).astype(np.int64)
+
+
+def _round_step(weights, down=False):
+    """Round hundredths to the plate step."""
+    steps = np.floor(weights / WEIGHT_STEP) if down else np.round(weights / WEIGHT_STEP)
+    return (steps * WEIGHT_STEP).astype(np.int64)
+
+
+def compute(columns):
+    """{exercise_id: suggestion} from history.build_columns() output; see the module docstring."""
+    if not len(columns["date"]):
+        return {}
+    # Rows arrive chronologically, sets in order; a stable sort by exercise keeps that
+    # order within each exercise.
+    order = np.argsort(_column(columns, "exercise"), kind="stable")
+    exercise, session, date, reps, weight = (
+        _column(columns, name)[order] for name in ("exercise", "session", "date", "reps", "weight")
+    )
+    bodyweight = weight == history.BODYWEIGHT
+    e1rm = np.where(
+        bodyweight | (reps <= 0), np.nan, weight * (1 + reps / SCALE / 30) / SCALE
+    )
+
+    # One group per (exercise, session), then per exercise over those groups.
+    n = len(order)
+    starts = np.flatnonzero(
+        np.r_[True, (exercise[1:] != exercise[:-1]) | (session[1:] != session[:-1])]
+    )
+    sizes = np.diff(np.r_[starts, n])
+    with np.errstate(invalid="ignore"):
+        # fmax skips bodyweight sets' NaN unless a session has nothing else.
+        best = np.fmax.reduceat(e1rm, starts)
+    g_exercise = exercise[starts]
+    ex_starts = np.flatnonzero(np.r_[True, g_exercise[1:] != g_exercise[:-1]])
+    ex_sizes = np.diff(np.r_[ex_starts, len(starts)])
+    label = np.repeat(np.arange(len(ex_starts)), ex_sizes)
+    last = ex_starts + ex_sizes - 1
+
+    # Trend: least squares of best e1RM against days before the exercise's last session.
+    position = np.arange(len(starts)) - np.repeat(ex_starts, ex_sizes)
+    in_window = (position >= np.repeat(ex_sizes, ex_sizes) - TREND_SESSIONS) & ~np.isnan(best)
+    x = (date[starts] - np.repeat(date[starts][last], ex_sizes)) / 86400.0
+    y = np.nan_to_num(best)
+    w = in_window.astype(float)
+    count = np.bincount(label, weights=w)
+    sx, sy = np.bincount(label, weights=w * x), np.bincount(label, weights=w * y)
+    sxx, sxy = np.bincount(label, weights=w * x * x), np.bincount(label, weights=w * x * y)
+    denominator = count * sxx - sx * sx
+    with np.errstate(invalid="ignore", divide="ignore"):
+        slope = np.where(
+            (count >= MIN_TREND_SESSIONS) & (denominator > 0),
+            (count * sxy - sx * sy) / denominator,
+            0.0,
+        )
+        mean = np.where(count > 0, sy / count, np.nan)
+    trend = slope * 7
+
+    # The last session's working sets: the ones at its top weight.
+    top = np.maximum.reduceat(weight, starts)
+    working = weight == np.repeat(top, sizes)
+    most = np.maximum.reduceat(np.where(working, reps, -1), starts)[last]
+    fewest = np.minimum.reduceat(np.where(working, reps, np.iinfo(np.int64).max), starts)[last]
+    working_sets = np.add.reduceat(working.astype(np.int64), starts)[last]
+    top = top[last]
+    latest = best[last]
+
+    steady = most - fewest <= REP_DROP_OFF * SCALE
+    with np.errstate(invalid="ignore"):
+        deload = (
+            (count >= MIN_TREND_SESSIONS)
+            & (trend < -DELOAD_TREND * mean)
+            & (latest < (1 - DELOAD_GAP) * mean)
+        )
+    is_bodyweight = top == history.BODYWEIGHT
+    action = np.select(
+        [is_bodyweight & steady, is_bodyweight, deload, steady],
+        ["add_reps", "hold", "deload", "increase"],
+        "hold",
+    )
+    step = np.maximum(_round_step(top * STEP_RATIO), WEIGHT_STEP)
+    next_weight = np.select(
+        [is_bodyweight, action == "deload", action == "increase"],
+        [top, _round_step(top * DELOAD_RATIO, down=True), top + step],
+        top,
+    )
+    next_reps = np.where(action == "add_reps", most + SCALE, most)
+
+    suggestions = {}
+    for i in range(len(ex_starts)):
+        set_weight = None if is_bodyweight[i] else from_centi(int(next_weight[i]))
+        set_reps = from_centi(int(next_reps[i]))
+        suggestions[int(g_exercise[last[i]])] = {
+            "exercise": int(g_exercise[last[i]]),
+            "action": str(action[i]),
+            "sets": [
+                {"order": n, "reps": set_reps, "weight": set_weight}
+                for n in range(1, int(working_sets[i]) + 1)
+            ],
+            "e1rm": None if np.isnan(latest[i]) else round(float(latest[i]), 1),
+            "trend": round(float(trend[i]), 2),
+            "sessions": int(count[i]),
+            "based_on_session": int(session[starts[last[i]]]),
+            "last_performed": datetime.fromtimestamp(int(date[starts[last[i]]]), timezone.utc),
+        }
+    return suggestions
+
+
+def refresh(user_id):
+    """Compute and store the user's suggestions; returns the Recommendations row."""
+    # Read the version first: a write during the computation leaves the row stale.
+    version = history.history_version(user_id)
+    exercises = sorted(
+        compute(history.build_columns(user_id)).values(),
+        key=lambda s: s["last_performed"],
+        reverse=True,
+    )
+    row, _ = Recommendations.objects.update_or_create(
+        user_id=user_id,
+        defaults={
+            "algorithm": ALGORITHM,
+            "version": version,
+            "computed_at": dj_timezone.now(),
+            "exercises": exercises,
+        },
+    )
+    return row
+
+
+def lookup(user_id):
+    """(stored Recommendations or None, the user's current data version)."""
+    row = Recommendations.objects.filter(user_id=user_id).first()
+    return row, history.history_version(user_id)
+
+
+def is_stale(row, version):
+    return row is None or row.algorithm != ALGORITHM or row.version != version
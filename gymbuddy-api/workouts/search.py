@@ -0,0 +1,278 @@
+# workouts/search.py
+"""
+Full-text search over a user's notes: Session.notes, SetEntry.notes and
+UserExerciseNote.note.
+
+PostgreSQL: partial GIN expression indexes on to_tsvector('english', <column>) for each
+table. Postgres keeps expression indexes current on every write, so nothing else has
+to. Queries use websearch_to_tsquery (quoted phrases, OR, -word), ts_rank and
+ts_headline.
+
+SQLite: an external-content FTS5 table per source (porter stemming, like the
+"english" config) plus AFTER INSERT/UPDATE/DELETE triggers that keep it in step with
+its table. Caveat: SQLite migrations that rebuild one of these tables drop its
+triggers. Run `manage.py rebuild_search_index` after such a migration, which
+reinstalls them and re-indexes.
+
+Both backends answer with one UNION ALL query, best hits first:
+(kind, id, rank, snippet, session_id, exercise_id, set_order). Other backends have no
+search: the endpoint answers 501 and `check` warns (workouts.W001).
+"""
+
+import re
+
+from django.core import checks
+from django.db import DatabaseError, connections, router
+
+from .models import Exercise, PerformedExercise, Session, SetEntry, UserExerciseNote
+
+MAX_LIMIT = 50
+HIGHLIGHT = ("[", "]")
+
+# kind -> (model, text column)
+SOURCES = {
+    "session": (Session, "notes"),
+    "set": (SetEntry, "notes"),
+    "exercise_note": (UserExerciseNote, "note"),
+}
+
+
+VENDORS = ("postgresql", "sqlite")
+
+
+def _connection():
+    return connections[router.db_for_read(Session)]
+
+
+def available():
+    """Whether the database searches are read from supports full-text search."""
+    return _connection().vendor in VENDORS
+
+
+def check_backend(app_configs=None, **kwargs):
+    """System check: note search needs one of VENDORS."""
+    vendor = _connection().vendor
+    if vendor in VENDORS:
+        return []
+    return [
+        checks.Warning(
+            f"Note search has no implementation for {vendor}; "
+            "/api/v1/workouts/search/ will answer 501.",
+            hint=f"Use one of: {', '.join(VENDORS)}.",
+            id="workouts.W001",
+        )
+    ]
+
+
+def _table(model):
+    return model._meta.db_table
+
+
+def _fts(model):
+    return f"{_table(model)}_fts"
+
+
+def _postgres_index(model):
+    return f"{_table(model)}_search"
+
+
+def install(connection):
+    """Create the search indexes (and, on SQLite, the triggers); safe to re-run."""
+    with connection.cursor() as cursor:
+        for model, column in SOURCES.values():
+            table = _table(model)
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {_postgres_index(model)} ON {table} "
+                    f"USING gin (to_tsvector('english', {column})) WHERE {column} <> ''"
+                )
+            elif connection.vendor == "sqlite":
+                fts = _fts(model)
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5({column}, "
+                    f"content='{table}', content_rowid='id', tokenize='porter unicode61')"
+                )
+                insert = f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column});"
+                delete = (
+                    f"INSERT INTO {fts}({fts}, rowid, {column}) "
+                    f"VALUES ('delete', old.id, old.{column});"
+                )
+                for event, body in (
+                    ("INSERT", insert),
+                    ("DELETE", delete),
+                    (f"UPDATE OF {column}", delete + insert),
+                ):
+                    name = f"{fts}_{event.split()[0].lower()}"
+                    cursor.execute(
+                        f"CREATE TRIGGER IF NOT EXISTS {name} AFTER {event} ON {table} "
+                        f"BEGIN {body} END"
+                    )
+
+
+def uninstall(connection):
+    with connection.cursor() as cursor:
+        for model, _ in SOURCES.values():
+            if connection.vendor == "postgresql":
+                cursor.execute(f"DROP INDEX IF EXISTS {_postgres_index(model)}")
+            elif connection.vendor == "sqlite":
+                fts = _fts(model)
+                for event in ("insert", "delete", "update"):
+                    cursor.execute(f"DROP TRIGGER IF EXISTS {fts}_{event}")
+                cursor.execute(f"DROP TABLE IF EXISTS {fts}")
+
+
+def rebuild(connection):
+    """Reinstall and re-index from the source tables (SQLite; Postgres needs only install)."""
+    install(connection)
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for model, _ in SOURCES.values():
+                fts = _fts(model)
+                cursor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def verify(connection):
+    """Problems with the installed search indexes, as strings; empty when all is well."""
+    problems = []
+    with connection.cursor() as cursor:
+        for model, _ in SOURCES.values():
+            if connection.vendor == "postgresql":
+                cursor.execute(
+                    "SELECT 1 FROM pg_indexes WHERE indexname = %s", [_postgres_index(model)]
+                )
+                if cursor.fetchone() is None:
+                    problems.append(f"{_postgres_index(model)}: index missing")
+                continue
+            if connection.vendor != "sqlite":
+                continue
+            fts = _fts(model)
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s",
+                [_table(model)],
+            )
+            triggers = {row[0] for row in cursor.fetchall()}
+            for event in ("insert", "delete", "update"):
+                if f"{fts}_{event}" not in triggers:
+                    problems.append(f"{fts}_{event}: trigger missing")
+            try:
+                # Compares the index with the content table; raises on any difference.
+                cursor.execute(f"INSERT INTO {fts}({fts}, rank) VALUES ('integrity-check', 1)")
+            except DatabaseError as exc:
+                problems.append(f"{fts}: {exc}")
+    return problems
+
+
+def _fts5_query(text):
+    """Free text -> an FTS5 query matching every word, with FTS5 syntax neutralized."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+
+def _postgres_sql():
+    session, entry, note = (_table(m) for m in (Session, SetEntry, UserExerciseNote))
+    performed = _table(PerformedExercise)
+    options = f"StartSel={HIGHLIGHT[0]},StopSel={HIGHLIGHT[1]},MinWords=5,MaxWords=20"
+
+    # Spelled out in each branch, and matching the index expression and predicate
+    # exactly, so the planner can use each table's partial GIN index.
+    query = "websearch_to_tsquery('english', %(q)s)"
+
+    def matched(alias, column):
+        vector = f"to_tsvector('english', {alias}.{column})"
+        return (
+            f"ts_rank({vector}, {query})",
+            f"ts_headline('english', {alias}.{column}, {query}, '{options}')",
+            f"{alias}.{column} <> '' AND {vector} @@ {query}",
+        )
+
+    s_rank, s_snip, s_where = matched("s", "notes")
+    e_rank, e_snip, e_where = matched("e", "notes")
+    n_rank, n_snip, n_where = matched("n", "note")
+    return f"""
+        SELECT 'session', s.id, {s_rank}, {s_snip}, s.id, NULL::integer, NULL::integer
+        FROM {session} s
+        WHERE s.user_id = %(user)s AND {s_where}
+        UNION ALL
+        SELECT 'set', e.id, {e_rank}, {e_snip}, s.id, pe.exercise_id, e."order"
+        FROM {entry} e
+        JOIN {performed} pe ON pe.id = e.performed_exercise_id
+        JOIN {session} s ON s.id = pe.session_id
+        WHERE s.user_id = %(user)s AND {e_where}
+        UNION ALL
+        SELECT 'exercise_note', n.id, {n_rank}, {n_snip}, NULL, n.exercise_id, NULL
+        FROM {note} n
+        WHERE n.user_id = %(user)s AND {n_where}
+        ORDER BY 3 DESC, 2 DESC
+        LIMIT %(limit)s
+    """
+
+
+def _sqlite_sql():
+    session, entry, note = (_table(m) for m in (Session, SetEntry, UserExerciseNote))
+    performed = _table(PerformedExercise)
+    start, stop = HIGHLIGHT
+
+    def matched(model):
+        fts = _fts(model)
+        # bm25() is lower-is-better; negate so every backend ranks higher-is-better.
+        return fts, f"-bm25({fts})", f"snippet({fts}, 0, '{start}', '{stop}', '…', 12)"
+
+    s_fts, s_rank, s_snip = matched(Session)
+    e_fts, e_rank, e_snip = matched(SetEntry)
+    n_fts, n_rank, n_snip = matched(UserExerciseNote)
+    return f"""
+        SELECT 'session', s.id, {s_rank}, {s_snip}, s.id, NULL, NULL
+        FROM {s_fts} JOIN {session} s ON s.id = {s_fts}.rowid
+        WHERE {s_fts} MATCH %(q)s AND s.user_id = %(user)s
+        UNION ALL
+        SELECT 'set', e.id, {e_rank}, {e_snip}, s.id, pe.exercise_id, e."order"
+        FROM {e_fts}
+        JOIN {entry} e ON e.id = {e_fts}.rowid
+        JOIN {performed} pe ON pe.id = e.performed_exercise_id
+        JOIN {session} s ON s.id = pe.session_id
+        WHERE {e_fts} MATCH %(q)s AND s.user_id = %(user)s
+        UNION ALL
+        SELECT 'exercise_note', n.id, {n_rank}, {n_snip}, NULL, n.exercise_id, NULL
+        FROM {n_fts} JOIN {note} n ON n.id = {n_fts}.rowid
+        WHERE {n_fts} MATCH %(q)s AND n.user_id = %(user)s
+        ORDER BY 3 DESC, 2 DESC
+        LIMIT %(limit)s
+    """
+
+
+def search(user_id, text, limit=20):
+    """
+    Ranked hits for `text` in the user's notes, best first, each with its session
+    (id, date, name) and exercise (id, name) where it has one. Raises
+    NotImplementedError unless available().
+    """
+    connection = _connection()
+    if connection.vendor == "postgresql":
+        query, sql = text, _postgres_sql()
+    elif connection.vendor == "sqlite":
+        query, sql = _fts5_query(text), _sqlite_sql()
+    else:
+        raise NotImplementedError(f"no full-text search for {connection.vendor}")
+    if not query.strip():
+        return []
+    with connection.cursor() as cursor:
+        cursor.execute(sql, {"q": query, "user": user_id, "limit": min(limit, MAX_LIMIT)})
+        rows = cursor.fetchall()
+
+    sessions = Session.objects.only("id", "date", "name").in_bulk({r[4] for r in rows if r[4]})
+    exercises = Exercise.objects.only("id", "name").in_bulk({r[5] for r in rows if r[5]})
+    hits = []
+    for kind, pk, rank, snippet, session_id, exercise_id, set_order in rows:
+        session = sessions.get(session_id)
+        exercise = exercises.get(exercise_id)
+        hits.append(
+            {
+                "kind": kind,
+                "id": pk,
+                "rank": round(rank, 6),
+                "snippet": snippet,
+                "session": session and {"id": session.id, "date": session.date, "name": session.name},
+                "exercise": exercise and {"id": exercise.id, "name": exercise.name},
+                "set_order": set_order,
+            }
+        )
+    return hits
@@ -1,23 +1,123 @@
 # workouts/serializers.py
 from rest_framework import serializers
-from .models import Program, Session, PerformedExercise, SetEntry, Exercise, UserExerciseNote
 
-
-class ProgramSerializer(serializers.ModelSerializer):
-    workout_sessions = serializers.PrimaryKeyRelatedField(many=True, read_only=True)
+from django_project.metrics import TimedSerializerMixin
+
+from .fields import SCALE, FixedPointSerializerField, from_centi
+from .fieldsets import SparseFieldsMixin
+from .models import (
+    Program,
+    Session,
+    PerformedExercise,
+    SetEntry,
+    Exercise,
+    UserExercise,
+    UserExerciseNote,
+    week_start,
+)
+
+
+class ProgramSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    """
+    A program plus a summary of its sessions, read from the annotations that
+    ProgramViewSet.get_queryset() adds (a new program has none, hence the defaults).
+
+    `weeks` spans the first session's week to the last one's; `adherence` is the share
+    of those weeks with at least one session. `volume` is total reps x weight.
+    """
+
+    session_count = serializers.IntegerField(read_only=True, default=0)
+    first_session_date = serializers.DateTimeField(read_only=True, default=None)
+    last_session_date = serializers.DateTimeField(read_only=True, default=None)
+    active_weeks = serializers.IntegerField(read_only=True, default=0)
+    weeks = serializers.SerializerMethodField()
+    adherence = serializers.SerializerMethodField()
+    sessions_per_week = serializers.SerializerMethodField()
+    volume = serializers.SerializerMethodField()
+    volume_per_week = serializers.SerializerMethodField()
+
+    # The annotations each summary field reads; ProgramViewSet adds only those asked for.
+    field_sources = {
+        "weeks": ("first_session_date", "last_session_date"),
+        "adherence": ("first_session_date", "last_session_date", "active_weeks"),
+        "sessions_per_week": ("first_session_date", "last_session_date", "session_count"),
+        "volume": ("total_volume",),
+        "volume_per_week": ("first_session_date", "last_session_date", "total_volume"),
+    }
 
     class Meta:
         model = Program
-        fields = ["id", "name", "description", "created_at", "workout_sessions"]
-
-
-class ExerciseSerializer(serializers.ModelSerializer):
+        fields = [
+            "id",
+            "name",
+            "description",
+            "created_at",
+            "session_count",
+            "first_session_date",
+            "last_session_date",
+            "active_weeks",
+            "weeks",
+            "adherence",
+            "sessions_per_week",
+            "volume",
+            "volume_per_week",
+        ]
+
+    def get_weeks(self, obj):
+        first = getattr(obj, "first_session_date", None)
+        last = getattr(obj, "last_session_date", None)
+        if first is None or last is None:
+            return 0
+        return (week_start(last) - week_start(first)).days // 7 + 1
+
+    def get_adherence(self, obj):
+        weeks = self.get_weeks(obj)
+        return round(getattr(obj, "active_weeks", 0) / weeks, 3) if weeks else None
+
+    def get_sessions_per_week(self, obj):
+        weeks = self.get_weeks(obj)
+        return round(getattr(obj, "session_count", 0) / weeks, 2) if weeks else None
+
+    def get_volume(self, obj):
+        # total_volume is in 1/10000ths (hundredths x hundredths).
+        return from_centi(round(getattr(obj, "total_volume", 0) / SCALE))
+
+    def get_volume_per_week(self, obj):
+        weeks = self.get_weeks(obj)
+        if not weeks:
+            return None
+        return from_centi(round(getattr(obj, "total_volume", 0) / SCALE / weeks))
+
+
+class ExerciseSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = Exercise
         fields = ["id", "name", "description"]
 
 
-class SetEntrySerializer(serializers.ModelSerializer):
+class UserExerciseSerializer(TimedSerializerMixin, serializers.ModelSerializer):
+    """An exercise the user has performed: the Exercise fields plus usage stats."""
+
+    id = serializers.IntegerField(source="exercise.id", read_only=True)
+    name = serializers.CharField(source="exercise.name", read_only=True)
+    description = serializers.CharField(source="exercise.description", read_only=True)
+
+    class Meta:
+        model = UserExercise
+        fields = [
+            "id",
+            "name",
+            "description",
+            "first_performed_at",
+            "last_performed_at",
+            "times_performed",
+        ]
+
+
+class SetEntrySerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
+    reps = FixedPointSerializerField()
+    weight = FixedPointSerializerField(allow_null=True, required=False)
+
     class Meta:
         model = SetEntry
         fields = ["id", "order", "reps", "weight", "notes"]
@@ -38,10 +138,14 @@ class SetEntrySerializer(serializers.ModelSerializer):
         return value
 
 
-class PerformedExerciseSerializer(serializers.ModelSerializer):
+class PerformedExerciseSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     sets = SetEntrySerializer(many=True, read_only=True)
     note_for_next_time = serializers.SerializerMethodField()
 
+    # `exercise` is written as an id and read back as the nested Exercise.
+    expandable_fields = {"exercise": lambda: ExerciseSerializer(read_only=True), "sets": None}
+    field_sources = {"note_for_next_time": ("exercise",)}
+
     class Meta:
         model = PerformedExercise
         fields = ["id", "exercise", "user_preferred_name", "order", "is_bodyweight", "sets", "note_for_next_time"]
@@ -50,31 +154,47 @@ class PerformedExerciseSerializer(serializers.ModelSerializer):
         request = self.context.get("request")
         if not request or not request.user:
             return ""
-        # Use prefetched notes if available (avoids N+1)
-        if hasattr(instance, "_prefetched_note"):
-            return instance._prefetched_note
-        note_obj = UserExerciseNote.objects.filter(
-            user=request.user, exercise=instance.exercise
-        ).first()
-        return note_obj.note if note_obj else ""
-
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        data["exercise"] = ExerciseSerializer(instance.exercise).data
-        return data
-
-
-class SessionSerializer(serializers.ModelSerializer):
+        # One query per response: nested serializers share the root's context, so the
+        # notes map is loaded once however many exercises are rendered.
+        notes = self.context.get("_notes_by_exercise")
+        if notes is None:
+            notes = dict(
+                UserExerciseNote.objects.filter(user=request.user).values_list(
+                    "exercise_id", "note"
+                )
+            )
+            self.context["_notes_by_exercise"] = notes
+        return notes.get(instance.exercise_id, "")
+
+
+class SessionSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     exercises = PerformedExerciseSerializer(many=True, read_only=True)
     date = serializers.DateTimeField(required=False)
     date_display = serializers.SerializerMethodField()
     program = serializers.PrimaryKeyRelatedField(
         allow_null=True, required=False, queryset=Program.objects.none()
     )
+    total_volume = serializers.SerializerMethodField()
+
+    expandable_fields = {"exercises": None}
+    field_sources = {"date_display": ("date",)}
 
     class Meta:
         model = Session
-        fields = ["id", "date", "date_display", "name", "notes", "exercises", "program"]
+        fields = [
+            "id",
+            "date",
+            "date_display",
+            "name",
+            "notes",
+            "exercises",
+            "program",
+            "exercise_count",
+            "set_count",
+            "total_volume",
+            "last_modified",
+        ]
+        read_only_fields = ["exercise_count", "set_count", "last_modified"]
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -88,13 +208,19 @@ class SessionSerializer(serializers.ModelSerializer):
         d = obj.date
         return f"{d.month}/{d.day:02d}"
 
+    def get_total_volume(self, obj):
+        # Stored in 1/10000ths (hundredths x hundredths).
+        return from_centi(round(obj.total_volume / SCALE))
 
-class TemplateExerciseSerializer(serializers.ModelSerializer):
+
+class TemplateExerciseSerializer(TimedSerializerMixin, SparseFieldsMixin, serializers.ModelSerializer):
     """For GET /workouts/template/ - last workout's exercises with sets for reference."""
 
     exercise = ExerciseSerializer(read_only=True)
     last_sets = SetEntrySerializer(source="sets", many=True, read_only=True)
 
+    expandable_fields = {"exercise": None, "last_sets": None}
+
     class Meta:
         model = PerformedExercise
         fields = ["exercise", "user_preferred_name", "order", "last_sets"]
@@ -0,0 +1,29 @@
+# workouts/tasks.py
+"""Secondary work the workout endpoints hand to the job queue (see jobs/queue.py)."""
+
+from jobs.queue import task
+
+from . import recommend
+from .models import Session, UserExercise, UserExerciseNote
+
+
+@task
+def session_updated(session_id, redated):
+    """Clear next-time notes for the session's exercises; refresh their stats if re-dated."""
+    session = Session.objects.filter(pk=session_id).only("user_id").first()
+    if session is None:
+        return
+    exercise_ids = list(session.exercises.values_list("exercise_id", flat=True).distinct())
+    UserExerciseNote.clear_for_exercises(session.user_id, exercise_ids)
+    if redated:
+        UserExercise.refresh_for(session.user_id, exercise_ids)
+
+
+@task
+def refresh_user_exercises(user_id, exercise_ids):
+    UserExercise.refresh_for(user_id, exercise_ids)
+
+
+@task
+def refresh_recommendations(user_id):
+    recommend.refresh(user_id)
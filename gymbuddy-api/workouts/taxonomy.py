@@ -0,0 +1,94 @@
+# workouts/taxonomy.py
+"""
+The default muscle-group taxonomy: the groups, and how the common lifts load them.
+
+EXERCISES maps an exercise name to (movement pattern, {muscle group: contribution}).
+Names match case-insensitively, so "bench press" typed into the app is mapped like
+"Bench Press". apply() maps exercises as they're created (new names in
+_add_exercise, the benchmark seeder); `manage.py apply_muscle_taxonomy` maps existing
+ones and rebuilds the affected rollups. Migration 0013 has a frozen copy of this
+table for its one-off backfill; changes go here, not there.
+
+An exercise that already has contributions (mapped by hand in the admin) is never
+touched.
+"""
+
+from .models import Exercise, ExerciseMuscleGroup, MuscleGroup
+
+MUSCLE_GROUPS = [
+    "Back",
+    "Biceps",
+    "Calves",
+    "Chest",
+    "Core",
+    "Glutes",
+    "Hamstrings",
+    "Quads",
+    "Shoulders",
+    "Triceps",
+]
+EXERCISES = {
+    "Bench Press": ("horizontal_push", {"Chest": 1, "Triceps": 0.5, "Shoulders": 0.5}),
+    "Incline DB Press": ("horizontal_push", {"Chest": 1, "Shoulders": 0.5, "Triceps": 0.5}),
+    "Overhead Press": ("vertical_push", {"Shoulders": 1, "Triceps": 0.5}),
+    "Dips": ("vertical_push", {"Triceps": 1, "Chest": 0.5}),
+    "Tricep Pushdown": ("isolation", {"Triceps": 1}),
+    "Lateral Raise": ("isolation", {"Shoulders": 1}),
+    "Squat": ("squat", {"Quads": 1, "Glutes": 0.5}),
+    "Leg Press": ("squat", {"Quads": 1, "Glutes": 0.5}),
+    "Romanian Deadlift": ("hinge", {"Hamstrings": 1, "Glutes": 0.5}),
+    "Deadlift": ("hinge", {"Glutes": 1, "Hamstrings": 0.5, "Back": 0.5}),
+    "Leg Curl": ("isolation", {"Hamstrings": 1}),
+    "Calf Raise": ("isolation", {"Calves": 1}),
+    "Pull-up": ("vertical_pull", {"Back": 1, "Biceps": 0.5}),
+    "Lat Pulldown": ("vertical_pull", {"Back": 1, "Biceps": 0.5}),
+    "Barbell Row": ("horizontal_pull", {"Back": 1, "Biceps": 0.5}),
+    "Face Pull": ("horizontal_pull", {"Shoulders": 1, "Back": 0.5}),
+    "Bicep Curl": ("isolation", {"Biceps": 1}),
+    "Hammer Curl": ("isolation", {"Biceps": 1}),
+    "Plank": ("core", {"Core": 1}),
+}
+
+_BY_NAME = {name.casefold(): mapping for name, mapping in EXERCISES.items()}
+
+
+def mapping_for(name):
+    """(movement pattern, {group: contribution}) for an exercise name, or None."""
+    return _BY_NAME.get(" ".join(name.split()).casefold())
+
+
+def apply(exercises=None):
+    """
+    Map `exercises` (default: every exercise) that appear in EXERCISES and have no
+    contributions yet, creating muscle groups as needed. A blank movement pattern is
+    filled in; one set by hand is kept. Returns the ids of the exercises mapped.
+
+    The rollup is not touched: a new exercise has no sets yet, and the command
+    rebuilds it for existing ones.
+    """
+    unmapped = Exercise.objects.filter(muscle_contributions__isnull=True)
+    if exercises is not None:
+        unmapped = unmapped.filter(pk__in=[exercise.pk for exercise in exercises])
+    matched = [(e, mapping_for(e.name)) for e in unmapped]
+    matched = [(e, mapping) for e, mapping in matched if mapping is not None]
+    if not matched:
+        return []
+
+    groups = {group.name: group for group in MuscleGroup.objects.all()}
+    missing = [name for name in MUSCLE_GROUPS if name not in groups]
+    if missing:
+        MuscleGroup.objects.bulk_create([MuscleGroup(name=name) for name in missing], ignore_conflicts=True)
+        groups = {group.name: group for group in MuscleGroup.objects.all()}
+
+    links, patterned = [], []
+    for exercise, (pattern, contributions) in matched:
+        if not exercise.movement_pattern:
+            exercise.movement_pattern = pattern
+            patterned.append(exercise)
+        links += [
+            ExerciseMuscleGroup(exercise=exercise, muscle_group=groups[name], contribution=share)
+            for name, share in contributions.items()
+        ]
+    Exercise.objects.bulk_update(patterned, ["movement_pattern"])
+    ExerciseMuscleGroup.objects.bulk_create(links, ignore_conflicts=True)
+    return [exercise.pk for exercise, _ in matched]
@@ -1,17 +1,59 @@
+import json
+import threading
+import unittest
+from datetime import timedelta
 from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import numpy as np
 
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connection, connections
+from django.test import SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
 from rest_framework import status
 from rest_framework.authtoken.models import Token
 from rest_framework.test import APITestCase
 
-from .models import Exercise, PerformedExercise, Program, Session, SetEntry, UserExerciseNote
+from django_project import compression, db_router, metrics
+from django_project.renderers import FastJSONRenderer
+from django_project.nplusone import NPlusOneError, fingerprint
+from jobs.models import Job
+
+from . import history, rankings, recommend, search
+from .benchmarks import report
+from .benchmarks.workflow import Sample
+from .fields import SCALE, centi, to_centi
+from .models import (
+    Exercise,
+    ExerciseMuscleGroup,
+    ExercisePercentiles,
+    MuscleGroup,
+    PerformedExercise,
+    Program,
+    Session,
+    SetEntry,
+    UserExercise,
+    UserExerciseNote,
+    WeeklyMuscleVolume,
+    week_start,
+)
+from .serializers import SessionSerializer
 
 User = get_user_model()
 
 
+@override_settings(NPLUSONE_MODE="raise")
 class _AuthenticatedTestCase(APITestCase):
-    """Base class that creates a user, token, and authenticates the client."""
+    """Base class that creates a user, token, and authenticates the client.
+
+    N+1 detection raises here, so any endpoint that queries in a loop fails its tests.
+    """
 
     def setUp(self):
         self.user = User.objects.create_user(
@@ -440,6 +482,480 @@ class TemplateAndPreviousExercisesAPITests(_AuthenticatedTestCase):
         self.assertEqual(len(r.data), 1)
         self.assertEqual(r.data[0]["exercise"]["name"], "Squat")
 
+    def test_previous_exercises_unknown_session_is_404(self):
+        r = self.client.get("/api/v1/workouts/99999/previous_exercises/")
+        self.assertEqual(r.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_previous_exercises_query_count_is_constant(self):
+        squat = Exercise.objects.create(name="Squat", description="")
+        for n in range(4):
+            w = Session.objects.create(user=self.user, name=f"W{n}")
+            pe = PerformedExercise.objects.create(session=w, exercise=squat, order=1)
+            SetEntry.objects.create(performed_exercise=pe, order=1, reps=5)
+        latest = Session.objects.create(user=self.user, name="Today")
+        # token auth, previous session lookup, exercises + exercise, sets
+        with self.assertNumQueries(4):
+            self.client.get(f"/api/v1/workouts/{latest.id}/previous_exercises/")
+        # depth adds the anchor-date lookup
+        with self.assertNumQueries(5):
+            self.client.get(f"/api/v1/workouts/{latest.id}/previous_exercises/?depth=4")
+
+    def test_previous_exercises_depth_aligns_history_per_exercise(self):
+        squat = Exercise.objects.create(name="Squat", description="")
+        bench = Exercise.objects.create(name="Bench Press", description="")
+        oldest = Session.objects.create(user=self.user, name="Oldest")
+        pe = PerformedExercise.objects.create(session=oldest, exercise=bench, order=1)
+        SetEntry.objects.create(performed_exercise=pe, order=1, reps=8, weight=Decimal("135"))
+        older = Session.objects.create(user=self.user, name="Older")
+        PerformedExercise.objects.create(session=older, exercise=squat, order=1)
+        current = Session.objects.create(user=self.user, name="Current")
+
+        r = self.client.get(f"/api/v1/workouts/{current.id}/previous_exercises/?depth=3")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual([e["exercise"]["name"] for e in r.data], ["Squat", "Bench Press"])
+        squat_history, bench_history = (e["history"] for e in r.data)
+        self.assertEqual(len(squat_history), 2)
+        self.assertEqual(squat_history[0]["session"], older.id)
+        self.assertIsNone(squat_history[1])
+        self.assertIsNone(bench_history[0])
+        self.assertEqual(bench_history[1]["sets"][0]["reps"], r.data[1]["last_sets"][0]["reps"])
+
+    def test_previous_exercises_rejects_bad_depth(self):
+        w = Session.objects.create(user=self.user, name="W")
+        for depth in ("0", "abc", "21"):
+            r = self.client.get(f"/api/v1/workouts/{w.id}/previous_exercises/?depth={depth}")
+            self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST, depth)
+
+
+# ---------------------------------------------------------------------------
+# Screen composites
+# ---------------------------------------------------------------------------
+
+
+class ScreenEndpointTests(_AuthenticatedTestCase):
+    def _history(self, sessions, exercises_per_session=2):
+        """
+        Sessions oldest first, each with exercises (one set each), plus a note. The
+        oldest also has a Lunge, so it is outside any recent window.
+        """
+        names = ["Squat", "Bench Press", "Deadlift", "Row", "Dips", "Curl", "Lunge"]
+        exercises = [Exercise.objects.get_or_create(name=n)[0] for n in names]
+        lunge = exercises.pop()
+        created = []
+        for n in range(sessions):
+            w = Session.objects.create(user=self.user, name=f"W{n}")
+            if n == 0:
+                pe = PerformedExercise.objects.create(session=w, exercise=lunge, order=9)
+                SetEntry.objects.create(performed_exercise=pe, order=1, reps=8)
+            for order in range(1, exercises_per_session + 1):
+                ex = exercises[(n + order) % len(exercises)]
+                pe = PerformedExercise.objects.create(session=w, exercise=ex, order=order)
+                SetEntry.objects.create(performed_exercise=pe, order=1, reps=5, weight=100)
+            created.append(w)
+        UserExercise.refresh_for(self.user.id, [lunge.id] + [e.id for e in exercises])
+        Session.recount(Session.objects.filter(user=self.user))
+        UserExerciseNote.objects.update_or_create(
+            user=self.user, exercise=exercises[0], defaults={"note": "Deeper"}
+        )
+        return created
+
+    def test_workout_detail_matches_the_standalone_endpoints(self):
+        sessions = self._history(8)
+        current = sessions[-1]
+        r = self.client.get(f"/api/v1/screens/workout-detail/{current.id}/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+
+        def standalone(url):
+            return json.loads(self.client.get(url).content)
+
+        body = json.loads(r.content)
+        self.assertEqual(body["workout"], standalone(f"/api/v1/workouts/{current.id}/"))
+        self.assertEqual(
+            body["previous_exercises"],
+            standalone(f"/api/v1/workouts/{current.id}/previous_exercises/?depth=5"),
+        )
+        self.assertEqual(
+            body["user_exercises"], standalone("/api/v1/workouts/user_exercises/")
+        )
+        covered = {e["exercise"]["id"] for e in body["previous_exercises"]}
+        missing = [e["id"] for e in body["user_exercises"] if e["id"] not in covered]
+        self.assertTrue(missing)
+        self.assertEqual(
+            body["last_performances"],
+            standalone(
+                "/api/v1/workouts/last_exercise_performance/?exercise_ids="
+                + ",".join(map(str, missing))
+            ),
+        )
+
+    def test_workout_detail_query_count_is_constant(self):
+        small = self._history(3)[-1]
+        # token auth, session, its exercises, previous ids, their exercises, last
+        # performances, sets, user exercises, exercises, notes
+        with self.assertNumQueries(10):
+            self.client.get(f"/api/v1/screens/workout-detail/{small.id}/")
+        large = self._history(12, exercises_per_session=3)[-1]
+        with self.assertNumQueries(10):
+            self.client.get(f"/api/v1/screens/workout-detail/{large.id}/?depth=10")
+
+    def test_workout_detail_validates_and_scopes(self):
+        mine = Session.objects.create(user=self.user, name="Mine")
+        theirs = Session.objects.create(user=self.other_user, name="Theirs")
+        r = self.client.get(f"/api/v1/screens/workout-detail/{theirs.id}/")
+        self.assertEqual(r.status_code, status.HTTP_404_NOT_FOUND)
+        r = self.client.get(f"/api/v1/screens/workout-detail/{mine.id}/?depth=21")
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+        r = self.client.get(f"/api/v1/screens/workout-detail/{mine.id}/?sort=popular")
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+        r = self.client.get(f"/api/v1/screens/workout-detail/{mine.id}/")
+        self.assertEqual(
+            r.data,
+            {
+                "workout": r.data["workout"],
+                "previous_exercises": [],
+                "user_exercises": [],
+                "last_performances": [],
+            },
+        )
+
+    def test_workouts_screen_matches_the_standalone_endpoints(self):
+        self._history(4)
+        # token auth, sessions, exercises, exercise rows, sets, notes; the template
+        # reuses the newest session
+        with self.assertNumQueries(6):
+            r = self.client.get("/api/v1/screens/workouts/")
+        body = json.loads(r.content)
+        self.assertEqual(body["workouts"], json.loads(self.client.get("/api/v1/workouts/").content))
+        self.assertEqual(
+            body["template"], json.loads(self.client.get("/api/v1/workouts/template/").content)
+        )
+
+    def test_workouts_screen_pages_and_keeps_the_template(self):
+        self._history(4)
+        first = self.client.get("/api/v1/screens/workouts/?page_size=2").data
+        self.assertEqual(len(first["workouts"]["results"]), 2)
+        second = self.client.get(first["workouts"]["next"]).data
+        self.assertEqual(len(second["workouts"]["results"]), 2)
+        self.assertEqual(second["template"], first["template"])
+        self.assertEqual(self.client.get("/api/v1/screens/workouts/").data["template"], first["template"])
+
+    def test_workouts_screen_empty(self):
+        r = self.client.get("/api/v1/screens/workouts/")
+        self.assertEqual(r.data, {"workouts": [], "template": []})
+
+
+# ---------------------------------------------------------------------------
+# Sparse fieldsets (?fields= / ?expand=)
+# ---------------------------------------------------------------------------
+
+
+class SparseFieldsetTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.squat = Exercise.objects.create(name="Squat", description="Back squat")
+        for n in range(3):
+            w = Session.objects.create(user=self.user, name=f"W{n}")
+            pe = PerformedExercise.objects.create(session=w, exercise=self.squat, order=1)
+            for order in (1, 2):
+                SetEntry.objects.create(
+                    performed_exercise=pe, order=order, reps=5, weight=100, notes="easy"
+                )
+        self.workout = w
+        UserExerciseNote.objects.create(user=self.user, exercise=self.squat, note="Deeper")
+
+    def test_fields_narrows_every_level(self):
+        with self.assertNumQueries(2):  # token auth, sessions; no relation is loaded
+            r = self.client.get("/api/v1/workouts/?fields=id,date")
+        self.assertEqual([set(w) for w in r.data], [{"id", "date"}] * 3)
+
+        # token auth, sessions, exercises, sets; the notes query is skipped too
+        with self.assertNumQueries(4):
+            r = self.client.get("/api/v1/workouts/?fields=id,exercises.sets.reps,exercises.sets.weight")
+        exercise = r.data[0]["exercises"][0]
+        self.assertEqual(set(exercise), {"sets"})
+        self.assertEqual(exercise["sets"], [{"reps": 5, "weight": 100}] * 2)
+
+    def test_expand_collapses_relations_to_ids(self):
+        r = self.client.get(f"/api/v1/workouts/{self.workout.id}/?expand=")
+        pe = self.workout.exercises.get()
+        self.assertEqual(r.data["exercises"], [pe.id])
+
+        # token auth, session, exercises, sets, notes; no Exercise rows
+        with self.assertNumQueries(5):
+            r = self.client.get(f"/api/v1/workouts/{self.workout.id}/?expand=exercises.sets")
+        exercise = r.data["exercises"][0]
+        self.assertEqual(exercise["exercise"], self.squat.id)
+        self.assertEqual(exercise["note_for_next_time"], "Deeper")
+        self.assertEqual(len(exercise["sets"]), 2)
+
+        r = self.client.get("/api/v1/workouts/template/?expand=last_sets")
+        self.assertEqual(r.data[0]["exercise"], self.squat.id)
+        r = self.client.get(f"/api/v1/performed-exercises/{pe.id}/?fields=exercise.name")
+        self.assertEqual(r.data, {"exercise": {"name": "Squat"}})
+
+    def test_default_shape_is_unchanged(self):
+        full = self.client.get(f"/api/v1/workouts/{self.workout.id}/").data
+        exercise = full["exercises"][0]
+        self.assertEqual(exercise["exercise"], {"id": self.squat.id, "name": "Squat", "description": "Back squat"})
+        self.assertEqual(exercise["sets"][0]["notes"], "easy")
+
+    def test_writes_still_accept_every_field(self):
+        r = self.client.patch(
+            f"/api/v1/workouts/{self.workout.id}/?fields=id",
+            {"name": "Renamed"},
+            format="json",
+        )
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual(r.data, {"id": self.workout.id})
+        self.workout.refresh_from_db()
+        self.assertEqual(self.workout.name, "Renamed")
+
+    def test_program_summary_annotates_only_requested_fields(self):
+        program = Program.objects.create(user=self.user, name="Block")
+        Session.objects.filter(user=self.user).update(program=program)
+        with CaptureQueriesContext(connection) as queries:
+            r = self.client.get("/api/v1/programs/?fields=id,name")
+        self.assertEqual(r.data, [{"id": program.id, "name": "Block"}])
+        self.assertNotIn("COUNT(", queries[-1]["sql"])
+        r = self.client.get("/api/v1/programs/?fields=name,sessions_per_week")
+        self.assertEqual(r.data[0]["sessions_per_week"], 3)
+
+
+# ---------------------------------------------------------------------------
+# Weekly volume per muscle group
+# ---------------------------------------------------------------------------
+
+
+class MuscleVolumeTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        groups = {g.name: g for g in MuscleGroup.objects.all()}
+        self.bench = Exercise.objects.create(name="Bench Press")
+        self.curl = Exercise.objects.create(name="Bicep Curl")
+        ExerciseMuscleGroup.objects.bulk_create(
+            [
+                ExerciseMuscleGroup(exercise=self.bench, muscle_group=groups["Chest"]),
+                ExerciseMuscleGroup(
+                    exercise=self.bench, muscle_group=groups["Triceps"], contribution=0.5
+                ),
+                ExerciseMuscleGroup(exercise=self.curl, muscle_group=groups["Biceps"]),
+            ]
+        )
+        self.workout = self.client.post("/api/v1/workouts/", {}, format="json").data
+        self.performed = self.client.post(
+            f"/api/v1/workouts/{self.workout['id']}/exercises/",
+            {"exercise": self.bench.id, "order": 1},
+            format="json",
+        ).data
+        for order, weight in ((1, 100), (2, 102.5)):
+            self.add_set(order, weight)
+
+    def add_set(self, order, weight):
+        return self.client.post(
+            f"/api/v1/performed-exercises/{self.performed['id']}/sets/",
+            {"order": order, "reps": 10, "weight": weight},
+            format="json",
+        ).data
+
+    def dashboard(self, **params):
+        r = self.client.get("/api/v1/workouts/muscle_volume/", params)
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        return {row["muscle_group"]: (row["sets"], row["volume"]) for row in r.data}
+
+    def assertInSync(self):
+        call_command("rebuild_muscle_volume", "--verify", stdout=StringIO())
+
+    def test_sets_roll_up_by_contribution(self):
+        self.assertEqual(self.dashboard(), {"Chest": (2, 2025), "Triceps": (1, 1012.5)})
+        r = self.client.get("/api/v1/workouts/muscle_volume/")
+        self.assertEqual(r.data[0]["week"], week_start(timezone.now()))
+        self.assertInSync()
+
+    def test_volume_past_int4(self):
+        # 10 x 225 at a full share is 2.25e9 millionths, past int4 on PostgreSQL.
+        self.add_set(3, 225)
+        self.assertEqual(self.dashboard()["Chest"], (3, 4275))
+        call_command("rebuild_muscle_volume", "--verify", "--fix", stdout=StringIO())
+        self.assertEqual(self.dashboard()["Chest"], (3, 4275))
+        self.assertEqual(
+            {row["muscle_group_id"]: row["volume"] for row in WeeklyMuscleVolume.source_rows()},
+            {
+                MuscleGroup.objects.get(name="Chest").pk: 4275 * 10**6,
+                MuscleGroup.objects.get(name="Triceps").pk: 4275 * 10**6 // 2,
+            },
+        )
+
+    def test_set_edits_and_deletes_are_applied(self):
+        set_id = self.add_set(3, 50)["id"]
+        self.client.patch(f"/api/v1/set-entries/{set_id}/", {"weight": 60}, format="json")
+        self.assertEqual(self.dashboard()["Chest"], (3, 2625))
+        self.client.patch(f"/api/v1/set-entries/{set_id}/", {"notes": "easy"}, format="json")
+        self.client.delete(f"/api/v1/set-entries/{set_id}/")
+        self.assertEqual(self.dashboard()["Chest"], (2, 2025))
+        self.assertInSync()
+
+    def test_exercise_and_session_changes_move_the_sets(self):
+        self.client.patch(
+            f"/api/v1/performed-exercises/{self.performed['id']}/",
+            {"exercise": self.curl.id},
+            format="json",
+        )
+        self.assertEqual(self.dashboard(), {"Biceps": (2, 2025)})
+        self.assertInSync()
+
+        last_week = timezone.now() - timedelta(weeks=1)
+        self.client.patch(
+            f"/api/v1/workouts/{self.workout['id']}/", {"date": last_week.isoformat()}, format="json"
+        )
+        self.assertEqual(self.dashboard(weeks=1), {})
+        self.assertEqual(self.dashboard(weeks=2), {"Biceps": (2, 2025)})
+        self.assertInSync()
+
+        copy = self.client.post(
+            "/api/v1/workouts/", {"template_session_id": self.workout["id"]}, format="json"
+        ).data
+        self.assertEqual(self.dashboard(weeks=1), {"Biceps": (2, 2025)})
+        self.client.delete(f"/api/v1/performed-exercises/{copy['exercises'][0]['id']}/")
+        self.client.delete(f"/api/v1/workouts/{self.workout['id']}/")
+        self.assertEqual(self.dashboard(weeks=2), {})
+        self.assertInSync()
+
+    def test_dashboard_is_one_query_and_scoped(self):
+        Session.objects.filter(pk=self.workout["id"]).update(user=self.other_user)
+        WeeklyMuscleVolume.rebuild()
+        with self.assertNumQueries(2):  # token auth, rollup
+            self.assertEqual(self.dashboard(weeks=52), {})
+        for weeks in (0, 53, "x"):
+            r = self.client.get("/api/v1/workouts/muscle_volume/", {"weeks": weeks})
+            self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_verify_reports_drift_and_fix_rebuilds(self):
+        WeeklyMuscleVolume.objects.filter(muscle_group__name="Chest").update(sets=7)
+        with self.assertRaises(CommandError):
+            self.assertInSync()
+        call_command("rebuild_muscle_volume", "--verify", "--fix", stdout=StringIO())
+        self.assertInSync()
+        self.assertEqual(self.dashboard()["Chest"], (2, 2025))
+
+    def test_exercises_created_by_name_get_the_default_mapping(self):
+        r = self.client.post(
+            f"/api/v1/workouts/{self.workout['id']}/exercises/",
+            {"exercise_name": "romanian  deadlift", "order": 2},
+            format="json",
+        )
+        self.performed = r.data
+        self.add_set(1, 100)
+        exercise = Exercise.objects.get(pk=r.data["exercise"]["id"])
+        self.assertEqual(exercise.movement_pattern, "hinge")
+        self.assertEqual(self.dashboard()["Hamstrings"], (1, 1000))
+        self.assertInSync()
+
+    def test_command_maps_existing_exercises_and_rebuilds(self):
+        squat = Exercise.objects.create(name="Squat")
+        self.performed = self.client.post(
+            f"/api/v1/workouts/{self.workout['id']}/exercises/",
+            {"exercise": squat.id, "order": 2},
+            format="json",
+        ).data
+        self.add_set(1, 100)
+        self.assertNotIn("Quads", self.dashboard())
+
+        out = StringIO()
+        call_command("apply_muscle_taxonomy", stdout=out)
+        self.assertIn("rebuilt 1 user rollup(s)", out.getvalue())
+        self.assertEqual(self.dashboard()["Quads"], (1, 1000))
+        # The hand-made bench press mapping is kept (the table adds shoulders).
+        self.assertNotIn("Shoulders", self.dashboard())
+        self.assertInSync()
+
+
+# ---------------------------------------------------------------------------
+# Notes search
+# ---------------------------------------------------------------------------
+
+
+class NotesSearchTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.squat = Exercise.objects.create(name="Squat")
+        self.workout = Session.objects.create(
+            user=self.user, name="Leg day", notes="Squats felt heavy after running"
+        )
+        pe = PerformedExercise.objects.create(session=self.workout, exercise=self.squat, order=1)
+        self.set_entry = SetEntry.objects.create(
+            performed_exercise=pe, order=2, reps=5, weight=100, notes="left knee ached"
+        )
+        self.note = UserExerciseNote.objects.create(
+            user=self.user, exercise=self.squat, note="Push the knee out"
+        )
+        other = Session.objects.create(user=self.other_user, notes="knee knee knee")
+        UserExerciseNote.objects.create(user=self.other_user, exercise=self.squat, note="knee")
+        PerformedExercise.objects.create(session=other, exercise=self.squat, order=1)
+
+    def search(self, q):
+        r = self.client.get("/api/v1/workouts/search/", {"q": q})
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        return r.data
+
+    def test_hits_are_ranked_scoped_and_carry_their_context(self):
+        # token auth, search, sessions, exercises
+        with self.assertNumQueries(4):
+            hits = self.search("knee")
+        self.assertEqual(
+            sorted((h["kind"], h["id"]) for h in hits),
+            [("exercise_note", self.note.id), ("set", self.set_entry.id)],
+        )
+        self.assertEqual(hits, sorted(hits, key=lambda h: h["rank"], reverse=True))
+        set_hit = next(h for h in hits if h["kind"] == "set")
+        self.assertIn("[knee]", set_hit["snippet"])
+        self.assertEqual(set_hit["session"]["id"], self.workout.id)
+        self.assertEqual(set_hit["session"]["name"], "Leg day")
+        self.assertEqual(set_hit["exercise"], {"id": self.squat.id, "name": "Squat"})
+        self.assertEqual(set_hit["set_order"], 2)
+        note_hit = next(h for h in hits if h["kind"] == "exercise_note")
+        self.assertIsNone(note_hit["session"])
+
+    def test_words_match_by_stem_and_syntax_is_ignored(self):
+        self.assertEqual([h["kind"] for h in self.search("squat run")], ["session"])
+        self.assertEqual([h["kind"] for h in self.search('squatting" (')], ["session"])
+        self.assertEqual(self.search("deadlift"), [])
+
+    def test_index_follows_edits_and_deletes(self):
+        self.client.patch(
+            f"/api/v1/set-entries/{self.set_entry.id}/", {"notes": "grip slipped"}, format="json"
+        )
+        # Logging a set also clears the note for next time; both leave the index.
+        self.assertEqual(self.search("knee"), [])
+        self.assertEqual([h["id"] for h in self.search("grip")], [self.set_entry.id])
+        self.client.delete(f"/api/v1/workouts/{self.workout.id}/")
+        self.assertEqual(self.search("grip"), [])
+        self.assertEqual(self.search("heavy"), [])
+
+    def test_rejects_missing_query_and_bad_limit(self):
+        for params in ({}, {"q": "  "}, {"q": "knee", "limit": 0}, {"q": "knee", "limit": "x"}):
+            r = self.client.get("/api/v1/workouts/search/", params)
+            self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST, params)
+        r = self.client.get("/api/v1/workouts/search/", {"q": "knee", "limit": 1})
+        self.assertEqual(len(r.data), 1)
+
+    def test_unsupported_backend_answers_501_and_warns(self):
+        self.assertEqual(search.check_backend(), [])
+        with mock.patch.object(search, "VENDORS", ()):
+            r = self.client.get("/api/v1/workouts/search/", {"q": "knee"})
+            self.assertEqual(r.status_code, status.HTTP_501_NOT_IMPLEMENTED)
+            self.assertEqual([w.id for w in search.check_backend()], ["workouts.W001"])
+
+    @unittest.skipUnless(connection.vendor == "sqlite", "checks the SQLite FTS5 triggers")
+    def test_rebuild_command_repairs_the_index(self):
+        out = StringIO()
+        call_command("rebuild_search_index", "--verify", stdout=out)
+        with connection.cursor() as cursor:
+            cursor.execute("DROP TRIGGER workouts_setentry_fts_update")
+        with self.assertRaises(CommandError):
+            call_command("rebuild_search_index", "--verify", stdout=out)
+        call_command("rebuild_search_index", stdout=out)
+        call_command("rebuild_search_index", "--verify", stdout=out)
+
 
 # ---------------------------------------------------------------------------
 # Programs CRUD
@@ -474,21 +990,149 @@ class ProgramAPITests(_AuthenticatedTestCase):
         self.assertEqual(r.data["program"], p.id)
 
 
+class ProgramSummaryTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.program = Program.objects.create(user=self.user, name="PPL")
+        self.squat = Exercise.objects.create(name="Squat", description="")
+        # Mondays 5 Jan and 19 Jan 2026 bracket an empty week.
+        self.first = self._session("2026-01-05T08:00:00Z", 5, "100")
+        self.second = self._session("2026-01-07T08:00:00Z", 5, "100.5")
+        self.last = self._session("2026-01-19T08:00:00Z", 10, None)
+
+    def _session(self, when, reps, weight, program=None):
+        session = Session.objects.create(user=self.user, program=program or self.program)
+        Session.objects.filter(pk=session.pk).update(date=when)
+        pe = PerformedExercise.objects.create(session=session, exercise=self.squat, order=1)
+        SetEntry.objects.create(
+            performed_exercise=pe, order=1, reps=reps, weight=weight and Decimal(weight)
+        )
+        Session.recount(Session.objects.filter(pk=session.pk))
+        return session
+
+    def test_summary_fields(self):
+        r = self.client.get(f"/api/v1/programs/{self.program.id}/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertNotIn("workout_sessions", r.data)
+        self.assertEqual(r.data["session_count"], 3)
+        self.assertTrue(r.data["first_session_date"].startswith("2026-01-05"))
+        self.assertTrue(r.data["last_session_date"].startswith("2026-01-19"))
+        self.assertEqual(r.data["weeks"], 3)
+        self.assertEqual(r.data["active_weeks"], 2)
+        self.assertEqual(r.data["adherence"], 0.667)
+        self.assertEqual(r.data["sessions_per_week"], 1.0)
+        self.assertEqual(r.data["volume"], 1002.5)
+        self.assertEqual(r.data["volume_per_week"], 334.17)
+
+    def test_new_program_has_empty_summary(self):
+        r = self.client.post("/api/v1/programs/", {"name": "5/3/1"}, format="json")
+        self.assertEqual(r.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(r.data["session_count"], 0)
+        self.assertEqual(r.data["weeks"], 0)
+        self.assertIsNone(r.data["adherence"])
+        self.assertEqual(r.data["volume"], 0)
+
+    def test_list_is_one_query_however_many_sessions(self):
+        other = Program.objects.create(user=self.user, name="Other")
+        for day in range(10, 20):
+            self._session(f"2026-02-{day}T08:00:00Z", 5, "50", other)
+        with self.assertNumQueries(2):  # token auth + programs
+            r = self.client.get("/api/v1/programs/")
+        counts = {p["name"]: p["session_count"] for p in r.data}
+        self.assertEqual(counts, {"PPL": 3, "Other": 10})
+
+    def test_sessions_are_cursor_paginated(self):
+        Session.objects.create(user=self.user)  # not in the program
+        r = self.client.get(f"/api/v1/programs/{self.program.id}/sessions/?page_size=2")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual([s["id"] for s in r.data["results"]], [self.last.id, self.second.id])
+        self.assertEqual(r.data["results"][0]["exercises"][0]["sets"][0]["reps"], 10)
+        r = self.client.get(r.data["next"])
+        self.assertEqual([s["id"] for s in r.data["results"]], [self.first.id])
+        self.assertIsNone(r.data["next"])
+
+    def test_sessions_accept_history_filters(self):
+        r = self.client.get(f"/api/v1/programs/{self.program.id}/sessions/?date_from=2026-01-07")
+        self.assertEqual([s["id"] for s in r.data["results"]], [self.last.id, self.second.id])
+
+    def test_weeks_fill_gaps(self):
+        r = self.client.get(f"/api/v1/programs/{self.program.id}/weeks/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [(str(w["week"]), w["sessions"], w["volume"]) for w in r.data],
+            [("2026-01-05", 2, 1002.5), ("2026-01-12", 0, 0), ("2026-01-19", 1, 0)],
+        )
+
+    def test_other_users_program_is_404(self):
+        theirs = Program.objects.create(user=self.other_user, name="Theirs")
+        for suffix in ("", "sessions/", "weeks/"):
+            r = self.client.get(f"/api/v1/programs/{theirs.id}/{suffix}")
+            self.assertEqual(r.status_code, status.HTTP_404_NOT_FOUND)
+
+
 # ---------------------------------------------------------------------------
 # User exercises / last_exercise_performance
 # ---------------------------------------------------------------------------
 
 
 class UserExerciseEndpointTests(_AuthenticatedTestCase):
+    def _perform(self, session, name, order=1):
+        r = self.client.post(
+            f"/api/v1/workouts/{session.id}/exercises/",
+            {"exercise_name": name, "order": order},
+            format="json",
+        )
+        self.assertEqual(r.status_code, status.HTTP_201_CREATED)
+        return r.data["id"]
+
     def test_user_exercises_returns_distinct(self):
-        ex = Exercise.objects.create(name="Squat", description="")
         w1 = Session.objects.create(user=self.user, name="A")
         w2 = Session.objects.create(user=self.user, name="B")
-        PerformedExercise.objects.create(session=w1, exercise=ex, order=1)
-        PerformedExercise.objects.create(session=w2, exercise=ex, order=1)
+        self._perform(w1, "Squat")
+        self._perform(w2, "Squat")
         r = self.client.get("/api/v1/workouts/user_exercises/")
         self.assertEqual(len(r.data), 1)
         self.assertEqual(r.data[0]["name"], "Squat")
+        self.assertEqual(r.data[0]["times_performed"], 2)
+
+    def test_user_exercises_sort_by_recency_and_frequency(self):
+        old = Session.objects.create(user=self.user, name="Old")
+        new = Session.objects.create(user=self.user, name="New")
+        self._perform(old, "Squat")
+        self._perform(old, "Bench Press", order=2)
+        self._perform(new, "Bench Press")
+        self._perform(new, "Deadlift", order=2)
+
+        def names(sort):
+            r = self.client.get(f"/api/v1/workouts/user_exercises/?sort={sort}")
+            return [e["name"] for e in r.data]
+
+        self.assertEqual(names("name"), ["Bench Press", "Deadlift", "Squat"])
+        self.assertEqual(names("recent"), ["Bench Press", "Deadlift", "Squat"])
+        self.assertEqual(names("frequent")[0], "Bench Press")
+        self.assertEqual(names("recent")[-1], "Squat")
+        r = self.client.get("/api/v1/workouts/user_exercises/?sort=popular")
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_user_exercises_follow_deletes_and_redating(self):
+        w1 = Session.objects.create(user=self.user, name="A")
+        w2 = Session.objects.create(user=self.user, name="B")
+        self._perform(w1, "Squat")
+        performed_id = self._perform(w2, "Squat")
+        self._perform(w2, "Dips", order=2)
+
+        self.client.patch(
+            f"/api/v1/workouts/{w1.id}/", {"date": "2020-01-01T00:00:00Z"}, format="json"
+        )
+        stats = UserExercise.objects.get(user=self.user, exercise__name="Squat")
+        self.assertEqual(stats.first_performed_at.year, 2020)
+
+        self.client.delete(f"/api/v1/performed-exercises/{performed_id}/")
+        stats.refresh_from_db()
+        self.assertEqual(stats.times_performed, 1)
+        self.client.delete(f"/api/v1/workouts/{w2.id}/")
+        r = self.client.get("/api/v1/workouts/user_exercises/")
+        self.assertEqual([e["name"] for e in r.data], ["Squat"])
 
     def test_last_exercise_performance(self):
         ex = Exercise.objects.create(name="Squat", description="")
@@ -508,3 +1152,1119 @@ class UserExerciseEndpointTests(_AuthenticatedTestCase):
         ex = Exercise.objects.create(name="Squat", description="")
         r = self.client.get(f"/api/v1/workouts/last_exercise_performance/?exercise_id={ex.id}")
         self.assertEqual(r.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_last_exercise_performance_batch(self):
+        squat = Exercise.objects.create(name="Squat", description="")
+        bench = Exercise.objects.create(name="Bench Press", description="")
+        never = Exercise.objects.create(name="Dips", description="")
+        for name, reps in (("Old", 5), ("New", 3)):
+            w = Session.objects.create(user=self.user, name=name)
+            for order, exercise in enumerate((squat, bench), start=1):
+                pe = PerformedExercise.objects.create(session=w, exercise=exercise, order=order)
+                SetEntry.objects.create(performed_exercise=pe, order=1, reps=reps)
+        ids = f"{bench.id},{never.id},{squat.id}"
+        # token auth, one windowed query for the performances, one for their sets
+        with self.assertNumQueries(3):
+            r = self.client.get(f"/api/v1/workouts/last_exercise_performance/?exercise_ids={ids}")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual([e["exercise"]["name"] for e in r.data], ["Bench Press", "Squat"])
+        self.assertTrue(all(Decimal(str(e["last_sets"][0]["reps"])) == 3 for e in r.data))
+
+    def test_last_exercise_performance_batch_rejects_bad_ids(self):
+        r = self.client.get("/api/v1/workouts/last_exercise_performance/?exercise_ids=1,x")
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+        ids = ",".join(str(i) for i in range(101))
+        r = self.client.get(f"/api/v1/workouts/last_exercise_performance/?exercise_ids={ids}")
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ---------------------------------------------------------------------------
+# Database connection pool
+# ---------------------------------------------------------------------------
+
+
+class DbPoolStatsEndpointTests(_AuthenticatedTestCase):
+    def test_requires_staff(self):
+        r = self.client.get("/api/v1/ops/db-pool/")
+        self.assertEqual(r.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_reports_unpooled_database(self):
+        self.user.is_staff = True
+        self.user.save()
+        r = self.client.get("/api/v1/ops/db-pool/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        if getattr(connection, "pool", None) is None:
+            self.assertFalse(r.data["pooled"])
+        else:
+            self.assertIn("default", r.data["pools"])
+
+
+@unittest.skipUnless(
+    getattr(connection, "pool", None) is not None,
+    "requires PostgreSQL with DB_POOL=1",
+)
+class DbPoolConcurrencyTests(TransactionTestCase):
+    """Run with DATABASE_URL pointing at a local PostgreSQL and DB_POOL=1."""
+
+    def test_threads_share_bounded_pool(self):
+        pool = connection.pool
+        max_size = pool.max_size
+        errors = []
+        barrier = threading.Barrier(max_size * 2)
+
+        def worker():
+            try:
+                barrier.wait(timeout=10)
+                for _ in range(20):
+                    with connections["default"].cursor() as cursor:
+                        cursor.execute("SELECT pg_sleep(0.005)")
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=worker) for _ in range(max_size * 2)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        self.assertEqual(errors, [])
+        stats = pool.get_stats()
+        self.assertLessEqual(stats["pool_size"], max_size)
+        self.assertGreaterEqual(stats["requests_num"], max_size * 2)
+
+
+# ---------------------------------------------------------------------------
+# SQLite tuned profile
+# ---------------------------------------------------------------------------
+
+
+class SqliteWriteBenchmarkTests(SimpleTestCase):
+    def test_tuned_profile_never_reports_locked(self):
+        out = StringIO()
+        call_command(
+            "bench_sqlite_writes", threads=4, transactions=10, json=True, stdout=out
+        )
+        results = {r["profile"]: r for r in json.loads(out.getvalue())}
+        self.assertEqual(results["tuned"]["locked_errors"], 0)
+        self.assertEqual(results["tuned"]["committed"], 40)
+
+
+# ---------------------------------------------------------------------------
+# Read-replica routing
+# ---------------------------------------------------------------------------
+
+
+class ReplicaRoutingTests(_AuthenticatedTestCase):
+    """Route to "default" as if it were the replica and record each routing decision."""
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.routed = []
+        real_db_for_read = db_router.PrimaryReplicaRouter.db_for_read
+
+        def spy(router, model, **hints):
+            alias = real_db_for_read(router, model, **hints)
+            self.routed.append(alias)
+            return alias
+
+        patchers = [
+            mock.patch.object(db_router, "replica_alias", return_value="default"),
+            mock.patch.object(db_router.PrimaryReplicaRouter, "db_for_read", spy),
+            # The test cache is per process; pins still work within this one.
+            mock.patch.object(db_router, "check_shared_cache", return_value=[]),
+        ]
+        for p in patchers:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def test_router_is_noop_without_replica(self):
+        router = db_router.PrimaryReplicaRouter()
+        with mock.patch.object(db_router, "replica_alias", return_value=None):
+            with db_router.read_from_replica():
+                self.assertIsNone(router.db_for_read(Session))
+
+    def test_list_reads_from_replica(self):
+        Session.objects.create(user=self.user, name="Push")
+        self.routed.clear()
+        r = self.client.get("/api/v1/workouts/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertIn("default", self.routed)
+        self.assertFalse(db_router.using_replica())
+
+    def test_unlisted_action_stays_on_primary(self):
+        w = Session.objects.create(user=self.user, name="Push")
+        self.routed.clear()
+        self.client.patch(f"/api/v1/workouts/{w.id}/", {"notes": "x"}, format="json")
+        self.assertNotIn("default", self.routed)
+
+    def test_reads_stick_to_primary_after_write(self):
+        self.client.post("/api/v1/workouts/", {"notes": ""}, format="json")
+        self.routed.clear()
+        self.client.get("/api/v1/workouts/")
+        self.assertTrue(self.routed)
+        self.assertNotIn("default", self.routed)
+
+    def test_pin_is_per_user(self):
+        db_router.pin_to_primary(self.other_user.pk)
+        self.routed.clear()
+        self.client.get("/api/v1/workouts/")
+        self.assertIn("default", self.routed)
+
+
+class ReplicaCacheCheckTests(SimpleTestCase):
+    def test_replica_requires_shared_cache(self):
+        self.assertEqual(db_router.check_shared_cache(), [])
+        with mock.patch.object(db_router, "replica_alias", return_value="replica"):
+            errors = db_router.check_shared_cache()
+            self.assertEqual([e.id for e in errors], ["db_router.E001"])
+            with self.assertRaises(ImproperlyConfigured):
+                db_router.ReplicaPinMiddleware(lambda request: None)
+            shared = {
+                "default": {"BACKEND": "django.core.cache.backends.db.DatabaseCache", "LOCATION": "cache"}
+            }
+            with override_settings(CACHES=shared):
+                self.assertEqual(db_router.check_shared_cache(), [])
+
+
+# ---------------------------------------------------------------------------
+# Performance instrumentation
+# ---------------------------------------------------------------------------
+
+
+@override_settings(METRICS_TOKEN="s3cret")
+class PerformanceMetricsTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        metrics.reset_metrics()
+
+    def test_server_timing_header(self):
+        r = self.client.get("/api/v1/workouts/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertIn("db;dur=", r["Server-Timing"])
+        self.assertIn("queries", r["Server-Timing"])
+        self.assertIn("serialize;dur=", r["Server-Timing"])
+
+    def test_serializer_time_is_recorded(self):
+        Session.objects.create(user=self.user, name="Push")
+        self.client.get("/api/v1/workouts/")
+        [series] = metrics.SERIALIZE_DURATION._series.values()
+        self.assertEqual(series["count"], 1)
+        self.assertGreater(series["sum"], 0)
+
+    def test_serializer_timer_counts_outermost_data_only(self):
+        Session.objects.create(user=self.user, name="Push")
+        timer = metrics.SerializeTimer()
+        token = metrics._serialize_timer.set(timer)
+        try:
+            serializer = SessionSerializer(Session.objects.all(), many=True)
+            self.assertIsInstance(serializer, metrics.TimedListSerializer)
+            serializer.data
+        finally:
+            metrics._serialize_timer.reset(token)
+        self.assertGreater(timer.duration, 0)
+        self.assertFalse(timer.active)
+
+    def test_metrics_labeled_by_view_and_action(self):
+        self.client.get("/api/v1/workouts/")
+        self.client.get("/api/v1/workouts/template/")
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer s3cret")
+        r = self.client.get("/metrics")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        body = r.content.decode()
+        self.assertIn(
+            'gymbuddy_http_request_duration_seconds_count{action="list",view="WorkoutSessionViewSet"} 1',
+            body,
+        )
+        self.assertIn('action="template"', body)
+        self.assertIn("gymbuddy_http_db_queries_bucket", body)
+        self.assertIn("gymbuddy_http_response_size_bytes_sum", body)
+        self.assertNotIn('view="metrics_view"', body)
+
+    def test_metrics_requires_token(self):
+        r = self.client.get("/metrics")
+        self.assertEqual(r.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    @override_settings(METRICS_TOKEN="")
+    def test_metrics_hidden_without_token_outside_debug(self):
+        r = self.client.get("/metrics")
+        self.assertEqual(r.status_code, status.HTTP_404_NOT_FOUND)
+
+
+# ---------------------------------------------------------------------------
+# N+1 detection
+# ---------------------------------------------------------------------------
+
+
+class NPlusOneDetectionTests(_AuthenticatedTestCase):
+    """Endpoints stay query-constant as the number of exercises and sets grows."""
+
+    def setUp(self):
+        super().setUp()
+        self.workout = Session.objects.create(user=self.user, name="Big")
+        for i in range(1, 8):
+            ex = Exercise.objects.create(name=f"Exercise {i}", description="")
+            pe = PerformedExercise.objects.create(session=self.workout, exercise=ex, order=i)
+            for n in range(1, 8):
+                SetEntry.objects.create(performed_exercise=pe, order=n, reps=5, weight=Decimal("100"))
+            UserExerciseNote.objects.create(user=self.user, exercise=ex, note=f"note {i}")
+
+    def test_fingerprint_ignores_literals_and_in_lists(self):
+        self.assertEqual(
+            fingerprint('SELECT * FROM "t" WHERE "id" = 1 AND "x" IN (%s, %s)'),
+            fingerprint('SELECT  *  FROM "t" WHERE "id" = 22 AND "x" IN (%s)'),
+        )
+
+    @override_settings(NPLUSONE_THRESHOLD=2)
+    def test_query_in_loop_raises(self):
+        from django.http import JsonResponse
+        from django.urls import path
+
+        def loopy(request):
+            names = [Exercise.objects.get(pk=pk).name for pk in Exercise.objects.values_list("pk", flat=True)]
+            return JsonResponse({"names": names})
+
+        urlconf = type("urlconf", (), {"urlpatterns": [path("loopy/", loopy)]})
+        with override_settings(ROOT_URLCONF=urlconf):
+            with self.assertRaises(NPlusOneError):
+                self.client.get("/loopy/")
+
+    @override_settings(NPLUSONE_THRESHOLD=2)
+    def test_query_in_loop_after_write_logs_instead_of_raising(self):
+        from django.http import JsonResponse
+        from django.urls import path
+
+        def loopy(request):
+            Exercise.objects.create(name="Written", description="")
+            names = [Exercise.objects.get(pk=pk).name for pk in Exercise.objects.values_list("pk", flat=True)]
+            return JsonResponse({"names": names})
+
+        urlconf = type("urlconf", (), {"urlpatterns": [path("loopy/", loopy)]})
+        with override_settings(ROOT_URLCONF=urlconf):
+            with self.assertLogs("django_project.nplusone", "ERROR"):
+                r = self.client.post("/loopy/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertTrue(Exercise.objects.filter(name="Written").exists())
+
+    def test_retrieve_with_notes(self):
+        r = self.client.get(f"/api/v1/workouts/{self.workout.id}/")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertEqual(r.data["exercises"][0]["note_for_next_time"], "note 1")
+
+    def test_list_exercises_with_notes(self):
+        r = self.client.get(f"/api/v1/workouts/{self.workout.id}/exercises/")
+        self.assertEqual(len(r.data), 7)
+
+    def test_copy_large_template(self):
+        with self.assertNoLogs("django_project.nplusone"):
+            r = self.client.post(
+                "/api/v1/workouts/", {"template_session_id": self.workout.id}, format="json"
+            )
+        self.assertEqual(r.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(r.data["exercises"]), 7)
+        self.assertEqual(len(r.data["exercises"][6]["sets"]), 7)
+
+    def test_delete_set_renumbers_without_loop(self):
+        first = SetEntry.objects.filter(performed_exercise__session=self.workout).order_by("id").first()
+        with self.assertNoLogs("django_project.nplusone"):
+            r = self.client.delete(f"/api/v1/set-entries/{first.id}/")
+        self.assertEqual(r.status_code, status.HTTP_204_NO_CONTENT)
+        orders = list(
+            SetEntry.objects.filter(performed_exercise_id=first.performed_exercise_id)
+            .order_by("order")
+            .values_list("order", flat=True)
+        )
+        self.assertEqual(orders, list(range(1, 7)))
+
+
+# ---------------------------------------------------------------------------
+# Benchmark suite
+# ---------------------------------------------------------------------------
+
+
+class BenchmarkReportTests(SimpleTestCase):
+    def test_percentiles_and_throughput(self):
+        samples = [Sample("list", 200, ms / 1000, 3, 100) for ms in range(1, 101)]
+        summary = report.summarize(samples, wall_seconds=2.0)
+        self.assertEqual(summary["steps"]["list"]["p50_ms"], 50)
+        self.assertEqual(summary["steps"]["list"]["p99_ms"], 99)
+        self.assertEqual(summary["throughput_rps"], 50.0)
+
+    def test_compare_flags_latency_and_query_regressions(self):
+        before = report.summarize([Sample("list", 200, 0.010, 3, 10)], 1)
+        after = report.summarize([Sample("list", 200, 0.020, 4, 10)], 1)
+        regressions = report.compare(before, after, latency_tolerance=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(report.compare(before, before), [])
+
+
+@override_settings(NPLUSONE_MODE="raise")
+class BenchmarkWorkflowTests(TestCase):
+    def test_workflow_runs_clean_on_seeded_history(self):
+        out = StringIO()
+        call_command(
+            "bench_api", users=2, weeks=4, iterations=1, use_current_db=True, json=True, stdout=out
+        )
+        result = json.loads(out.getvalue())["summary"]
+        self.assertEqual(result["errors"], 0)
+        self.assertIn("log_set", result["steps"])
+        self.assertIsNotNone(result["steps"]["list_sessions"]["queries_max"])
+
+
+class SeedWorkoutsCommandTests(TestCase):
+    def _seed(self):
+        call_command(
+            "seed_workouts",
+            users=2,
+            weeks=3,
+            programs=2,
+            seed=5,
+            end_date="2026-01-01",
+            stdout=StringIO(),
+        )
+        return (
+            list(Session.objects.order_by("id").values_list("date", "program__name")),
+            list(SetEntry.objects.order_by("id").values_list("order", "reps", "weight")),
+        )
+
+    def test_deterministic_under_seed(self):
+        first = self._seed()
+        self.assertTrue(first[1])
+        Session.objects.all().delete()
+        Program.objects.all().delete()
+        self.assertEqual(self._seed(), first)
+
+    def test_history_shape(self):
+        sessions, sets = self._seed()
+        self.assertEqual(User.objects.filter(email__endswith="@bench.gymbuddy.local").count(), 2)
+        self.assertTrue(all(date.year in (2025, 2026) for date, _ in sessions))
+        self.assertEqual({name for _, name in sessions}, {"Program 1", "Program 2"})
+        self.assertTrue(all(5 <= reps <= 12 for _, reps, _ in sets))
+        # Raise if the seeded UserExercise index or session counters disagree with the history.
+        call_command("sync_user_exercises", verify=True, stdout=StringIO())
+        call_command("reconcile_session_counters", verify=True, stdout=StringIO())
+
+    def test_copy_requires_postgresql(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("COPY is supported here")
+        with self.assertRaises(CommandError):
+            call_command("seed_workouts", users=1, copy=True, stdout=StringIO())
+
+
+# ---------------------------------------------------------------------------
+# Workout history filters and cursor pagination
+# ---------------------------------------------------------------------------
+
+
+class SessionHistoryFilterTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.program = Program.objects.create(user=self.user, name="PPL")
+        self.squat = Exercise.objects.create(name="Squat", description="")
+        self.bench = Exercise.objects.create(name="Bench Press", description="")
+        self.jan = self._session("2026-01-10T08:00:00Z", [(self.squat, 5, "200")])
+        self.feb = self._session(
+            "2026-02-10T08:00:00Z", [(self.squat, 5, "100"), (self.bench, 5, "100")], self.program
+        )
+        self.mar = self._session("2026-03-10T08:00:00Z", [(self.bench, 10, None)], self.program)
+
+    def _session(self, when, entries, program=None):
+        session = Session.objects.create(user=self.user, program=program)
+        Session.objects.filter(pk=session.pk).update(date=when)
+        for order, (exercise, reps, weight) in enumerate(entries, start=1):
+            pe = PerformedExercise.objects.create(session=session, exercise=exercise, order=order)
+            SetEntry.objects.create(
+                performed_exercise=pe, order=1, reps=reps, weight=weight and Decimal(weight)
+            )
+        Session.recount(Session.objects.filter(pk=session.pk))
+        return session
+
+    def _ids(self, query):
+        r = self.client.get(f"/api/v1/workouts/?{query}")
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        return [s["id"] for s in r.data]
+
+    def test_date_range_is_inclusive_of_whole_days(self):
+        self.assertEqual(
+            self._ids("date_from=2026-02-10&date_to=2026-03-10"), [self.mar.id, self.feb.id]
+        )
+        self.assertEqual(self._ids("date_to=2026-01-10T07:00:00Z"), [])
+
+    def test_program(self):
+        self.assertEqual(self._ids(f"program={self.program.id}"), [self.mar.id, self.feb.id])
+
+    def test_exercise_requires_every_listed_exercise(self):
+        self.assertEqual(self._ids(f"exercise={self.squat.id}"), [self.feb.id, self.jan.id])
+        self.assertEqual(self._ids(f"exercise={self.squat.id},{self.bench.id}"), [self.feb.id])
+
+    def test_min_volume_ignores_bodyweight_sets(self):
+        self.assertEqual(self._ids("min_volume=1000"), [self.feb.id, self.jan.id])
+        self.assertEqual(self._ids("min_volume=1001"), [])
+
+    def test_invalid_params_are_rejected(self):
+        for query in (
+            "date_from=yesterday",
+            "date_from=2024-13-45",
+            "date_to=2024-02-30T25:00:00",
+            "program=x",
+            "exercise=1,a",
+            "min_volume=lots",
+            "min_volume=Infinity",
+            "min_volume=NaN",
+            "min_volume=1e40",
+            "min_volume=1e20",
+        ):
+            r = self.client.get(f"/api/v1/workouts/?{query}")
+            self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_cursor_pagination_is_opt_in(self):
+        r = self.client.get("/api/v1/workouts/?page_size=2")
+        self.assertEqual([s["id"] for s in r.data["results"]], [self.mar.id, self.feb.id])
+        self.assertIsNone(r.data["previous"])
+        r = self.client.get(r.data["next"])
+        self.assertEqual([s["id"] for s in r.data["results"]], [self.jan.id])
+        self.assertIsNone(r.data["next"])
+
+    def test_other_users_sessions_are_never_returned(self):
+        other = User.objects.create_user(email="o@example.com", username="o", password="x")
+        Session.objects.create(user=other, program=None)
+        self.assertEqual(len(self._ids("date_from=2000-01-01")), 3)
+
+
+@override_settings(NPLUSONE_MODE="raise")
+class HistoryBenchmarkScenarioTests(TestCase):
+    def test_history_scenario_runs_clean(self):
+        out = StringIO()
+        call_command(
+            "bench_api",
+            users=1,
+            weeks=30,
+            iterations=1,
+            scenario="history",
+            use_current_db=True,
+            json=True,
+            stdout=out,
+        )
+        result = json.loads(out.getvalue())["summary"]
+        self.assertEqual(result["errors"], 0)
+        self.assertIn("history_contains_exercise", result["steps"])
+        self.assertGreater(result["steps"]["history_page"]["count"], 1)
+
+
+class SyncUserExercisesCommandTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="s@example.com", username="s", password="x")
+        squat = Exercise.objects.create(name="Squat", description="")
+        for order in (1, 2):
+            session = Session.objects.create(user=self.user)
+            PerformedExercise.objects.create(session=session, exercise=squat, order=order)
+
+    def test_verify_reports_then_fix_repairs(self):
+        with self.assertRaises(CommandError):
+            call_command("sync_user_exercises", verify=True, stdout=StringIO())
+        call_command("sync_user_exercises", verify=True, fix=True, stdout=StringIO())
+        out = StringIO()
+        call_command("sync_user_exercises", verify=True, stdout=out)
+        self.assertIn("in sync", out.getvalue())
+        self.assertEqual(UserExercise.objects.get(user=self.user).times_performed, 2)
+
+    def test_rebuild_replaces_stale_rows(self):
+        UserExercise.objects.create(
+            user=self.user,
+            exercise=Exercise.objects.create(name="Dips", description=""),
+            first_performed_at="2020-01-01T00:00:00Z",
+            last_performed_at="2020-01-01T00:00:00Z",
+            times_performed=9,
+        )
+        call_command("sync_user_exercises", stdout=StringIO())
+        self.assertEqual(
+            list(UserExercise.objects.values_list("exercise__name", "times_performed")),
+            [("Squat", 2)],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Session counters
+# ---------------------------------------------------------------------------
+
+
+class SessionCounterTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        self.session = Session.objects.create(user=self.user)
+
+    def _counters(self, session=None):
+        session = Session.objects.get(pk=(session or self.session).pk)
+        self.assertFalse(Session.drifted().exists())
+        return session.exercise_count, session.set_count, session.total_volume
+
+    def _add_exercise(self, name, order):
+        r = self.client.post(
+            f"/api/v1/workouts/{self.session.id}/exercises/",
+            {"exercise_name": name, "order": order},
+            format="json",
+        )
+        return r.data["id"]
+
+    def _add_set(self, performed_id, order, reps, weight):
+        r = self.client.post(
+            f"/api/v1/performed-exercises/{performed_id}/sets/",
+            {"order": order, "reps": reps, "weight": weight},
+            format="json",
+        )
+        return r.data["id"]
+
+    def test_writes_keep_counters_in_step(self):
+        squat = self._add_exercise("Squat", 1)
+        self.assertEqual(self._counters(), (1, 0, 0))
+        first = self._add_set(squat, 1, 5, 100)
+        self._add_set(squat, 2, 5, "102.5")
+        self.assertEqual(self._counters(), (1, 2, 10_125_000))
+
+        self.client.patch(f"/api/v1/set-entries/{first}/", {"weight": 110}, format="json")
+        self.assertEqual(self._counters(), (1, 2, 10_625_000))
+
+        self.client.delete(f"/api/v1/set-entries/{first}/")
+        self.assertEqual(self._counters(), (1, 1, 5_125_000))
+
+        dips = self._add_exercise("Dips", 2)
+        self._add_set(dips, 1, 10, None)
+        self.assertEqual(self._counters(), (2, 2, 5_125_000))
+
+        self.client.delete(f"/api/v1/performed-exercises/{squat}/")
+        self.assertEqual(self._counters(), (1, 1, 0))
+
+    def test_template_copy_counts_copied_rows(self):
+        squat = self._add_exercise("Squat", 1)
+        self._add_set(squat, 1, 5, 100)
+        self._add_set(squat, 2, "8.5", 80)
+        r = self.client.post(
+            "/api/v1/workouts/", {"template_session_id": self.session.id}, format="json"
+        )
+        copy = Session.objects.get(pk=r.data["id"])
+        self.assertEqual(self._counters(copy), (1, 2, 11_800_000))
+        self.assertEqual((r.data["exercise_count"], r.data["set_count"]), (1, 2))
+        self.assertEqual(r.data["total_volume"], 1180)
+
+    def test_writes_touch_last_modified(self):
+        Session.objects.filter(pk=self.session.pk).update(last_modified="2020-01-01T00:00:00Z")
+        self._add_exercise("Squat", 1)
+        self.assertGreater(Session.objects.get(pk=self.session.pk).last_modified.year, 2020)
+
+    def test_min_volume_filter_reads_the_counter(self):
+        squat = self._add_exercise("Squat", 1)
+        self._add_set(squat, 1, 5, 100)
+        self.assertEqual(len(self.client.get("/api/v1/workouts/?min_volume=500").data), 1)
+        self.assertEqual(len(self.client.get("/api/v1/workouts/?min_volume=500.01").data), 0)
+
+    def test_counters_past_int4(self):
+        # 500 reps x 500 is 2.5e9 in 1/10000ths, past int4 on PostgreSQL.
+        squat = self._add_exercise("Squat", 1)
+        self._add_set(squat, 1, 500, 500)
+        self.assertEqual(Session.objects.get(pk=self.session.pk).total_volume, 500 * 500 * SCALE**2)
+        self.assertFalse(Session.drifted().exists())
+
+
+class ReconcileSessionCountersCommandTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(email="r@example.com", username="r", password="x")
+        squat = Exercise.objects.create(name="Squat", description="")
+        self.session = Session.objects.create(user=user)
+        pe = PerformedExercise.objects.create(session=self.session, exercise=squat, order=1)
+        SetEntry.objects.create(performed_exercise=pe, order=1, reps=5, weight=100)
+        Session.objects.create(user=user)  # empty: already in sync
+
+    def test_verify_reports_then_fix_repairs(self):
+        out = StringIO()
+        with self.assertRaises(CommandError):
+            call_command("reconcile_session_counters", verify=True, stdout=out)
+        self.assertIn(f"session {self.session.pk} ", out.getvalue())
+        self.assertIn("set_count 0 (actual 1)", out.getvalue())
+        out = StringIO()
+        call_command("reconcile_session_counters", verify=True, fix=True, stdout=out)
+        self.assertIn("recounted 1 drifted session(s)", out.getvalue())
+        self.session.refresh_from_db()
+        self.assertEqual(
+            (self.session.exercise_count, self.session.set_count, self.session.total_volume),
+            (1, 1, 5_000_000),
+        )
+
+    def test_recount_everything_in_batches(self):
+        out = StringIO()
+        call_command("reconcile_session_counters", batch_size=1, stdout=out)
+        self.assertIn("recounted 2 session(s)", out.getvalue())
+        self.assertFalse(Session.drifted().exists())
+
+
+# ---------------------------------------------------------------------------
+# Columnar history snapshot
+# ---------------------------------------------------------------------------
+
+
+class HistorySnapshotTests(_AuthenticatedTestCase):
+    url = "/api/v1/workouts/history_snapshot/"
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.squat = Exercise.objects.create(name="Squat", description="")
+        self.dips = Exercise.objects.create(name="Dips", description="")
+        self.session = Session.objects.create(user=self.user)
+        pe = PerformedExercise.objects.create(session=self.session, exercise=self.squat, order=1)
+        SetEntry.objects.create(performed_exercise=pe, order=1, reps=5, weight=Decimal("225.5"))
+        SetEntry.objects.create(performed_exercise=pe, order=2, reps=Decimal("4.5"), weight=Decimal("225"))
+        pe = PerformedExercise.objects.create(session=self.session, exercise=self.dips, order=2)
+        self.dip_set = SetEntry.objects.create(performed_exercise=pe, order=1, reps=12)
+
+    def test_json_columns(self):
+        r = self.client.get(self.url)
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        body = json.loads(r.content)
+        self.assertEqual(body["count"], 3)
+        columns = body["columns"]
+        self.assertEqual(columns["exercise"], [self.squat.id, self.squat.id, self.dips.id])
+        self.assertEqual(columns["reps"], [500, 450, 1200])
+        self.assertEqual(columns["weight"], [22550, 22500, history.BODYWEIGHT])
+        self.assertEqual(columns["date"][0], int(self.session.date.timestamp()))
+
+    def test_packed_matches_json(self):
+        packed = self.client.get(f"{self.url}?encoding=packed")
+        self.assertEqual(packed["Content-Type"], "application/octet-stream")
+        columns = history.decode_packed(packed.content)
+        as_json = json.loads(self.client.get(self.url).content)["columns"]
+        self.assertEqual({k: v.tolist() for k, v in columns.items()}, as_json)
+
+    def test_etag_revalidation_and_invalidation_on_write(self):
+        first = self.client.get(self.url)
+        r = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(r.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.client.patch(f"/api/v1/set-entries/{self.dip_set.id}/", {"reps": 10}, format="json")
+        r = self.client.get(self.url, HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(r["ETag"], first["ETag"])
+        self.assertEqual(json.loads(r.content)["columns"]["reps"][-1], 1000)
+
+    def test_cached_per_version(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):  # token auth and the data version
+            self.client.get(self.url)
+
+    def test_version_follows_writes_made_outside_the_api(self):
+        first = history.history_version(self.user.pk)
+        self.assertEqual(history.history_version(self.user.pk), first)
+        cache.clear()
+        self.assertEqual(history.history_version(self.user.pk), first)
+        other = Session.objects.create(user=self.user)
+        second = history.history_version(self.user.pk)
+        self.assertNotEqual(second, first)
+        Session.objects.filter(pk=self.session.pk).delete()
+        self.assertNotEqual(history.history_version(self.user.pk), second)
+        other.delete()
+        self.assertEqual(history.history_version(self.user.pk), "0")
+
+    def test_version_follows_admin_edits(self):
+        admin_user = User.objects.create_superuser(
+            email="admin@example.com", username="admin", password="x"
+        )
+        self.client.force_login(admin_user)
+        first = history.history_version(self.user.pk)
+        r = self.client.post(
+            f"/admin/workouts/setentry/{self.dip_set.id}/change/",
+            {
+                "performed_exercise": self.dip_set.performed_exercise_id,
+                "order": 1,
+                "reps": "10",
+                "weight": "20",
+                "notes": "",
+            },
+        )
+        self.assertEqual(r.status_code, 302)
+        second = history.history_version(self.user.pk)
+        self.assertNotEqual(second, first)
+        self.assertFalse(Session.drifted().exists())
+
+        r = self.client.post(f"/admin/workouts/setentry/{self.dip_set.id}/delete/", {"post": "yes"})
+        self.assertEqual(r.status_code, 302)
+        self.assertNotEqual(history.history_version(self.user.pk), second)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.set_count, 2)
+
+    def test_only_own_sets_and_bad_encoding(self):
+        other = User.objects.create_user(email="o@example.com", username="o", password="x")
+        pe = PerformedExercise.objects.create(
+            session=Session.objects.create(user=other), exercise=self.squat, order=1
+        )
+        SetEntry.objects.create(performed_exercise=pe, order=1, reps=1)
+        self.assertEqual(json.loads(self.client.get(self.url).content)["count"], 3)
+        r = self.client.get(f"{self.url}?encoding=msgpack")
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+# ---------------------------------------------------------------------------
+# Progressive-overload recommendations
+# ---------------------------------------------------------------------------
+
+
+class RecommendationTests(_AuthenticatedTestCase):
+    url = "/api/v1/workouts/recommendations/"
+
+    def setUp(self):
+        super().setUp()
+        cache.clear()
+        self.exercises = {}
+
+    def log(self, weeks_ago, name, *sets):
+        """One session `weeks_ago` weeks back with (reps, weight) sets of exercise `name`."""
+        if name not in self.exercises:
+            self.exercises[name] = Exercise.objects.create(name=name)
+        session = Session.objects.create(user=self.user)
+        Session.objects.filter(pk=session.pk).update(
+            date=timezone.now() - timedelta(weeks=weeks_ago)
+        )
+        pe = PerformedExercise.objects.create(
+            session=session, exercise=self.exercises[name], order=1
+        )
+        for order, (reps, weight) in enumerate(sets, start=1):
+            SetEntry.objects.create(performed_exercise=pe, order=order, reps=reps, weight=weight)
+        return session
+
+    def suggestions(self):
+        return recommend.compute(history.build_columns(self.user.pk))
+
+    def test_steady_sets_add_a_step(self):
+        self.log(1, "Squat", (5, 60), (5, 100), (5, 100), (4, 100))
+        squat = self.suggestions()[self.exercises["Squat"].id]
+        self.assertEqual(squat["action"], "increase")
+        self.assertEqual(squat["sets"], [{"order": n, "reps": 5, "weight": 102.5} for n in (1, 2, 3)])
+        self.assertEqual(squat["e1rm"], 116.7)
+
+        self.log(0, "Squat", (5, 200), (5, 200))
+        self.assertEqual(self.suggestions()[self.exercises["Squat"].id]["sets"][0]["weight"], 205)
+
+    def test_rep_drop_off_holds(self):
+        self.log(0, "Bench", (8, 80), (6, 80), (5, 80))
+        bench = self.suggestions()[self.exercises["Bench"].id]
+        self.assertEqual(bench["action"], "hold")
+        self.assertEqual(bench["sets"][-1], {"order": 3, "reps": 8, "weight": 80})
+
+    def test_falling_trend_deloads(self):
+        for weeks_ago, weight in ((3, 120), (2, 115), (1, 110), (0, 95)):
+            self.log(weeks_ago, "Row", (5, weight), (5, weight))
+        row = self.suggestions()[self.exercises["Row"].id]
+        self.assertEqual(row["action"], "deload")
+        self.assertEqual(row["sessions"], 4)
+        self.assertLess(row["trend"], 0)
+        self.assertEqual(row["sets"][0]["weight"], 85)  # 90% of 95, down to the 2.5 step
+
+    def test_bodyweight_adds_reps(self):
+        self.log(0, "Pull-up", (8, None), (8, None))
+        pullup = self.suggestions()[self.exercises["Pull-up"].id]
+        self.assertEqual(pullup["action"], "add_reps")
+        self.assertEqual(pullup["sets"], [{"order": n, "reps": 9, "weight": None} for n in (1, 2)])
+        self.assertIsNone(pullup["e1rm"])
+
+    def test_endpoint_serves_the_cache_until_the_data_changes(self):
+        self.log(1, "Squat", (5, 100))
+        session = self.log(0, "Bench", (5, 80))
+        r = self.client.get(self.url)  # nothing stored yet: computed inline (JOBS_INLINE)
+        self.assertFalse(r.data["stale"])
+        self.assertEqual(
+            [s["exercise"] for s in r.data["exercises"]],
+            [self.exercises["Bench"].id, self.exercises["Squat"].id],
+        )
+        with self.assertNumQueries(3):  # token auth, the stored row and the data version
+            r = self.client.get(self.url, {"exercise_ids": f"{self.exercises['Squat'].id},999"})
+        self.assertEqual([s["exercise"] for s in r.data["exercises"]], [self.exercises["Squat"].id])
+
+        pe = session.exercises.get()
+        self.client.post(
+            f"/api/v1/performed-exercises/{pe.id}/sets/",
+            {"order": 2, "reps": 5, "weight": 80},
+            format="json",
+        )
+        with override_settings(JOBS_INLINE=False):
+            for _ in range(2):
+                r = self.client.get(self.url)
+                self.assertTrue(r.data["stale"])
+        self.assertEqual(Job.objects.filter(task__endswith="refresh_recommendations").count(), 1)
+
+        r = self.client.get(self.url, {"exercise_ids": "x"})
+        self.assertEqual(r.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_batch_command_skips_current_users(self):
+        self.log(0, "Squat", (5, 100))
+        out = StringIO()
+        call_command("compute_recommendations", stdout=out)
+        self.assertIn("for 1 user(s), 0 already current", out.getvalue())
+        call_command("compute_recommendations", "--days", "0", stdout=out)
+        self.assertIn("for 0 user(s), 1 already current", out.getvalue())
+        # Stored in the database: losing the cache (a restart) loses nothing.
+        cache.clear()
+        stored, version = recommend.lookup(self.user.pk)
+        self.assertFalse(recommend.is_stale(stored, version))
+        self.assertEqual(stored.exercises[0]["exercise"], self.exercises["Squat"].id)
+        with mock.patch.object(recommend, "ALGORITHM", recommend.ALGORITHM + 1):
+            self.assertTrue(recommend.is_stale(stored, version))
+
+
+# ---------------------------------------------------------------------------
+# Cross-user percentile rankings
+# ---------------------------------------------------------------------------
+
+
+class RankingTests(_AuthenticatedTestCase):
+    url = "/api/v1/workouts/rankings/"
+
+    def setUp(self):
+        super().setUp()
+        self.bench = Exercise.objects.create(name="Bench")
+        self.squat = Exercise.objects.create(name="Squat")
+        # Eleven other lifters benching 60, 65, ... 110 for 1 (e1RM 62, 67.17, ...).
+        for n in range(11):
+            lifter = User.objects.create_user(
+                email=f"lifter{n}@example.com", username=f"lifter{n}", password="x"
+            )
+            self.lift(lifter, self.bench, (1, 60 + 5 * n), (1, 50))
+        self.lift(self.other_user, self.squat, (5, 100))
+        self.lift(self.user, self.bench, (5, 80), (8, 70))  # best e1RM 93.33
+        self.lift(self.user, self.squat, (5, 140))
+
+    def lift(self, user, exercise, *sets):
+        session = Session.objects.create(user=user)
+        pe = PerformedExercise.objects.create(session=session, exercise=exercise, order=1)
+        for order, (reps, weight) in enumerate(sets, start=1):
+            SetEntry.objects.create(performed_exercise=pe, order=order, reps=reps, weight=weight)
+
+    def test_percentile_interpolates_between_cut_points(self):
+        cuts = rankings.cut_points(np.arange(0, 101) * 300000)
+        self.assertEqual(len(cuts), rankings.QUANTILES)
+        self.assertEqual(rankings.percentile(cuts, 50), 50)
+        self.assertEqual(rankings.percentile(cuts, 72.5), 72.5)
+        self.assertEqual(rankings.percentile(cuts, -1), 0)
+        self.assertEqual(rankings.percentile(cuts, 500), 100)
+        ties = rankings.cut_points([300000] * 50 + [600000] * 50)
+        self.assertEqual(rankings.percentile(ties, 1), 24.5)
+
+    def test_batch_tables_and_lookup(self):
+        out = StringIO()
+        call_command("compute_percentiles", stdout=out)
+        self.assertIn("for 1 exercise(s) from 12 lifter best(s)", out.getvalue())
+        table = ExercisePercentiles.objects.get()
+        self.assertEqual((table.exercise_id, table.users), (self.bench.id, 12))
+        self.assertEqual(len(bytes(table.cut_points)), 4 * rankings.QUANTILES)
+
+        with self.assertNumQueries(3):  # token auth, the user's bests, tables
+            r = self.client.get(self.url)
+        self.assertEqual(len(r.data), 1)  # squat has too few lifters for a table
+        bench = r.data[0]
+        self.assertEqual(bench["exercise"], self.bench.id)
+        self.assertEqual(bench["e1rm"], 93.3)
+        self.assertEqual(bench["lifters"], 12)
+        # Ahead of the 60..90 benchers (7 of them), behind the rest.
+        self.assertGreater(bench["percentile"], 50)
+        self.assertLess(bench["percentile"], 65)
+        self.assertEqual(bench["quartiles"][1], 90.4)
+
+        r = self.client.get(self.url, {"exercise_ids": str(self.squat.id)})
+        self.assertEqual(r.data, [])
+
+        call_command("compute_percentiles", "--min-users", "20", stdout=out)
+        self.assertFalse(ExercisePercentiles.objects.exists())
+
+    def test_e1rm_past_int4(self):
+        # 99999 x (99900 + 3000) hundredths is about 1e10, past int4 on PostgreSQL.
+        self.lift(self.user, self.squat, (999, Decimal("999.99")))
+        self.assertAlmostEqual(rankings.user_bests(self.user.pk)[self.squat.id], 999.99 * (1 + 999 / 30))
+
+
+# ---------------------------------------------------------------------------
+# Response compression and JSON rendering
+# ---------------------------------------------------------------------------
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def test_same_bytes_as_json_renderer(self):
+        from datetime import datetime, timezone as dt_timezone
+
+        from django.utils.translation import gettext_lazy
+        from rest_framework.renderers import JSONRenderer
+
+        data = {
+            "reps": Decimal("8.50"),
+            "weight": None,
+            "date": datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=dt_timezone.utc),
+            "label": gettext_lazy("Squat"),
+            "notes": "line\u2028sep \u00e9",
+            "sets": [{"order": 1}, {"order": 2}],
+            3: "int key",
+        }
+        self.assertEqual(FastJSONRenderer().render(data), JSONRenderer().render(data))
+
+    def test_indent_falls_back(self):
+        rendered = FastJSONRenderer().render(
+            {"a": 1}, "application/json; indent=2", {}
+        )
+        self.assertEqual(rendered, b'{\n  "a": 1\n}')
+
+
+@override_settings(COMPRESSION_MIN_SIZE=200, COMPRESSION_ENCODINGS=["zstd", "br", "gzip"])
+class CompressionTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        exercise = Exercise.objects.create(name="Squat", description="")
+        for _ in range(3):
+            session = Session.objects.create(user=self.user, notes="heavy day " * 20)
+            pe = PerformedExercise.objects.create(session=session, exercise=exercise, order=1)
+            SetEntry.objects.create(performed_exercise=pe, order=1, reps=5)
+
+    def test_negotiates_and_round_trips(self):
+        plain = self.client.get("/api/v1/workouts/")
+        self.assertNotIn("Content-Encoding", plain)
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        for coding in compression.CODECS:
+            r = self.client.get("/api/v1/workouts/", HTTP_ACCEPT_ENCODING=coding)
+            self.assertEqual(r["Content-Encoding"], coding)
+            self.assertLess(len(r.content), len(plain.content))
+            self.assertEqual(
+                json.loads(compression.decompress(coding, r.content)), json.loads(plain.content)
+            )
+
+    def test_q_values_and_preference(self):
+        self.assertEqual(compression.choose_encoding("gzip;q=0.5, identity"), "gzip")
+        self.assertIsNone(compression.choose_encoding("gzip;q=0"))
+        self.assertIsNone(compression.choose_encoding(""))
+        self.assertEqual(compression.choose_encoding("br;q=0.2, gzip;q=0.9", ["br", "gzip"]), "gzip")
+        self.assertEqual(compression.choose_encoding("*", ["gzip"]), "gzip")
+
+    def test_small_bodies_are_not_compressed(self):
+        r = self.client.get("/api/v1/workouts/user_exercises/", HTTP_ACCEPT_ENCODING="gzip")
+        self.assertNotIn("Content-Encoding", r)
+
+    def test_etag_is_weakened_and_still_revalidates(self):
+        url = "/api/v1/workouts/history_snapshot/"
+        cache.clear()
+        with override_settings(COMPRESSION_MIN_SIZE=1):
+            first = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+            self.assertEqual(first["Content-Encoding"], "gzip")
+            self.assertTrue(first["ETag"].startswith("W/"))
+            r = self.client.get(url, HTTP_ACCEPT_ENCODING="gzip", HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(r.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+@override_settings(STREAMING_CHUNK_SIZE=2)
+class StreamingListTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        squat = Exercise.objects.create(name="Squat", description="")
+        UserExerciseNote.objects.create(user=self.user, exercise=squat, note="Deeper")
+        for n in range(5):
+            session = Session.objects.create(user=self.user, name=f"W{n}")
+            pe = PerformedExercise.objects.create(session=session, exercise=squat, order=1)
+            SetEntry.objects.create(performed_exercise=pe, order=1, reps=5, weight=100 + n)
+        Session.recount(Session.objects.filter(user=self.user))
+
+    def _stream(self, query="", **headers):
+        r = self.client.get(f"/api/v1/workouts/?stream=1{query}", **headers)
+        self.assertEqual(r.status_code, status.HTTP_200_OK)
+        self.assertTrue(r.streaming)
+        return r, b"".join(r.streaming_content)
+
+    def test_streams_the_same_bytes_across_chunks(self):
+        for query in ("", "&fields=id,exercises.sets.weight", "&min_volume=510"):
+            plain = self.client.get(f"/api/v1/workouts/?{query[1:]}")
+            r, body = self._stream(query)
+            self.assertEqual(r["Content-Type"], "application/json")
+            self.assertEqual(body, plain.content, query)
+        Session.objects.filter(user=self.user).delete()
+        self.assertEqual(self._stream()[1], b"[]")
+
+    def test_paged_requests_ignore_stream(self):
+        r = self.client.get("/api/v1/workouts/?stream=1&page_size=2")
+        self.assertFalse(r.streaming)
+        self.assertEqual(len(r.data["results"]), 2)
+
+    @override_settings(COMPRESSION_MIN_SIZE=10_000_000)
+    def test_streams_are_compressed_incrementally(self):
+        plain = self._stream()[1]
+        for coding in compression.STREAM_CODECS:
+            r, body = self._stream(HTTP_ACCEPT_ENCODING=coding)
+            self.assertEqual(r["Content-Encoding"], coding)
+            self.assertEqual(compression.decompress(coding, body), plain)
+
+
+class EncodingBenchmarkTests(TestCase):
+    def test_reports_every_renderer_and_coding(self):
+        out = StringIO()
+        call_command("bench_encoding", weeks=2, repeat=1, use_current_db=True, json=True, stdout=out)
+        stages = {row["stage"] for row in json.loads(out.getvalue())["results"]}
+        self.assertIn("render:json", stages)
+        self.assertTrue({f"compress:{c}" for c in compression.CODECS} <= stages)
+
+
+# ---------------------------------------------------------------------------
+# Fixed-point reps / weight
+# ---------------------------------------------------------------------------
+
+
+class FixedPointSetDataTests(_AuthenticatedTestCase):
+    def setUp(self):
+        super().setUp()
+        session = Session.objects.create(user=self.user)
+        exercise = Exercise.objects.create(name="Squat", description="")
+        self.performed = PerformedExercise.objects.create(
+            session=session, exercise=exercise, order=1
+        )
+
+    def _add(self, **body):
+        return self.client.post(
+            f"/api/v1/performed-exercises/{self.performed.id}/sets/",
+            {"order": SetEntry.objects.count() + 1, **body},
+            format="json",
+        )
+
+    def test_round_trips_as_json_numbers(self):
+        r = self._add(reps="8.5", weight=135)
+        self.assertEqual(r.status_code, status.HTTP_201_CREATED)
+        self.assertEqual((r.data["reps"], r.data["weight"]), (8.5, 135))
+        body = json.loads(self.client.get(f"/api/v1/set-entries/{r.data['id']}/").content)
+        self.assertEqual((body["reps"], body["weight"]), (8.5, 135))
+        self.assertIsInstance(body["weight"], int)
+
+    def test_stored_as_integer_hundredths(self):
+        self._add(reps=0.29, weight="999.99")
+        entry = SetEntry.objects.get()
+        self.assertEqual((entry.reps, entry.weight), (0.29, 999.99))
+        raw = SetEntry.objects.values_list(centi("reps"), centi("weight")).get()
+        self.assertEqual(raw, (29, 99999))
+        self.assertTrue(SetEntry.objects.filter(weight__gte=999.985).exists())
+        self.assertFalse(SetEntry.objects.filter(weight__gt=Decimal("999.99")).exists())
+
+    def test_rejects_what_decimalfield_rejected(self):
+        for body in ({"reps": "1.234"}, {"reps": 1000}, {"reps": "lots"}, {"reps": True}):
+            self.assertEqual(self._add(**body).status_code, status.HTTP_400_BAD_REQUEST, body)
+        self.assertEqual(self._add(reps=-1).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_model_normalizes_assigned_values(self):
+        entry = SetEntry.objects.create(
+            performed_exercise=self.performed, order=1, reps=Decimal("8.50"), weight="100.00"
+        )
+        self.assertEqual((entry.reps, entry.weight), (8.5, 100))
+
+    def test_to_centi_rejects_non_finite(self):
+        for value in ("Infinity", "-inf", "NaN", float("inf"), Decimal("NaN"), "1e40"):
+            with self.assertRaises(ValueError, msg=value):
+                to_centi(value)
+
+
+class NumericBenchmarkTests(TestCase):
+    def test_reports_every_stage(self):
+        out = StringIO()
+        call_command(
+            "bench_numeric", users=1, weeks=2, repeat=1, use_current_db=True, json=True, stdout=out
+        )
+        stages = [row["stage"] for row in json.loads(out.getvalue())]
+        self.assertIn("aggregate:db_integer", stages)
+        self.assertIn("serialize:decimal", stages)
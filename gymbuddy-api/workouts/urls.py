@@ -1,3 +1,4 @@
+from django.urls import path
 from rest_framework.routers import DefaultRouter
 from . import views
 
@@ -12,4 +13,15 @@ router.register(
 )
 router.register(r"set-entries", views.SetEntryViewSet, basename="set-entry")
 
-urlpatterns = router.urls
+urlpatterns = router.urls + [
+    path(
+        "screens/workouts/",
+        views.ScreenViewSet.as_view({"get": "workouts"}),
+        name="screen-workouts",
+    ),
+    path(
+        "screens/workout-detail/<int:pk>/",
+        views.ScreenViewSet.as_view({"get": "workout_detail"}),
+        name="screen-workout-detail",
+    ),
+]
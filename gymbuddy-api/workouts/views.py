@@ -1,5 +1,22 @@
 # workouts/views.py
 # pyright: reportUnreachable=false
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db.models import (
+    Count,
+    F,
+    Max,
+    Min,
+    OuterRef,
+    Subquery,
+    Sum,
+    Window,
+    prefetch_related_objects,
+)
+from django.db.models.functions import Coalesce, RowNumber, TruncWeek
+from django.http import Http404, HttpResponse, HttpResponseNotModified
+from django.utils import timezone
 from rest_framework import viewsets, status
 from rest_framework.permissions import AllowAny
 from rest_framework.decorators import action
@@ -9,7 +26,26 @@ from rest_framework.mixins import (
     UpdateModelMixin,
     DestroyModelMixin,
 )
-from .models import Program, Session, PerformedExercise, SetEntry, Exercise, UserExerciseNote
+
+from django_project import streaming
+from django_project.db_router import ReplicaReadsMixin
+
+from . import fieldsets, history, rankings, recommend, search, tasks, taxonomy
+from .fields import SCALE, from_centi
+from .filters import SessionHistoryFilter
+from .models import (
+    Program,
+    Session,
+    PerformedExercise,
+    SetEntry,
+    Exercise,
+    ExercisePercentiles,
+    UserExercise,
+    UserExerciseNote,
+    WeeklyMuscleVolume,
+    week_start,
+)
+from .pagination import OptionalCursorPagination, SessionCursorPagination
 from .serializers import (
     ProgramSerializer,
     SessionSerializer,
@@ -17,66 +53,313 @@ from .serializers import (
     SetEntrySerializer,
     ExerciseSerializer,
     TemplateExerciseSerializer,
+    UserExerciseSerializer,
 )
 
-
-class ExerciseViewSet(viewsets.ReadOnlyModelViewSet):
+PREVIOUS_EXERCISES_MAX_DEPTH = 20
+LAST_PERFORMANCE_MAX_IDS = 100
+# Sessions of history the workout-detail screen shows by default.
+SCREEN_PREVIOUS_DEPTH = 5
+MUSCLE_VOLUME_MAX_WEEKS = 52
+USER_EXERCISE_ORDERINGS = {
+    "name": ["exercise__name"],
+    "recent": ["-last_performed_at", "exercise__name"],
+    "frequent": ["-times_performed", "-last_performed_at"],
+}
+
+
+def _parse_depth(raw, default):
+    """?depth as an int in 1..PREVIOUS_EXERCISES_MAX_DEPTH, `default` if absent, else None."""
+    try:
+        depth = int(raw) if raw else default
+    except ValueError:
+        return None
+    return depth if 1 <= depth <= PREVIOUS_EXERCISES_MAX_DEPTH else None
+
+
+def _depth_error():
+    return Response(
+        {"detail": f"depth must be an integer from 1 to {PREVIOUS_EXERCISES_MAX_DEPTH}"},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+def _sort_error():
+    return Response(
+        {"detail": f"sort must be one of: {', '.join(USER_EXERCISE_ORDERINGS)}"},
+        status=status.HTTP_400_BAD_REQUEST,
+    )
+
+
+def _previous_sessions(user, pk, depth, anchor=None):
+    """
+    [(id, date)] of the `depth` sessions before session pk, newest first. Raises 404
+    if pk is not one of the user's sessions. Both lookups walk the (user, -date) index;
+    a caller that already holds the session passes its date as `anchor` to skip the first.
+    """
+    own = Session.objects.filter(user=user)
+    if anchor is None and depth == 1:
+        earlier = own.filter(date__lt=OuterRef("date")).order_by("-date", "-id")
+        row = (
+            own.filter(pk=pk)
+            .annotate(
+                previous_id=Subquery(earlier.values("id")[:1]),
+                previous_date=Subquery(earlier.values("date")[:1]),
+            )
+            .values_list("previous_id", "previous_date")
+            .first()
+        )
+        if row is None:
+            raise Http404
+        return [row] if row[0] is not None else []
+    if anchor is None:
+        anchor = own.filter(pk=pk).values_list("date", flat=True).first()
+        if anchor is None:
+            raise Http404
+    return list(
+        own.filter(date__lt=anchor).order_by("-date", "-id").values_list("id", "date")[:depth]
+    )
+
+
+def _previous_entries(sessions, performed):
+    """
+    One entry per exercise across `sessions` ([(id, date)], newest first), taken from its
+    most recent performance, with `history` holding one slot per session (null where
+    the exercise was not done). `performed` must have exercise and sets loaded.
+    """
+    slot = {sid: i for i, (sid, _) in enumerate(sessions)}
+    performed = sorted(performed, key=lambda pe: (slot[pe.session_id], pe.order))
+    entries = {}
+    for pe, data in zip(performed, TemplateExerciseSerializer(performed, many=True).data):
+        entry = entries.get(pe.exercise_id)
+        if entry is None:
+            entry = entries[pe.exercise_id] = {**data, "history": [None] * len(sessions)}
+        if entry["history"][slot[pe.session_id]] is None:
+            entry["history"][slot[pe.session_id]] = {
+                "session": pe.session_id,
+                "date": sessions[slot[pe.session_id]][1],
+                "user_preferred_name": data["user_preferred_name"],
+                "order": data["order"],
+                "sets": data["last_sets"],
+            }
+    return list(entries.values())
+
+
+def _last_performances(user, exercise_ids):
+    """
+    Most recent PerformedExercise per exercise id, in one query: ROW_NUMBER() over each
+    exercise's performances, newest first. Callers add select_related/prefetch_related.
+    """
+    latest_first = Window(
+        RowNumber(),
+        partition_by=F("exercise_id"),
+        order_by=[F("session__date").desc(), F("id").desc()],
+    )
+    return (
+        PerformedExercise.objects.filter(session__user=user, exercise_id__in=exercise_ids)
+        .annotate(recency=latest_first)
+        .filter(recency=1)
+    )
+
+
+class ExerciseViewSet(ReplicaReadsMixin, viewsets.ReadOnlyModelViewSet):
     """Master list of exercise types (read-only)."""
 
+    replica_actions = frozenset({"list", "retrieve"})
     serializer_class = ExerciseSerializer
     queryset = Exercise.objects.all()
     permission_classes = [AllowAny]
 
 
-class ProgramViewSet(viewsets.ModelViewSet):
+class ProgramViewSet(fieldsets.SparseFieldsetMixin, ReplicaReadsMixin, viewsets.ModelViewSet):
     """CRUD for training programs (each can have many workout sessions)."""
 
+    replica_actions = frozenset({"list", "retrieve", "sessions", "weeks"})
     serializer_class = ProgramSerializer
     queryset = Program.objects.all()
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user).prefetch_related(
-            "workout_sessions"
-        )
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action in ("sessions", "weeks"):
+            return queryset
+        # One grouped query for the whole page of programs, however many sessions they
+        # have, computing only the summary fields the response asks for (?fields=).
+        summary = {
+            "session_count": Count("workout_sessions"),
+            "first_session_date": Min("workout_sessions__date"),
+            "last_session_date": Max("workout_sessions__date"),
+            "active_weeks": Count(TruncWeek("workout_sessions__date"), distinct=True),
+            "total_volume": Coalesce(Sum("workout_sessions__total_volume"), 0),
+        }
+        serializer = self.get_serializer()
+        wanted = serializer.sources()
+        if self.action in ("list", "retrieve"):
+            queryset = fieldsets.shape(serializer, queryset)
+        return queryset.annotate(**{name: agg for name, agg in summary.items() if name in wanted})
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    @action(detail=True, methods=["get"])
+    def sessions(self, request, pk=None):
+        """
+        GET /api/v1/programs/{id}/sessions/ - the program's sessions, newest first, in
+        cursor pages ({"next", "previous", "results"}). Accepts the workout history
+        filters (date_from, date_to, exercise, min_volume) and page_size.
+        """
+        program = self.get_object()
+        context = self.get_serializer_context()
+        queryset = fieldsets.shape(
+            SessionSerializer(context=context),
+            Session.objects.filter(user=request.user, program=program),
+            "date",
+        )
+        queryset = SessionHistoryFilter().filter_queryset(request, queryset, self)
+        paginator = SessionCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        serializer = SessionSerializer(page, many=True, context=context)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=True, methods=["get"])
+    def weeks(self, request, pk=None):
+        """
+        GET /api/v1/programs/{id}/weeks/ - one row per week (Monday) from the program's
+        first session to its last: {"week", "sessions", "volume"}. Weeks without a
+        session are included with zeros, so the series shows adherence directly.
+        """
+        program = self.get_object()
+        by_week = {
+            week: (n, volume)
+            for week, n, volume in Session.objects.filter(program=program)
+            .annotate(week=TruncWeek("date"))
+            .values("week")
+            .annotate(n=Count("id"), volume=Sum("total_volume"))
+            .order_by()
+            .values_list("week", "n", "volume")
+        }
+        if not by_week:
+            return Response([])
+        week, last = min(by_week), max(by_week)
+        rows = []
+        while week <= last:
+            n, total = by_week.get(week, (0, 0))
+            rows.append(
+                {
+                    "week": week.date(),
+                    "sessions": n,
+                    # Volume sums are in 1/10000ths (hundredths x hundredths).
+                    "volume": from_centi(round(total / SCALE)),
+                }
+            )
+            week += timedelta(weeks=1)
+        return Response(rows)
+
 
-class WorkoutSessionViewSet(viewsets.ModelViewSet):
+class WorkoutSessionViewSet(
+    fieldsets.SparseFieldsetMixin,
+    ReplicaReadsMixin,
+    viewsets.ModelViewSet,
+):
+    replica_actions = frozenset(
+        {
+            "list",
+            "retrieve",
+            "template",
+            "previous_exercises",
+            "user_exercises",
+            "last_exercise_performance",
+            "exercises",
+            "search",
+            "muscle_volume",
+            "rankings",
+        }
+    )
     serializer_class = SessionSerializer
     queryset = Session.objects.all()
+    filter_backends = [SessionHistoryFilter]
+    pagination_class = OptionalCursorPagination
 
     def get_queryset(self):
-        return (
-            self.queryset.filter(user=self.request.user)
-            .prefetch_related(
-                "exercises__exercise",
-                "exercises__sets",
-            )
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.action in ("list", "retrieve"):
+            # Load what ?fields= / ?expand= will render; date is the cursor's sort key.
+            return fieldsets.shape(self.get_serializer(), queryset, "date")
+        return queryset.prefetch_related(
+            "exercises__exercise",
+            "exercises__sets",
         )
 
+    def list(self, request, *args, **kwargs):
+        """
+        GET /api/v1/workouts/ - the user's sessions, newest first.
+
+        ?stream=1 sends the unpaginated list as a stream, rendered a chunk of sessions
+        at a time so memory stays flat however long the history (see
+        django_project/streaming.py). Paged requests (page_size / cursor) are already
+        bounded and ignore it.
+        """
+        params = request.query_params
+        paginator = self.paginator
+        if (
+            params.get("stream", "").lower() in ("true", "1", "yes")
+            and paginator.cursor_query_param not in params
+            and paginator.page_size_query_param not in params
+            and request.accepted_renderer.format == "json"
+        ):
+            return streaming.stream_list(
+                self.filter_queryset(self.get_queryset()),
+                self.get_serializer_class(),
+                self.get_serializer_context(),
+                request.accepted_renderer,
+            )
+        return super().list(request, *args, **kwargs)
+
     def _copy_session_as_template(self, new_session, template_session_id):
         """Copy exercises and sets from template_session_id (must be user's) into new_session."""
         template = self.get_queryset().filter(id=template_session_id).first()
         if not template:
             return
-        for pe in template.exercises.all().order_by("order"):
-            new_pe = PerformedExercise.objects.create(
-                session=new_session,
-                exercise=pe.exercise,
-                user_preferred_name=pe.user_preferred_name or "",
-                order=pe.order,
-                is_bodyweight=pe.is_bodyweight,
-            )
-            for s in pe.sets.all().order_by("order"):
-                SetEntry.objects.create(
+        # Exercises and sets come from get_queryset()'s prefetch, already in Meta order.
+        template_exercises = list(template.exercises.all())
+        new_exercises = PerformedExercise.objects.bulk_create(
+            [
+                PerformedExercise(
+                    session=new_session,
+                    exercise=pe.exercise,
+                    user_preferred_name=pe.user_preferred_name or "",
+                    order=pe.order,
+                    is_bodyweight=pe.is_bodyweight,
+                )
+                for pe in template_exercises
+            ]
+        )
+        new_sets = SetEntry.objects.bulk_create(
+            [
+                SetEntry(
                     performed_exercise=new_pe,
                     order=s.order,
                     reps=s.reps,
                     weight=s.weight,
                     notes=s.notes or "",
                 )
+                for pe, new_pe in zip(template_exercises, new_exercises)
+                for s in pe.sets.all()
+            ]
+        )
+        Session.bump(
+            new_session.pk,
+            exercises=len(new_exercises),
+            sets=len(new_sets),
+            volume=sum(s.volume for s in new_sets),
+        )
+        week = week_start(new_session.date)
+        WeeklyMuscleVolume.bump(
+            new_session.user_id,
+            [(week, s.performed_exercise.exercise_id, 1, s.volume) for s in new_sets],
+        )
+        UserExercise.refresh_for(
+            new_session.user_id, {pe.exercise_id for pe in template_exercises}
+        )
 
     def create(self, request, *args, **kwargs):
         data = dict(request.data)
@@ -107,33 +390,129 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
         serializer.save(**kwargs)
 
     def perform_update(self, serializer):
+        previous_date = serializer.instance.date
         serializer.save()
         session = serializer.instance
+        previous_week, week = week_start(previous_date), week_start(session.date)
+        if week != previous_week:
+            WeeklyMuscleVolume.bump(
+                session.user_id,
+                WeeklyMuscleVolume.session_deltas(session.pk, previous_week, sign=-1)
+                + WeeklyMuscleVolume.session_deltas(session.pk, week),
+            )
+        tasks.session_updated.enqueue(
+            session_id=session.pk, redated=session.date != previous_date
+        )
+
+    def perform_destroy(self, instance):
         exercise_ids = list(
-            session.exercises.values_list("exercise_id", flat=True).distinct()
+            instance.exercises.values_list("exercise_id", flat=True).distinct()
+        )
+        removed = WeeklyMuscleVolume.session_deltas(
+            instance.pk, week_start(instance.date), sign=-1
+        )
+        instance.delete()
+        WeeklyMuscleVolume.bump(instance.user_id, removed)
+        tasks.refresh_user_exercises.enqueue(
+            user_id=instance.user_id, exercise_ids=exercise_ids
         )
-        UserExerciseNote.clear_for_exercises(session.user_id, exercise_ids)
 
     @action(detail=False, methods=["get"])
     def user_exercises(self, request):
-        """GET /api/v1/workouts/user_exercises/ - distinct exercises the user has ever performed."""
-        exercises = (
-            Exercise.objects.filter(
-                performed_instances__session__user=request.user
-            )
-            .distinct()
-            .order_by("name")
+        """
+        GET /api/v1/workouts/user_exercises/ - distinct exercises the user has ever performed.
+
+        ?sort=name (default), recent (last performed first) or frequent (most performed first).
+        """
+        sort = request.query_params.get("sort", "name")
+        if sort not in USER_EXERCISE_ORDERINGS:
+            return _sort_error()
+        stats = (
+            UserExercise.objects.filter(user=request.user)
+            .select_related("exercise")
+            .order_by(*USER_EXERCISE_ORDERINGS[sort])
         )
-        serializer = ExerciseSerializer(exercises, many=True)
+        serializer = UserExerciseSerializer(stats, many=True)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def muscle_volume(self, request):
+        """
+        GET /api/v1/workouts/muscle_volume/ - sets and volume per muscle group for this
+        week and the ?weeks=N-1 (default 4, max 52) before it, newest week first:
+        {"week", "muscle_group", "sets", "volume"}. Sets are weighted (a set that half
+        counts for a muscle adds 0.5); groups with no sets in a week are left out.
+
+        Read from the WeeklyMuscleVolume rollup in one indexed query.
+        """
+        try:
+            weeks = int(request.query_params.get("weeks", 4))
+        except ValueError:
+            weeks = 0
+        if not 1 <= weeks <= MUSCLE_VOLUME_MAX_WEEKS:
+            return Response(
+                {"detail": f"weeks must be an integer from 1 to {MUSCLE_VOLUME_MAX_WEEKS}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        first = week_start(timezone.now()) - timedelta(weeks=weeks - 1)
+        rows = (
+            WeeklyMuscleVolume.objects.filter(user=request.user, week__gte=first, sets__gt=0)
+            .order_by("-week", "muscle_group__name")
+            .values_list("week", "muscle_group__name", "sets", "volume")
+        )
+        return Response(
+            [
+                {
+                    "week": week,
+                    "muscle_group": name,
+                    "sets": sets,
+                    # Stored in millionths (hundredths x hundredths x hundredths).
+                    "volume": from_centi(round(volume / SCALE / SCALE)),
+                }
+                for week, name, sets, volume in rows
+            ]
+        )
+
     @action(detail=False, methods=["get"], url_path="last_exercise_performance")
     def last_exercise_performance(self, request):
-        """GET /api/v1/workouts/last_exercise_performance/?exercise_id=X - last time user did this exercise, with sets."""
+        """
+        GET /api/v1/workouts/last_exercise_performance/?exercise_id=X - last time user did this exercise, with sets.
+
+        ?exercise_ids=1,2,3 (up to 100) returns a list with the last performance of each
+        exercise the user has done, in the order asked; exercises never done are left out.
+        """
+        if request.query_params.get("exercise_ids"):
+            try:
+                exercise_ids = [
+                    int(part)
+                    for part in request.query_params["exercise_ids"].split(",")
+                    if part.strip()
+                ]
+            except ValueError:
+                return Response(
+                    {"detail": "exercise_ids must be comma-separated integers"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            if len(exercise_ids) > LAST_PERFORMANCE_MAX_IDS:
+                return Response(
+                    {"detail": f"at most {LAST_PERFORMANCE_MAX_IDS} exercise_ids"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+            context = self.get_serializer_context()
+            found = fieldsets.shape(
+                TemplateExerciseSerializer(context=context),
+                _last_performances(request.user, exercise_ids),
+                "exercise",
+            )
+            by_exercise = {pe.exercise_id: pe for pe in found}
+            found = [by_exercise[i] for i in dict.fromkeys(exercise_ids) if i in by_exercise]
+            serializer = TemplateExerciseSerializer(found, many=True, context=context)
+            return Response(serializer.data)
+
         exercise_id = request.query_params.get("exercise_id")
         if not exercise_id:
             return Response(
-                {"detail": "exercise_id required"},
+                {"detail": "exercise_id or exercise_ids required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
         try:
@@ -143,49 +522,202 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
                 {"detail": "exercise_id must be an integer"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        last = (
-            PerformedExercise.objects.filter(
-                session__user=request.user,
-                exercise_id=exercise_id,
-            )
-            .order_by("-session__date")
-            .select_related("exercise")
-            .prefetch_related("sets")
-            .first()
-        )
+        context = self.get_serializer_context()
+        last = fieldsets.shape(
+            TemplateExerciseSerializer(context=context),
+            _last_performances(request.user, [exercise_id]),
+        ).first()
         if not last:
             return Response(
                 {"detail": "No previous performance for this exercise"},
                 status=status.HTTP_404_NOT_FOUND,
             )
-        serializer = TemplateExerciseSerializer(last)
+        serializer = TemplateExerciseSerializer(last, context=context)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def recommendations(self, request):
+        """
+        GET /api/v1/workouts/recommendations/ - suggested sets for the next session of each
+        exercise, with the action behind them (increase, hold, deload, add_reps), the
+        latest e1RM and its trend per week (see workouts/recommend.py).
+
+        ?exercise_ids=1,2,3 returns those exercises, in the order asked; exercises never
+        done are left out. Without it, the most recently done come first.
+
+        Served from the batch-computed Recommendations row. When the user has logged
+        anything since, a recomputation is queued and the previous results come back with
+        "stale": true.
+        """
+        exercise_ids = None
+        if request.query_params.get("exercise_ids"):
+            try:
+                exercise_ids = [
+                    int(part)
+                    for part in request.query_params["exercise_ids"].split(",")
+                    if part.strip()
+                ]
+            except ValueError:
+                return Response(
+                    {"detail": "exercise_ids must be comma-separated integers"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        user_id = request.user.pk
+        stored, version = recommend.lookup(user_id)
+        # Queued once per data version; with JOBS_INLINE it runs right here.
+        if recommend.is_stale(stored, version) and cache.add(
+            f"recommend:queued:{user_id}:{version}", True, recommend.QUEUED_SECONDS
+        ):
+            tasks.refresh_recommendations.enqueue(user_id=user_id)
+            stored, version = recommend.lookup(user_id)
+        if stored is None:
+            return Response({"version": None, "stale": True, "computed_at": None, "exercises": []})
+
+        if exercise_ids is None:
+            found = stored.exercises
+        else:
+            by_exercise = {s["exercise"]: s for s in stored.exercises}
+            found = [by_exercise[i] for i in dict.fromkeys(exercise_ids) if i in by_exercise]
+        return Response(
+            {
+                "version": stored.version,
+                "stale": recommend.is_stale(stored, version),
+                "computed_at": stored.computed_at,
+                "exercises": found,
+            }
+        )
+
+    @action(detail=False, methods=["get"])
+    def rankings(self, request):
+        """
+        GET /api/v1/workouts/rankings/ - how the user's best e1RM for each exercise compares
+        with everyone else's: {"exercise", "e1rm", "percentile", "lifters", "quartiles",
+        "computed_at"}, highest percentile first. ?exercise_ids=1,2,3 limits the exercises.
+
+        Looked up in the nightly percentile tables (see workouts/rankings.py); exercises
+        without one (too few lifters) or without a weighted set by the user are left out.
+        """
+        exercise_ids = None
+        if request.query_params.get("exercise_ids"):
+            try:
+                exercise_ids = [
+                    int(part)
+                    for part in request.query_params["exercise_ids"].split(",")
+                    if part.strip()
+                ]
+            except ValueError:
+                return Response(
+                    {"detail": "exercise_ids must be comma-separated integers"},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+        bests = rankings.user_bests(request.user.pk, exercise_ids)
+        rows = []
+        for table in ExercisePercentiles.objects.filter(exercise_id__in=bests):
+            cuts = rankings.unpack(table)
+            rows.append(
+                {
+                    "exercise": table.exercise_id,
+                    "e1rm": round(bests[table.exercise_id], 1),
+                    "percentile": rankings.percentile(cuts, bests[table.exercise_id]),
+                    "lifters": table.users,
+                    "quartiles": [round(rankings.quantile(cuts, q), 1) for q in (0.25, 0.5, 0.75)],
+                    "computed_at": table.computed_at,
+                }
+            )
+        rows.sort(key=lambda row: row["percentile"], reverse=True)
+        return Response(rows)
+
     @action(detail=False, methods=["get"])
     def template(self, request):
         """GET /api/v1/workouts/template/ - last workout's exercises with sets (for next workout)."""
-        last = self.get_queryset().order_by("-date").first()
+        last = self.queryset.filter(user=request.user).order_by("-date").only("id").first()
         if not last:
             return Response([])
-        exercises = last.exercises.all().select_related("exercise").prefetch_related("sets")
-        serializer = TemplateExerciseSerializer(exercises, many=True)
+        context = self.get_serializer_context()
+        exercises = fieldsets.shape(
+            TemplateExerciseSerializer(context=context), last.exercises.all(), "session"
+        )
+        serializer = TemplateExerciseSerializer(exercises, many=True, context=context)
         return Response(serializer.data)
 
+    @action(detail=False, methods=["get"])
+    def search(self, request):
+        """
+        GET /api/v1/workouts/search/?q=... - the user's session, set and exercise notes
+        matching q, best first (see workouts/search.py).
+
+        ?limit=N (default 20, max 50). Each hit has kind (session, set or exercise_note),
+        id, rank, a snippet with matches in [brackets], and the session {id, date, name}
+        and exercise {id, name} it belongs to, where it has one.
+        """
+        if not search.available():
+            return Response(
+                {"detail": "Search is not available on this database."},
+                status=status.HTTP_501_NOT_IMPLEMENTED,
+            )
+        text = request.query_params.get("q", "").strip()
+        if not text:
+            return Response({"detail": "q is required"}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = int(request.query_params.get("limit", 20))
+        except ValueError:
+            limit = 0
+        if not 1 <= limit <= search.MAX_LIMIT:
+            return Response(
+                {"detail": f"limit must be an integer from 1 to {search.MAX_LIMIT}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(search.search(request.user.pk, text, limit))
+
+    @action(detail=False, methods=["get"])
+    def history_snapshot(self, request):
+        """
+        GET /api/v1/workouts/history_snapshot/ - every set as parallel arrays, for charts.
+
+        ?encoding=json (default) or packed (little-endian binary, see workouts/history.py).
+        The ETag is the user's data version; send it back as If-None-Match to get a 304.
+        Not served from the replica, so a user always gets their own latest writes.
+        """
+        encoding = request.query_params.get("encoding", "json")
+        if encoding not in history.ENCODINGS:
+            return Response(
+                {"detail": f"encoding must be one of: {', '.join(history.ENCODINGS)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        version, content_type, body = history.snapshot(request.user.pk, encoding)
+        etag = f'"{version}-{encoding}"'
+        if etag in request.headers.get("If-None-Match", ""):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(body, content_type=content_type)
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
     @action(detail=True, methods=["get"])
     def previous_exercises(self, request, pk=None):
-        """GET /api/v1/workouts/{id}/previous_exercises/ - prior session's exercises (for 'last time' ref)."""
-        session = self.get_object()
-        previous = (
-            self.get_queryset()
-            .filter(date__lt=session.date)
-            .order_by("-date")
-            .first()
-        )
-        if not previous:
+        """
+        GET /api/v1/workouts/{id}/previous_exercises/ - prior session's exercises (for 'last time' ref).
+
+        ?depth=N (max 20) covers the last N sessions instead: one entry per exercise, taken
+        from its most recent performance, with `history` holding one slot per session
+        (newest first, null where the exercise was not done).
+        """
+        raw_depth = request.query_params.get("depth")
+        depth = _parse_depth(raw_depth, default=1)
+        if depth is None:
+            return _depth_error()
+        sessions = _previous_sessions(request.user, pk, depth)
+        if not sessions:
             return Response([])
-        exercises = previous.exercises.all().select_related("exercise").prefetch_related("sets")
-        serializer = TemplateExerciseSerializer(exercises, many=True)
-        return Response(serializer.data)
+        performed = PerformedExercise.objects.filter(session_id__in=[sid for sid, _ in sessions])
+        if raw_depth is None:
+            context = self.get_serializer_context()
+            performed = fieldsets.shape(TemplateExerciseSerializer(context=context), performed)
+            serializer = TemplateExerciseSerializer(performed, many=True, context=context)
+            return Response(serializer.data)
+        performed = performed.select_related("exercise").prefetch_related("sets")
+        return Response(_previous_entries(sessions, performed))
 
     def _add_exercise(self, session, request):
         data = dict(request.data)
@@ -198,22 +730,27 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
                 else exercise_name
             )
             name_str = str(name).strip()[:100]
-            exercise, _ = Exercise.objects.get_or_create(
+            exercise, created = Exercise.objects.get_or_create(
                 name=name_str,
                 defaults={"description": ""},
             )
+            if created:
+                taxonomy.apply([exercise])
             data["exercise"] = exercise.id
         serializer = PerformedExerciseSerializer(data=data)
         if serializer.is_valid():
             serializer.save(session=session, is_bodyweight=bool(is_bodyweight))
+            Session.bump(session.pk, exercises=1)
+            UserExercise.refresh_for(session.user_id, [serializer.instance.exercise_id])
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
     def _list_exercises(self, session):
-        exercises = session.exercises.all().select_related("exercise").prefetch_related("sets")
-        serializer = PerformedExerciseSerializer(
-            exercises, many=True, context={"request": self.request}
+        context = self.get_serializer_context()
+        exercises = fieldsets.shape(
+            PerformedExerciseSerializer(context=context), session.exercises.all(), "session"
         )
+        serializer = PerformedExerciseSerializer(exercises, many=True, context=context)
         return Response(serializer.data)
 
     @action(detail=True, methods=["get", "post"])
@@ -225,14 +762,54 @@ class WorkoutSessionViewSet(viewsets.ModelViewSet):
         return self._list_exercises(session)
 
 
-class PerformedExerciseViewSet(viewsets.ModelViewSet):
+class PerformedExerciseViewSet(fieldsets.SparseFieldsetMixin, viewsets.ModelViewSet):
     serializer_class = PerformedExerciseSerializer
 
     def get_queryset(self):
-        return (
-            PerformedExercise.objects.filter(session__user=self.request.user)
-            .select_related("exercise")
-            .prefetch_related("sets")
+        queryset = PerformedExercise.objects.filter(session__user=self.request.user)
+        if self.action in ("list", "retrieve"):
+            return fieldsets.shape(self.get_serializer(), queryset)
+        return queryset.select_related("session", "exercise").prefetch_related("sets")
+
+    def perform_update(self, serializer):
+        previous_exercise_id = serializer.instance.exercise_id
+        serializer.save()
+        instance = serializer.instance
+        Session.bump(instance.session_id)
+        if instance.exercise_id != previous_exercise_id:
+            week = week_start(instance.session.date)
+            sets = instance.sets.all()
+            volume = sum(s.volume for s in sets)
+            WeeklyMuscleVolume.bump(
+                self.request.user.pk,
+                [
+                    (week, previous_exercise_id, -len(sets), -volume),
+                    (week, instance.exercise_id, len(sets), volume),
+                ],
+            )
+            tasks.refresh_user_exercises.enqueue(
+                user_id=self.request.user.pk,
+                exercise_ids=[previous_exercise_id, serializer.instance.exercise_id],
+            )
+
+    def perform_destroy(self, instance):
+        sets = list(instance.sets.all())
+        instance.delete()
+        Session.bump(
+            instance.session_id,
+            exercises=-1,
+            sets=-len(sets),
+            volume=-sum(s.volume for s in sets),
+        )
+        WeeklyMuscleVolume.bump(
+            self.request.user.pk,
+            [
+                (week_start(instance.session.date), instance.exercise_id, -1, -s.volume)
+                for s in sets
+            ],
+        )
+        tasks.refresh_user_exercises.enqueue(
+            user_id=self.request.user.pk, exercise_ids=[instance.exercise_id]
         )
 
     def _add_set(self, exercise, request):
@@ -240,6 +817,11 @@ class PerformedExerciseViewSet(viewsets.ModelViewSet):
         if not serializer.is_valid():
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         serializer.save(performed_exercise=exercise)
+        Session.bump(exercise.session_id, sets=1, volume=serializer.instance.volume)
+        WeeklyMuscleVolume.bump(
+            request.user.pk,
+            [(week_start(exercise.session.date), exercise.exercise_id, 1, serializer.instance.volume)],
+        )
         UserExerciseNote.clear_for(request.user, exercise.exercise_id)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
@@ -264,7 +846,10 @@ class PerformedExerciseViewSet(viewsets.ModelViewSet):
 
 
 class SetEntryViewSet(
-    RetrieveModelMixin, UpdateModelMixin, DestroyModelMixin, viewsets.GenericViewSet
+    RetrieveModelMixin,
+    UpdateModelMixin,
+    DestroyModelMixin,
+    viewsets.GenericViewSet,
 ):
     serializer_class = SetEntrySerializer
     queryset = SetEntry.objects.all()
@@ -272,11 +857,25 @@ class SetEntryViewSet(
     def get_queryset(self):
         return self.queryset.filter(
             performed_exercise__session__user=self.request.user
-        ).select_related("performed_exercise__exercise")
+        ).select_related("performed_exercise__exercise", "performed_exercise__session")
 
     def perform_update(self, serializer):
+        previous_volume = serializer.instance.volume
         serializer.save()
         instance = serializer.instance
+        performed = instance.performed_exercise
+        Session.bump(performed.session_id, volume=instance.volume - previous_volume)
+        WeeklyMuscleVolume.bump(
+            self.request.user.pk,
+            [
+                (
+                    week_start(performed.session.date),
+                    performed.exercise_id,
+                    0,
+                    instance.volume - previous_volume,
+                )
+            ],
+        )
         UserExerciseNote.clear_for(
             self.request.user, instance.performed_exercise.exercise_id
         )
@@ -284,15 +883,112 @@ class SetEntryViewSet(
     def perform_destroy(self, instance):
         performed_exercise_id = instance.performed_exercise_id
         instance.delete()
-        remaining = list(
-            SetEntry.objects.filter(performed_exercise_id=performed_exercise_id).order_by("id")
+        performed = instance.performed_exercise
+        Session.bump(performed.session_id, sets=-1, volume=-instance.volume)
+        WeeklyMuscleVolume.bump(
+            self.request.user.pk,
+            [(week_start(performed.session.date), performed.exercise_id, -1, -instance.volume)],
         )
-        if not remaining:
+        remaining = SetEntry.objects.filter(performed_exercise_id=performed_exercise_id)
+        # Move everything out of the way first so renumbering never collides with
+        # unique (performed_exercise, order), then write the final numbers in one query.
+        if not remaining.update(order=F("order") + 1000):
             return
-        offset = 1000
-        for set_entry in remaining:
-            set_entry.order = offset + set_entry.order
-            set_entry.save(update_fields=["order"])
-        for order, set_entry in enumerate(remaining, start=1):
+        renumbered = list(remaining.order_by("id").only("id", "order"))
+        for order, set_entry in enumerate(renumbered, start=1):
             set_entry.order = order
-            set_entry.save(update_fields=["order"])
+        SetEntry.objects.bulk_update(renumbered, ["order"])
+
+
+class ScreenViewSet(ReplicaReadsMixin, viewsets.GenericViewSet):
+    """
+    Read-only composites: everything one mobile screen needs in a single response, so
+    opening it costs one round trip instead of three. Each section is the same JSON its
+    standalone endpoint returns; rows shared between sections are loaded once.
+    """
+
+    replica_actions = frozenset({"workouts", "workout_detail"})
+    pagination_class = OptionalCursorPagination
+
+    def workouts(self, request):
+        """
+        GET /api/v1/screens/workouts/ - {"workouts": /workouts/, "template": /workouts/template/}.
+
+        page_size / cursor page `workouts` as on /workouts/. The template comes from the
+        newest session, which the first page already holds, so it costs no queries.
+        """
+        sessions = Session.objects.filter(user=request.user).prefetch_related(
+            "exercises__exercise", "exercises__sets"
+        )
+        page = self.paginate_queryset(sessions)
+        rows = list(sessions) if page is None else page
+        if self.paginator.cursor_query_param in request.query_params:
+            latest = sessions.order_by("-date", "-id").first()
+        else:
+            latest = rows[0] if rows else None
+        data = SessionSerializer(rows, many=True, context=self.get_serializer_context()).data
+        return Response(
+            {
+                "workouts": data if page is None else self.get_paginated_response(data).data,
+                "template": (
+                    TemplateExerciseSerializer(latest.exercises.all(), many=True).data
+                    if latest
+                    else []
+                ),
+            }
+        )
+
+    def workout_detail(self, request, pk=None):
+        """
+        GET /api/v1/screens/workout-detail/{id}/ - the workout detail screen in one response:
+
+            workout            /workouts/{id}/
+            previous_exercises /workouts/{id}/previous_exercises/?depth=N (default 5)
+            user_exercises     /workouts/user_exercises/?sort=... (default name)
+            last_performances  /workouts/last_exercise_performance/?exercise_ids=... for the
+                               user's exercises missing from previous_exercises (up to 100)
+
+        At most nine queries however long the history: the session, its exercises, the
+        previous session ids, their exercises, the last performances, one sets prefetch
+        for all three exercise lists, the user's exercises, one Exercise lookup for every
+        row that names one, and the notes.
+        """
+        depth = _parse_depth(request.query_params.get("depth"), default=SCREEN_PREVIOUS_DEPTH)
+        if depth is None:
+            return _depth_error()
+        sort = request.query_params.get("sort", "name")
+        if sort not in USER_EXERCISE_ORDERINGS:
+            return _sort_error()
+        session = (
+            Session.objects.filter(user=request.user, pk=pk).prefetch_related("exercises").first()
+        )
+        if session is None:
+            raise Http404
+        sessions = _previous_sessions(request.user, session.pk, depth, anchor=session.date)
+        previous = list(
+            PerformedExercise.objects.filter(session_id__in=[sid for sid, _ in sessions])
+        )
+        stats = list(
+            UserExercise.objects.filter(user=request.user).order_by(*USER_EXERCISE_ORDERINGS[sort])
+        )
+        covered = {pe.exercise_id for pe in previous}
+        missing = [s.exercise_id for s in stats if s.exercise_id not in covered]
+        missing = missing[:LAST_PERFORMANCE_MAX_IDS]
+        last = {pe.exercise_id: pe for pe in _last_performances(request.user, missing)}
+
+        performed = [*session.exercises.all(), *previous, *last.values()]
+        prefetch_related_objects(performed, "sets")
+        exercises = Exercise.objects.in_bulk({row.exercise_id for row in [*performed, *stats]})
+        for row in [*performed, *stats]:
+            row.exercise = exercises[row.exercise_id]
+
+        return Response(
+            {
+                "workout": SessionSerializer(session, context=self.get_serializer_context()).data,
+                "previous_exercises": _previous_entries(sessions, previous),
+                "user_exercises": UserExerciseSerializer(stats, many=True).data,
+                "last_performances": TemplateExerciseSerializer(
+                    [last[i] for i in missing if i in last], many=True
+                ).data,
+            }
+        )
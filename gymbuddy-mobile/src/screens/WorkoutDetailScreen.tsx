@@ -23,6 +23,7 @@ import type {
   SetEntry,
   TemplateExercise,
   TemplateSetEntry,
+  WorkoutDetailScreenData,
 } from '../types/workout'
 import { formatNumber, formatWeight, formatFullDate } from '../utils/format'
 import { setDecimalInput, parseReps, stepRepsValue } from '../utils/numberInput'
@@ -30,6 +31,9 @@ import ArrowIcon from '../components/ArrowIcon'
 import LoadingSpinner from '../components/LoadingSpinner'
 import { colors } from '../theme/colors'
 
+// Sessions of history fetched up front; covers most "add past exercise" lookups.
+const PREVIOUS_DEPTH = 5
+
 export default function WorkoutDetailScreen({
   route,
   navigation,
@@ -46,6 +50,9 @@ export default function WorkoutDetailScreen({
   const [userExercises, setUserExercises] = useState<
     { id: number; name: string }[]
   >([])
+  const [lastPerformances, setLastPerformances] = useState<
+    Record<number, TemplateExercise>
+  >({})
   const [loading, setLoading] = useState(true)
   const [newExerciseName, setNewExerciseName] = useState('')
   const [newExerciseBodyweight, setNewExerciseBodyweight] = useState(false)
@@ -99,39 +106,33 @@ export default function WorkoutDetailScreen({
     }
   }, [token, workoutId])
 
-  const fetchPrevious = useCallback(async () => {
+  // Opening the screen: workout, previous sessions, the user's exercises and the
+  // last performance of every exercise outside that window, in one round trip.
+  const fetchScreen = useCallback(async () => {
     if (!token) return
     try {
-      const data = await apiRequest<TemplateExercise[]>(
-        `/workouts/${workoutId}/previous_exercises/`,
+      const data = await apiRequest<WorkoutDetailScreenData>(
+        `/screens/workout-detail/${workoutId}/?depth=${PREVIOUS_DEPTH}`,
         { token },
       )
-      setPreviousExercises(Array.isArray(data) ? data : [])
+      setWorkout(data.workout)
+      setPreviousExercises(data.previous_exercises ?? [])
+      setUserExercises(data.user_exercises ?? [])
+      const byId: Record<number, TemplateExercise> = {}
+      for (const entry of data.last_performances ?? [])
+        byId[entry.exercise.id] = entry
+      setLastPerformances(byId)
     } catch {
+      setWorkout(null)
       setPreviousExercises([])
-    }
-  }, [token, workoutId])
-
-  const fetchUserExercises = useCallback(async () => {
-    if (!token) return
-    try {
-      const data = await apiRequest<{ id: number; name: string }[]>(
-        `/workouts/user_exercises/`,
-        { token },
-      )
-      setUserExercises(Array.isArray(data) ? data : [])
-    } catch {
       setUserExercises([])
+      setLastPerformances({})
     }
-  }, [token])
+  }, [token, workoutId])
 
   useEffect(() => {
-    Promise.all([
-      fetchWorkout(),
-      fetchPrevious(),
-      fetchUserExercises(),
-    ]).finally(() => setLoading(false))
-  }, [fetchWorkout, fetchPrevious, fetchUserExercises])
+    fetchScreen().finally(() => setLoading(false))
+  }, [fetchScreen])
 
   useEffect(() => {
     if (editingSetId !== null) {
@@ -438,10 +439,13 @@ export default function WorkoutDetailScreen({
       let userPreferredName = ''
       let lastSets: TemplateSetEntry[] = []
       try {
-        const last = await apiRequest<TemplateExercise>(
-          `/workouts/last_exercise_performance/?exercise_id=${exerciseId}`,
-          { token },
-        )
+        const last =
+          previousExercises.find((p) => p.exercise.id === exerciseId) ??
+          lastPerformances[exerciseId] ??
+          (await apiRequest<TemplateExercise>(
+            `/workouts/last_exercise_performance/?exercise_id=${exerciseId}`,
+            { token },
+          ))
         if (last?.user_preferred_name)
           userPreferredName = last.user_preferred_name
         if (Array.isArray(last?.last_sets) && last.last_sets.length > 0)
@@ -22,6 +22,7 @@ import type {
   PerformedExercise,
   TemplateExercise,
   TemplateSource,
+  WorkoutsScreenData,
 } from '../types/workout'
 import { formatNumber, formatWeight, formatMonthDay, formatSessionDate } from '../utils/format'
 import ArrowIcon from '../components/ArrowIcon'
@@ -58,13 +59,16 @@ export default function WorkoutsScreen({ navigation }: NavProps) {
   const fetchWorkouts = useCallback(async () => {
     if (!token) return
     try {
-      const data = await apiRequest<Workout[] | { results: Workout[] }>(
-        '/workouts/',
-        { token },
-      )
-      setWorkouts(Array.isArray(data) ? data : (data.results ?? []))
+      // List and create-form template together, so opening the form needs no fetch.
+      const data = await apiRequest<WorkoutsScreenData>('/screens/workouts/', {
+        token,
+      })
+      const { workouts: list } = data
+      setWorkouts(Array.isArray(list) ? list : (list.results ?? []))
+      setTemplate(Array.isArray(data.template) ? data.template : [])
     } catch (err) {
       setWorkouts([])
+      setTemplate([])
       // 401 = wrong or expired token; clear so user can log in again (same account as web)
       if (
         err &&
@@ -77,18 +81,6 @@ export default function WorkoutsScreen({ navigation }: NavProps) {
     }
   }, [token, logout])
 
-  const fetchTemplate = useCallback(async () => {
-    if (!token) return
-    try {
-      const data = await apiRequest<TemplateExercise[]>('/workouts/template/', {
-        token,
-      })
-      setTemplate(Array.isArray(data) ? data : [])
-    } catch {
-      setTemplate([])
-    }
-  }, [token])
-
   useEffect(() => {
     fetchWorkouts().finally(() => {
       setLoading(false)
@@ -108,10 +100,9 @@ export default function WorkoutsScreen({ navigation }: NavProps) {
 
   useEffect(() => {
     if (showCreateForm) {
-      fetchTemplate()
       setCreateDate(new Date())
     }
-  }, [showCreateForm, fetchTemplate])
+  }, [showCreateForm])
 
   const handleCreateSubmit = async () => {
     if (!token) return
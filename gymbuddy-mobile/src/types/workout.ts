@@ -43,6 +43,31 @@ export type TemplateExercise = {
   user_preferred_name?: string
   order: number
   last_sets: TemplateSetEntry[]
+  // Only with ?depth=N: one slot per previous session, newest first.
+  history?: (TemplateHistoryEntry | null)[]
+}
+
+export type TemplateHistoryEntry = {
+  session: number
+  date: string
+  user_preferred_name?: string
+  order: number
+  sets: TemplateSetEntry[]
 }
 
 export type TemplateSource = 'previous' | 'another' | 'none'
+
+// GET /screens/workouts/: the home screen in one response.
+export type WorkoutsScreenData = {
+  workouts: Workout[] | { results: Workout[] }
+  template: TemplateExercise[]
+}
+
+// GET /screens/workout-detail/{id}/: the detail screen in one response.
+export type WorkoutDetailScreenData = {
+  workout: Workout
+  previous_exercises: TemplateExercise[]
+  user_exercises: { id: number; name: string }[]
+  // Last performance of each user exercise missing from previous_exercises.
+  last_performances: TemplateExercise[]
+}
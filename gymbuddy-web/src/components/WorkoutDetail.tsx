@@ -4,6 +4,11 @@ import { apiRequest } from "@/lib/api";
 import type { Workout, PerformedExercise, SetEntry, TemplateExercise } from "@/types/workout";
 import { formatDate, formatWeight } from "@/utils/format";
 
+// Sessions of history fetched up front; covers most "add past exercise" lookups.
+const PREVIOUS_DEPTH = 5;
+// Server-side cap on exercise_ids per last_exercise_performance request.
+const LAST_PERFORMANCE_BATCH = 100;
+
 function SetRow({
   set: s,
   editingSetId,
@@ -111,6 +116,7 @@ export default function WorkoutDetail({
   const [workout, setWorkout] = useState<Workout | null>(null);
   const [previousExercises, setPreviousExercises] = useState<TemplateExercise[]>([]);
   const [userExercises, setUserExercises] = useState<{ id: number; name: string }[]>([]);
+  const [lastPerformances, setLastPerformances] = useState<Record<number, TemplateExercise>>({});
   const [loading, setLoading] = useState(true);
   const [newExerciseName, setNewExerciseName] = useState("");
   const [addingExercise, setAddingExercise] = useState(false);
@@ -129,7 +135,7 @@ export default function WorkoutDetail({
     if (!token) return;
     try {
       const data = await apiRequest<TemplateExercise[]>(
-        `/workouts/${workoutId}/previous_exercises/`,
+        `/workouts/${workoutId}/previous_exercises/?depth=${PREVIOUS_DEPTH}`,
         { token }
       );
       setPreviousExercises(Array.isArray(data) ? data : []);
@@ -157,6 +163,28 @@ export default function WorkoutDetail({
     );
   }, [fetchWorkout, fetchPrevious, fetchUserExercises]);
 
+  // Past exercises outside the previous-sessions window: fetch their last
+  // performance in one batch so adding them needs no extra round trip.
+  useEffect(() => {
+    if (!token || loading) return;
+    const covered = new Set(previousExercises.map((p) => p.exercise.id));
+    const ids = userExercises
+      .map((e) => e.id)
+      .filter((id) => !covered.has(id))
+      .slice(0, LAST_PERFORMANCE_BATCH);
+    if (ids.length === 0) return;
+    apiRequest<TemplateExercise[]>(
+      `/workouts/last_exercise_performance/?exercise_ids=${ids.join(",")}`,
+      { token }
+    )
+      .then((data) => {
+        const byId: Record<number, TemplateExercise> = {};
+        for (const entry of Array.isArray(data) ? data : []) byId[entry.exercise.id] = entry;
+        setLastPerformances(byId);
+      })
+      .catch(() => setLastPerformances({}));
+  }, [token, loading, previousExercises, userExercises]);
+
   const getLastSets = (exerciseId: number) =>
     previousExercises.find((p) => p.exercise.id === exerciseId)?.last_sets ?? [];
 
@@ -290,10 +318,13 @@ export default function WorkoutDetail({
       let userPreferredName = "";
       let lastSets: SetEntry[] = [];
       try {
-        const last = await apiRequest<TemplateExercise>(
-          `/workouts/last_exercise_performance/?exercise_id=${exerciseId}`,
-          { token }
-        );
+        const last =
+          previousExercises.find((p) => p.exercise.id === exerciseId) ??
+          lastPerformances[exerciseId] ??
+          (await apiRequest<TemplateExercise>(
+            `/workouts/last_exercise_performance/?exercise_id=${exerciseId}`,
+            { token }
+          ));
         if (last?.user_preferred_name) userPreferredName = last.user_preferred_name;
         if (Array.isArray(last?.last_sets) && last.last_sets.length > 0) lastSets = last.last_sets;
       } catch {
@@ -33,4 +33,14 @@ export type TemplateExercise = {
   user_preferred_name?: string;
   order: number;
   last_sets: SetEntry[];
+  // Only with ?depth=N: one slot per previous session, newest first.
+  history?: (TemplateHistoryEntry | null)[];
+};
+
+export type TemplateHistoryEntry = {
+  session: number;
+  date: string;
+  user_preferred_name?: string;
+  order: number;
+  sets: SetEntry[];
 };